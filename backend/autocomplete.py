@@ -0,0 +1,323 @@
+# Filename: backend/autocomplete.py
+# Description: Autocomplétion des noms de joueurs (préfixes, fautes de frappe, accents) sur un index en mémoire.
+#
+# Chaque nom de joueur et chaque alias (table player_aliases) est replié (minuscules, sans
+# accents ni ponctuation, voir database.fold_name) puis indexé deux fois :
+#   - par mots, dans une liste triée : une saisie "kyl mb" garde les noms dont chaque mot saisi
+#     commence un mot du nom (recherche dichotomique du mot saisi le plus long) ; les préfixes
+#     d'un ou deux caractères ont leur liste des meilleurs joueurs précalculée ;
+#   - par trigrammes : si les préfixes ne suffisent pas, les noms qui partagent au moins
+#     MIN_FUZZY_SCORE des trigrammes de la saisie sont proposés ("mbape" -> "Kylian Mbappé").
+# À score égal, les joueurs de plus grande valeur marchande passent devant.
+#
+# L'index est construit au démarrage de l'API (en arrière-plan) puis mis à jour à chaque
+# écriture sur la table players (écouteur de database.py). En multi-worker, les écritures d'un
+# autre worker sont prises en compte au plus tard après AUTOCOMPLETE_MAX_AGE secondes.
+
+import bisect
+import logging
+import math
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import database
+from database import fold_name
+
+logger = logging.getLogger(__name__)
+
+# Âge maximal de l'index (s) avant reconstruction ; 0 = jamais (un seul worker, mises à jour par écouteur)
+AUTOCOMPLETE_MAX_AGE = float(os.getenv("AUTOCOMPLETE_MAX_AGE", "300" if int(os.getenv("WEB_CONCURRENCY", "1") or 1) > 1 else "0"))
+
+# Part minimale des trigrammes de la saisie retrouvés dans un nom pour le proposer
+MIN_FUZZY_SCORE = 0.5
+
+# Préfixes dont la liste des meilleurs joueurs est précalculée (1 et 2 caractères)
+SHORT_PREFIX_LENGTH = 2
+SHORT_PREFIX_TOP = 20
+
+# Bornes du travail par requête (garantissent une latence de quelques millisecondes)
+MAX_PREFIX_SCAN = 500
+MAX_FUZZY_POSTINGS = 10000
+MAX_FUZZY_VERIFIED = 100
+
+# Scores par type de correspondance (la correspondance approchée vaut au plus 1.1)
+SCORE_EXACT = 4.0
+SCORE_NAME_PREFIX = 3.0
+SCORE_WORD_PREFIX = 2.0
+
+def trigrams(key: str, partial_last: bool = False) -> set:
+    """Trigrammes d'un nom replié, mot par mot avec des espaces en bordure ("mbappe" -> " mb", "mba"...).
+    `partial_last` : le dernier mot est en cours de saisie, sans bordure de fin."""
+    words = key.split()
+    grams = set()
+    for i, word in enumerate(words):
+        padded = " " + word if partial_last and i == len(words) - 1 else f" {word} "
+        grams.update([padded[j:j + 3] for j in range(len(padded) - 2)])
+    return grams
+
+class AutocompleteIndex:
+    """
+    Noms et alias repliés avec leurs index par mots et par trigrammes. Une entrée = un nom ou
+    un alias d'un joueur ; les entrées remplacées (alias réattribué, joueur renommé) sont
+    marquées mortes et ignorées jusqu'à la prochaine reconstruction.
+    """
+
+    def __init__(self):
+        self.players: Dict[int, tuple] = {}          # id -> (nom, club, poste, nationalité, poids)
+        self.entries: List[Tuple[int, str, Optional[str]]] = []  # (id joueur, nom replié, alias affiché)
+        self.entry_of: Dict[Tuple[int, str], int] = {}
+        self.alias_entry: Dict[str, int] = {}        # alias replié -> entrée
+        self.dead: set = set()
+        self.words: List[Tuple[str, int]] = []       # (mot, entrée), trié
+        self.short_top: Dict[str, List[int]] = {}    # préfixe court -> meilleures entrées
+        self.postings: Dict[str, List[int]] = defaultdict(list)  # trigramme -> entrées
+        self.built_at = 0.0
+        self._lock = threading.Lock()
+
+    # --- Construction et mises à jour ---
+
+    def build(self):
+        start = time.perf_counter()
+        # Lecture sous le verrou : une écriture notifiée pendant la construction attend la fin
+        # de celle-ci puis est appliquée par update_players, jamais écrasée par des lignes plus anciennes
+        with self._lock:
+            conn = database.get_db_connection()
+            try:
+                players = conn.execute(
+                    "SELECT id, name, current_club, position, nationality, market_value_eur FROM players").fetchall()
+                aliases = conn.execute("SELECT alias_key, alias, player_id FROM player_aliases").fetchall()
+            finally:
+                conn.close()
+            for row in players:
+                self._set_player(row)
+                self._add_entry(row["id"], fold_name(row["name"]), None, sort_words=False)
+            for alias_key, alias, player_id in aliases:
+                if player_id in self.players:
+                    self.alias_entry[alias_key] = self._add_entry(player_id, alias_key, alias, sort_words=False)
+            self.words.sort()
+            self._rebuild_short_top()
+            self.built_at = time.monotonic()
+        logger.info("Index d'autocomplétion construit", extra={
+            "players": len(self.players), "entries": len(self.entries),
+            "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+        })
+
+    def _set_player(self, row):
+        value = row["market_value_eur"] or 0
+        weight = math.log10(value) / 10 if value > 0 else 0.0
+        self.players[row["id"]] = (row["name"], row["current_club"], row["position"], row["nationality"], weight)
+
+    def _add_entry(self, player_id: int, key: str, alias: Optional[str], sort_words: bool = True) -> int:
+        existing = self.entry_of.get((player_id, key))
+        if existing is not None and existing not in self.dead:
+            return existing
+        eid = len(self.entries)
+        self.entries.append((player_id, key, alias))
+        self.entry_of[(player_id, key)] = eid
+        for word in set(key.split()):
+            if sort_words:
+                bisect.insort(self.words, (word, eid))
+            else:
+                self.words.append((word, eid))
+        for gram in trigrams(key):
+            self.postings[gram].append(eid)
+        if sort_words:
+            self._touch_short_top(eid)
+        return eid
+
+    def _kill(self, eid: int):
+        self.dead.add(eid)
+        player_id, key, _ = self.entries[eid]
+        self.entry_of.pop((player_id, key), None)
+
+    def _weight(self, eid: int) -> float:
+        return self.players[self.entries[eid][0]][4]
+
+    def _short_prefixes(self, key: str) -> set:
+        return {word[:n] for word in key.split() for n in range(1, SHORT_PREFIX_LENGTH + 1) if len(word) >= n}
+
+    def _rebuild_short_top(self):
+        live = sorted((eid for eid in range(len(self.entries)) if eid not in self.dead),
+                      key=lambda eid: (-self._weight(eid), eid))
+        self.short_top = defaultdict(list)
+        for eid in live:
+            for prefix in self._short_prefixes(self.entries[eid][1]):
+                top = self.short_top[prefix]
+                if len(top) < SHORT_PREFIX_TOP:
+                    top.append(eid)
+
+    def _touch_short_top(self, eid: int):
+        """Replace une entrée (nouvelle ou dont le poids a changé) dans les listes de préfixes courts."""
+        for prefix in self._short_prefixes(self.entries[eid][1]):
+            top = [e for e in self.short_top.get(prefix, []) if e != eid and e not in self.dead] + [eid]
+            top.sort(key=lambda e: (-self._weight(e), e))
+            self.short_top[prefix] = top[:SHORT_PREFIX_TOP]
+
+    def update_players(self, names: List[str]):
+        """
+        Écouteur d'écriture : relit les joueurs modifiés et leurs alias. Lecture et écriture se
+        font sous le verrou, dans l'ordre des notifications. Avant la construction, rien à faire :
+        le SELECT de build() verra l'écriture, déjà validée.
+        """
+        if not names:
+            return
+        with self._lock:
+            if not self.built_at:
+                return
+            conn = database.get_db_connection()
+            try:
+                rows, aliases = [], []
+                for i in range(0, len(names), 500):
+                    chunk = names[i:i + 500]
+                    found = conn.execute(
+                        "SELECT id, name, current_club, position, nationality, market_value_eur "
+                        f"FROM players WHERE name IN ({','.join('?' * len(chunk))})", chunk).fetchall()
+                    rows.extend(found)
+                    ids = [row["id"] for row in found]
+                    if ids:
+                        aliases.extend(conn.execute(
+                            f"SELECT alias_key, alias, player_id FROM player_aliases WHERE player_id IN ({','.join('?' * len(ids))})",
+                            ids).fetchall())
+            finally:
+                conn.close()
+            for row in rows:
+                previous = self.players.get(row["id"])
+                self._set_player(row)
+                key = fold_name(row["name"])
+                if previous is not None and fold_name(previous[0]) != key:
+                    # Joueur renommé : l'ancien nom ne doit plus être proposé
+                    old = self.entry_of.get((row["id"], fold_name(previous[0])))
+                    if old is not None:
+                        self._kill(old)
+                eid = self._add_entry(row["id"], key, None)
+                if previous is not None and previous[4] != self.players[row["id"]][4]:
+                    self._touch_short_top(eid)
+            for alias_key, alias, player_id in aliases:
+                current = self.alias_entry.get(alias_key)
+                if current is not None and self.entries[current][0] != player_id:
+                    self._kill(current)  # alias réattribué à un autre joueur
+                self.alias_entry[alias_key] = self._add_entry(player_id, alias_key, alias)
+
+    def is_stale(self) -> bool:
+        return AUTOCOMPLETE_MAX_AGE > 0 and time.monotonic() - self.built_at > AUTOCOMPLETE_MAX_AGE
+
+    # --- Requêtes ---
+
+    def _word_range(self, prefix: str) -> Tuple[int, int]:
+        return (bisect.bisect_left(self.words, (prefix, -1)),
+                bisect.bisect_left(self.words, (prefix + "\uffff", -1)))
+
+    def _prefix_matches(self, words: List[str]) -> List[int]:
+        """Entrées dont chaque mot saisi commence un mot du nom (le dernier peut être incomplet)."""
+        if len(words) == 1 and len(words[0]) <= SHORT_PREFIX_LENGTH:
+            return [e for e in self.short_top.get(words[0], []) if e not in self.dead]
+        # Le mot saisi le plus sélectif (plage la plus courte dans la liste triée) guide le parcours
+        start, end = min((self._word_range(w) for w in set(words)), key=lambda r: r[1] - r[0])
+        # " mot" contenu dans " nom replié" <=> un mot du nom commence par ce mot
+        needles = [" " + w for w in words]
+        matches = []
+        for _, eid in self.words[start:min(end, start + MAX_PREFIX_SCAN)]:
+            if eid in self.dead:
+                continue
+            entry_key = " " + self.entries[eid][1]
+            if all(needle in entry_key for needle in needles):
+                matches.append(eid)
+        return matches
+
+    def _fuzzy_matches(self, key: str) -> List[Tuple[int, float]]:
+        """
+        Entrées qui partagent au moins MIN_FUZZY_SCORE des trigrammes de la saisie. Une telle
+        entrée apparaît forcément dans l'une des (m - seuil + 1) listes les plus courtes : seules
+        celles-ci sont parcourues, puis les meilleurs candidats sont vérifiés sur tous les trigrammes.
+        """
+        grams = trigrams(key, partial_last=True)
+        if not grams:
+            return []
+        needed = math.ceil(MIN_FUZZY_SCORE * len(grams))
+        lists = sorted((self.postings.get(g, []) for g in grams), key=len)[:len(grams) - needed + 1]
+        counts: Counter = Counter()
+        budget = MAX_FUZZY_POSTINGS
+        for postings in lists:
+            counts.update(postings[:budget])
+            budget -= len(postings)
+            if budget <= 0:
+                break
+        query = grams
+        matches = []
+        for eid, _ in counts.most_common(MAX_FUZZY_VERIFIED):
+            if eid in self.dead:
+                continue
+            entry = trigrams(self.entries[eid][1])
+            shared = len(query & entry)
+            if shared >= needed:
+                # Part de la saisie retrouvée, puis part du nom couverte (préfère les noms courts)
+                matches.append((eid, shared / len(query) + 0.1 * shared / len(entry)))
+        return matches
+
+    def search(self, query: str, limit: int = 8) -> List[Dict[str, Any]]:
+        key = fold_name(query)
+        if not key:
+            return []
+        words = key.split()
+        best: Dict[int, Tuple[float, int]] = {}  # joueur -> (score, entrée)
+
+        def offer(eid: int, score: float):
+            player_id = self.entries[eid][0]
+            if player_id not in best or score > best[player_id][0]:
+                best[player_id] = (score, eid)
+
+        with self._lock:
+            for eid in self._prefix_matches(words):
+                entry_key = self.entries[eid][1]
+                if entry_key == key:
+                    offer(eid, SCORE_EXACT)
+                elif entry_key.startswith(key):
+                    offer(eid, SCORE_NAME_PREFIX)
+                else:
+                    offer(eid, SCORE_WORD_PREFIX)
+            if len(best) < limit and len(key) >= 3:
+                for eid, score in self._fuzzy_matches(key):
+                    offer(eid, score)
+
+            ranked = sorted(best.items(), key=lambda item: (-item[1][0], -self.players[item[0]][4], item[0]))[:limit]
+            results = []
+            for player_id, (score, eid) in ranked:
+                name, club, position, nationality, _ = self.players[player_id]
+                results.append({
+                    "player_id": player_id, "name": name, "current_club": club, "position": position,
+                    "nationality": nationality, "matched_alias": self.entries[eid][2], "score": round(score, 3),
+                })
+        return results
+
+_index: Optional[AutocompleteIndex] = None
+_index_lock = threading.Lock()
+
+def get_index() -> AutocompleteIndex:
+    """
+    Index partagé du processus, construit au premier appel (ou au démarrage de l'API) et tenu
+    à jour par les écritures. Une reconstruction (AUTOCOMPLETE_MAX_AGE) se fait dans un nouvel
+    index : pendant ce temps, les autres requêtes continuent d'interroger l'ancien.
+    """
+    global _index
+    index = _index
+    if index is None or index.is_stale():
+        if _index_lock.acquire(blocking=index is None):
+            try:
+                if _index is None or _index.is_stale():
+                    fresh = AutocompleteIndex()
+                    database.add_player_write_listener(fresh.update_players)
+                    fresh.build()
+                    if _index is not None:
+                        database.remove_player_write_listener(_index.update_players)
+                    _index = fresh
+            finally:
+                _index_lock.release()
+        index = _index
+    return index
+
+def suggest(query: str, limit: int = 8) -> List[Dict[str, Any]]:
+    """Joueurs connus correspondant à une saisie partielle, du plus au moins pertinent."""
+    return get_index().search(query, limit)
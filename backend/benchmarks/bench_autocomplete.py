@@ -0,0 +1,94 @@
+# Filename: backend/benchmarks/bench_autocomplete.py
+# Description: Benchmark de l'autocomplétion des noms de joueurs (préfixes, fautes de frappe, accents).
+#
+# Usage (depuis backend/) :
+#   python -m benchmarks.bench_autocomplete
+#   python -m benchmarks.bench_autocomplete --players 100000 --queries 2000
+#
+# Mesures sur une base temporaire de joueurs synthétiques (plus quelques noms accentués) :
+#   - construction de l'index au démarrage,
+#   - latence p50 / p99 par type de saisie, comparée à la recherche LIKE de /players?name=...,
+#   - surcoût de la mise à jour de l'index lors d'une sauvegarde individuelle.
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import database  # noqa: E402
+import autocomplete  # noqa: E402
+from benchmarks.bench_bulk_upsert import make_players  # noqa: E402
+
+NAMED_PLAYERS = [
+    ("Kylian Mbappé", "€180.00m"), ("Martin Ødegaard", "€110.00m"), ("Jérémy Doku", "€65.00m"),
+    ("Luka Modrić", "€10.00m"), ("Erling Haaland", "€180.00m"), ("Vinícius Júnior", "€180.00m"),
+]
+
+# (type de saisie, saisies) ; la saisie suivante est choisie à tour de rôle
+QUERIES = [
+    ("préfixe court", ["k", "ma", "er", "vi"]),
+    ("préfixe", ["mbap", "haal", "kyl mb", "player 4242"]),
+    ("sans accent", ["odegaard", "modric", "vinicius jun", "jeremy d"]),
+    ("faute de frappe", ["mbape", "halaand", "odegard", "vinicus"]),
+]
+
+def percentiles(samples: list) -> str:
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return f"p50 {statistics.median(samples) * 1000:.3f} ms, p99 {p99 * 1000:.3f} ms"
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'autocomplétion des joueurs")
+    parser.add_argument("--players", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2000, help="Saisies mesurées par type")
+    parser.add_argument("--updates", type=int, default=200, help="Sauvegardes individuelles mesurées")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database.DB_PATH = os.path.join(tmp_dir, "autocomplete.db")
+        database.init_db()
+        database.save_players_bulk(make_players(args.players))
+        for name, value in NAMED_PLAYERS:
+            database.save_player_to_db({"name": name, "market_value": value, "position": "Centre-Forward"})
+
+        start = time.perf_counter()
+        index = autocomplete.get_index()
+        print(f"Index construit en {time.perf_counter() - start:.2f} s "
+              f"({len(index.entries)} noms et alias, {len(index.postings)} trigrammes)\n")
+
+        for label, queries in QUERIES:
+            samples = []
+            for i in range(args.queries):
+                start = time.perf_counter()
+                autocomplete.suggest(queries[i % len(queries)])
+                samples.append(time.perf_counter() - start)
+            top = [r["name"] for r in autocomplete.suggest(queries[0], 3)]
+            print(f"{label:<16} {percentiles(samples)}  ({queries[0]!r} -> {top})")
+
+        samples = []
+        for i in range(max(10, args.queries // 20)):
+            start = time.perf_counter()
+            database.list_players({"name": "mbap"})
+            samples.append(time.perf_counter() - start)
+        print(f"{'LIKE (référence)':<16} {percentiles(samples)}  (/players?name=mbap, sans accent ni faute tolérés)")
+
+        with_index = []
+        for player in make_players(args.updates, offset=args.players):
+            start = time.perf_counter()
+            database.save_player_to_db(player)
+            with_index.append(time.perf_counter() - start)
+        database.remove_player_write_listener(index.update_players)
+        without_index = []
+        for player in make_players(args.updates, offset=args.players * 2):
+            start = time.perf_counter()
+            database.save_player_to_db(player)
+            without_index.append(time.perf_counter() - start)
+        print(f"\nsave_player_to_db : {statistics.median(without_index) * 1000:.2f} ms sans index, "
+              f"{statistics.median(with_index) * 1000:.2f} ms avec mise à jour de l'index")
+
+if __name__ == "__main__":
+    main()
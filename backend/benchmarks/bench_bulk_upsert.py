@@ -0,0 +1,78 @@
+# Filename: backend/benchmarks/bench_bulk_upsert.py
+# Description: Compare le débit (joueurs/s) de save_player_to_db et save_players_bulk.
+#
+# Usage (depuis backend/) :
+#   python -m benchmarks.bench_bulk_upsert --sizes 10000 100000 --batch-size 500
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import database  # noqa: E402
+
+POSITIONS = ["Goalkeeper", "Defender", "Midfielder", "Forward"]
+COUNTRIES = ["France", "Spain", "England", "Brazil", "Argentina", "Germany", "Morocco"]
+
+def make_players(count: int, offset: int = 0):
+    """Génère des joueurs synthétiques au format produit par le scraper."""
+    for i in range(offset, offset + count):
+        yield {
+            "name": f"Benchmark Player {i}",
+            "age": 17 + i % 20,
+            "nationality": COUNTRIES[i % len(COUNTRIES)],
+            "current_club": f"Club {i % 300}",
+            "position": POSITIONS[i % len(POSITIONS)],
+            "market_value": f"€{(i % 900) / 10:.2f}m",
+            "height": f"1.{70 + i % 25} m",
+            "goals": i % 31,
+            "assists": i % 17,
+            "appearances": i % 45,
+            "minutes_played": (i % 45) * 80,
+        }
+
+def run_single(count: int) -> float:
+    start = time.perf_counter()
+    for player in make_players(count):
+        database.save_player_to_db(player)
+    return time.perf_counter() - start
+
+def run_bulk(count: int, batch_size: int) -> float:
+    start = time.perf_counter()
+    saved = database.save_players_bulk(make_players(count), batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    assert len(saved) == count, f"{len(saved)} ids retournés pour {count} joueurs"
+    return elapsed
+
+def _fresh_db(tmp_dir: str, label: str):
+    database.DB_PATH = os.path.join(tmp_dir, f"{label}.db")
+    if os.path.exists(database.DB_PATH):
+        os.remove(database.DB_PATH)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des insertions de joueurs")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--batch-size", type=int, default=database.BULK_BATCH_SIZE)
+    parser.add_argument("--skip-single", action="store_true",
+                        help="Ne mesure pas save_player_to_db (très lent à 100k)")
+    args = parser.parse_args()
+
+    print(f"SQLite {database.sqlite3.sqlite_version} | RETURNING={database.SUPPORTS_RETURNING}")
+    print(f"{'joueurs':>8} | {'fonction':<20} | {'durée (s)':>10} | {'joueurs/s':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in args.sizes:
+            if not args.skip_single:
+                _fresh_db(tmp_dir, f"single_{size}")
+                elapsed = run_single(size)
+                print(f"{size:>8} | {'save_player_to_db':<20} | {elapsed:>10.2f} | {size / elapsed:>10.0f}")
+
+            _fresh_db(tmp_dir, f"bulk_{size}")
+            elapsed = run_bulk(size, args.batch_size)
+            print(f"{size:>8} | {'save_players_bulk':<20} | {elapsed:>10.2f} | {size / elapsed:>10.0f}")
+
+if __name__ == "__main__":
+    main()
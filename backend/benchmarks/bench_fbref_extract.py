@@ -0,0 +1,94 @@
+# Filename: backend/benchmarks/bench_fbref_extract.py
+# Description: Compare le parsing complet d'une page FBref et l'extraction ciblée de stats_standard.
+#
+# Usage (depuis backend/) :
+#   python -m benchmarks.bench_fbref_extract pages/bellingham.html pages/yamal.html
+#   python -m benchmarks.bench_fbref_extract            # page synthétique de ~4 Mo
+#
+# Les pages enregistrées s'obtiennent avec "Enregistrer sous" ou curl sur une page joueur FBref.
+# Le pic mémoire est mesuré avec tracemalloc (allocations Python, y compris celles de BeautifulSoup).
+
+import argparse
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from scraping.fbref_tables import HAS_LXML, extract_standard_rows  # noqa: E402
+
+def legacy_extract(page_html: str) -> list:
+    """Reproduit l'ancienne approche : dé-commentaire + parsing complet + select_one par cellule."""
+    soup = BeautifulSoup(re.sub(r"<!--|-->", "", page_html), "html.parser")
+    soup.get_text(" ", strip=True)  # vérification du club sur tout le texte
+    table = soup.select_one("table#stats_standard_dom_lg") or soup.select_one("table#stats_standard")
+    rows = []
+    for row in table.select("tbody tr") if table else []:
+        if "thead" in row.get("class", []):
+            continue
+        rows.append({
+            stat: (cell.get_text(strip=True) if cell else "")
+            for stat in ("season", "squad", "games", "minutes", "goals", "assists")
+            for cell in [row.select_one(f'[data-stat="{stat}"]')]
+        })
+    return rows
+
+def synthetic_page(seasons: int = 15, filler_tables: int = 40) -> str:
+    """Page joueur factice de taille comparable à FBref (tables annexes commentées)."""
+    def table(table_id, rows):
+        body = "".join(
+            f'<tr><th data-stat="season">{2010 + i}-{2011 + i}</th>'
+            f'<td data-stat="age">{18 + i}</td><td data-stat="squad"><a href="#">Club {i % 4}</a></td>'
+            f'<td data-stat="comp_level">1. Premier League</td><td data-stat="games">{30 + i % 8}</td>'
+            f'<td data-stat="minutes">{2400 + i * 13:,}</td><td data-stat="goals">{i % 20}</td>'
+            f'<td data-stat="assists">{i % 11}</td>' + "".join(
+                f'<td data-stat="extra_{k}">{k * i}</td>' for k in range(25)
+            ) + '</tr>'
+            for i in range(rows)
+        )
+        return f'<div class="table_container"><table id="{table_id}"><thead><tr><th>Season</th></tr></thead><tbody>{body}</tbody></table></div>'
+
+    filler = "".join(f"<!-- {table(f'stats_other_{n}', 60)} -->" for n in range(filler_tables))
+    nav = "".join(f'<li><a href="/en/squads/{n}">Squad {n}</a></li>' for n in range(3000))
+    return (
+        f"<html><head><title>Player</title></head><body><ul>{nav}</ul>{filler}"
+        f"<!-- {table('stats_standard', seasons)} --></body></html>"
+    )
+
+def measure(fn, page_html: str, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = fn(page_html)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(page_html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, len(rows)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'extraction FBref")
+    parser.add_argument("pages", nargs="*", help="Pages FBref enregistrées (HTML)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = [(path, open(path, encoding="utf-8").read()) for path in args.pages]
+    if not pages:
+        pages = [("synthetique", synthetic_page())]
+
+    print(f"lxml disponible: {HAS_LXML}")
+    print(f"{'page':<24} | {'taille':>8} | {'méthode':<10} | {'temps (ms)':>10} | {'pic mém. (Mo)':>13} | lignes")
+    for name, page_html in pages:
+        size_mb = len(page_html.encode("utf-8")) / 1e6
+        for label, fn in (("complet", legacy_extract), ("ciblé", extract_standard_rows)):
+            elapsed, peak, count = measure(fn, page_html, args.repeat)
+            print(f"{os.path.basename(name)[:24]:<24} | {size_mb:>6.2f}Mo | {label:<10} | "
+                  f"{elapsed * 1000:>10.1f} | {peak / 1e6:>13.1f} | {count}")
+
+if __name__ == "__main__":
+    main()
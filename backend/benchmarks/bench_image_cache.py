@@ -0,0 +1,130 @@
+# Filename: backend/benchmarks/bench_image_cache.py
+# Description: Benchmark du cache des photos de joueurs (GET /player/{id}/photo).
+#
+# Usage (depuis backend/) :
+#   python -m benchmarks.bench_image_cache
+#   python -m benchmarks.bench_image_cache --size-kb 3000 --latency-ms 300 --requests 200
+#
+# Un serveur HTTP local joue le rôle de Wikimedia (latence ajoutée, image de --size-kb Ko,
+# 404 pour une photo supprimée). Mesures via TestClient :
+#   - téléchargement direct de l'image distante (ce que faisait le navigateur à chaque affichage),
+#   - premier appel du proxy (téléchargement, copie disque, variante),
+#   - appels suivants (variante lue sur disque) et revalidation If-None-Match -> 304,
+#   - joueur sans photo et photo introuvable (échec mémorisé : aucune requête distante).
+# Sans Pillow, l'image d'origine est servie sans redimensionnement.
+
+import argparse
+import io
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import database  # noqa: E402
+from benchmarks.bench_bulk_upsert import make_players  # noqa: E402
+
+def median_ms(run, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+def make_image(size_kb: int) -> bytes:
+    """JPEG d'environ size_kb Ko (bruit aléatoire) avec Pillow, sinon octets aléatoires."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return os.urandom(size_kb * 1024)
+    side = int((size_kb * 1024 / 1.5) ** 0.5)
+    out = io.BytesIO()
+    Image.frombytes("RGB", (side, side), os.urandom(side * side * 3)).save(out, "JPEG", quality=95)
+    return out.getvalue()
+
+def start_server(image: bytes, latency: float):
+    hits = {"count": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits["count"] += 1
+            time.sleep(latency)
+            if self.path.startswith("/missing"):
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(image)))
+            self.end_headers()
+            self.wfile.write(image)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, hits
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du cache des photos de joueurs")
+    parser.add_argument("--size-kb", type=int, default=3000, help="Taille de l'image distante")
+    parser.add_argument("--latency-ms", type=float, default=200, help="Latence du serveur distant")
+    parser.add_argument("--requests", type=int, default=100, help="Requêtes mesurées par cas")
+    args = parser.parse_args()
+
+    image = make_image(args.size_kb)
+    server, hits = start_server(image, args.latency_ms / 1000)
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database.DB_PATH = os.path.join(tmp_dir, "image_cache.db")
+        database.init_db()
+        database.save_players_bulk(make_players(3))
+        database.update_player_field("Benchmark Player 0", "image_url", f"{base}/wiki/Special:FilePath/Player.jpg")
+        database.update_player_field("Benchmark Player 1", "image_url", f"{base}/missing/Player.jpg")
+        ids = {p["name"]: p["id"] for p in database.list_players()}
+        with_photo, broken, without = (ids[f"Benchmark Player {i}"] for i in range(3))
+
+        import image_cache
+        image_cache.IMAGE_CACHE_DIR = os.path.join(tmp_dir, "images")
+        from fastapi.testclient import TestClient
+        import main as api
+        import requests
+        with TestClient(api.app) as client:
+            import autocomplete
+            autocomplete.get_index()
+            print(f"Pillow : {'oui' if image_cache.resizing_available() else 'non (image servie sans redimensionnement)'}")
+
+            direct = median_ms(lambda: requests.get(f"{base}/wiki/Special:FilePath/Player.jpg"), 5)
+            print(f"Image distante      : {direct:8.2f} ms, {len(image) / 1024:.0f} Ko à chaque affichage")
+
+            url = f"/player/{with_photo}/photo?w=400"
+            start = time.perf_counter()
+            first = client.get(url, headers={"Accept": "image/webp"})
+            cold = (time.perf_counter() - start) * 1000
+            print(f"Proxy, 1er appel    : {cold:8.2f} ms ({first.headers['content-type']}, {len(first.content) / 1024:.0f} Ko)")
+            warm = median_ms(lambda: client.get(url, headers={"Accept": "image/webp"}), args.requests)
+            print(f"Proxy, depuis disque: {warm:8.2f} ms")
+            etag = first.headers["etag"]
+            revalidated = median_ms(lambda: client.get(url, headers={"Accept": "image/webp", "If-None-Match": etag}),
+                                    args.requests)
+            print(f"Proxy, 304          : {revalidated:8.2f} ms (Cache-Control: {first.headers['cache-control']})")
+
+            no_photo = median_ms(lambda: client.get(f"/player/{without}/photo"), args.requests)
+            print(f"Joueur sans photo   : {no_photo:8.2f} ms (404)")
+            client.get(f"/player/{broken}/photo")
+            before = hits["count"]
+            negative = median_ms(lambda: client.get(f"/player/{broken}/photo"), args.requests)
+            print(f"Photo introuvable   : {negative:8.2f} ms (404 mémorisé, "
+                  f"{hits['count'] - before} requête(s) distante(s) sur {args.requests})")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# Filename: backend/benchmarks/bench_leaderboards.py
+# Description: Benchmark des classements précalculés face au tri côté client de /analytics/player-stats.
+#
+# Usage (depuis backend/) :
+#   python -m benchmarks.bench_leaderboards
+#   python -m benchmarks.bench_leaderboards --players 100000 --pages 500 --limit 20
+#
+# Mesures sur une base temporaire de joueurs synthétiques :
+#   - top 20 des buteurs d'un poste : lecture de tous les joueurs du poste puis tri en Python
+#     (ce que fait aujourd'hui un client de /analytics/player-stats) contre une page du classement,
+#   - parcours complet d'un classement page par page (curseur),
+#   - surcoût de la mise à jour des classements lors d'une sauvegarde individuelle.
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import database  # noqa: E402
+from benchmarks.bench_bulk_upsert import make_players  # noqa: E402
+
+def analytics_top(position: str, limit: int) -> list:
+    """Équivalent de /analytics/player-stats?position=... suivi d'un tri par buts côté client."""
+    conn = database.get_db_connection()
+    rows = [dict(row) for row in conn.execute("SELECT * FROM players WHERE position LIKE ?", (f"%{position}%",))]
+    conn.close()
+    return sorted(rows, key=lambda p: (-(p.get('goals') or 0), p['id']))[:limit]
+
+def walk(metric: str, dimension: str, group_key: str, limit: int) -> int:
+    after, total = None, 0
+    while True:
+        rows = database.get_leaderboard(metric, dimension, group_key, limit, after)
+        total += len(rows)
+        if len(rows) < limit:
+            return total
+        after = (rows[-1]["value"], rows[-1]["player_id"])
+
+def median_ms(run, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des classements de joueurs")
+    parser.add_argument("--players", type=int, default=100_000)
+    parser.add_argument("--pages", type=int, default=200, help="Pages lues par mesure")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--updates", type=int, default=200, help="Sauvegardes individuelles mesurées")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database.DB_PATH = os.path.join(tmp_dir, "leaderboards.db")
+        database.init_db()
+        start = time.perf_counter()
+        database.save_players_bulk(make_players(args.players))
+        print(f"{args.players} joueurs insérés (métriques et classements compris) en {time.perf_counter() - start:.1f} s")
+        conn = database.get_db_connection()
+        entries = conn.execute("SELECT COUNT(*) FROM leaderboard_entries").fetchone()[0]
+        conn.close()
+        print(f"{entries} entrées de classement (LEADERBOARD_SIZE={database.LEADERBOARD_SIZE})\n")
+
+        scan = median_ms(lambda: analytics_top("Forward", args.limit), max(3, args.pages // 50))
+        page = median_ms(lambda: database.get_leaderboard("goals", "position", "forward", args.limit), args.pages)
+        print(f"Top {args.limit} buteurs attaquants : {scan:.1f} ms (lecture + tri Python), "
+              f"{page:.2f} ms (classement précalculé)")
+        full = median_ms(lambda: walk("goals_per90", "nationality", "France", args.limit), max(3, args.pages // 10))
+        print(f"Parcours complet d'un classement par pages de {args.limit} : {full:.2f} ms")
+
+        with_boards = []
+        for player in make_players(args.updates, offset=args.players):
+            start = time.perf_counter()
+            database.save_player_to_db(player)
+            with_boards.append(time.perf_counter() - start)
+        refresh = database._refresh_leaderboards
+        database._refresh_leaderboards = lambda conn, player_ids: None
+        try:
+            without_boards = []
+            for player in make_players(args.updates, offset=args.players * 2):
+                start = time.perf_counter()
+                database.save_player_to_db(player)
+                without_boards.append(time.perf_counter() - start)
+        finally:
+            database._refresh_leaderboards = refresh
+        print(f"save_player_to_db : {statistics.median(without_boards) * 1000:.2f} ms sans classements, "
+              f"{statistics.median(with_boards) * 1000:.2f} ms avec mise à jour des classements")
+
+if __name__ == "__main__":
+    main()
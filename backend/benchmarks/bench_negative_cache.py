@@ -0,0 +1,113 @@
+# Filename: backend/benchmarks/bench_negative_cache.py
+# Description: Benchmark du cache négatif des sources de scraping et des disjoncteurs par hôte.
+#
+# Usage (depuis backend/) :
+#   python -m benchmarks.bench_negative_cache
+#   python -m benchmarks.bench_negative_cache --latency-ms 300 --runs 20
+#
+# Un serveur HTTP local simule deux sites : le premier (127.0.0.1) répond 404 à toutes les
+# recherches (joueur introuvable, 4 requêtes par recherche comme les variantes Wikipedia),
+# le second (localhost) répond 503 (site en panne). Un moteur de sources (ScrapeEngine)
+# interroge les deux à chaque recherche du même nom. Mesures :
+#   - durée d'une recherche introuvable : première fois, puis absence mémorisée,
+#   - progression exponentielle de la durée de mémorisation,
+#   - requêtes envoyées au site en panne sur --runs recherches, avec et sans disjoncteur.
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from scraping import http_client  # noqa: E402
+from scraping.engine import ScrapeEngine, SourceAdapter, TTLCache  # noqa: E402
+
+def start_server(latency: float):
+    hits = {"127.0.0.1": 0, "localhost": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            host = self.headers.get("Host", "").split(":")[0]
+            hits[host] = hits.get(host, 0) + 1
+            time.sleep(latency)
+            self.send_response(503 if host == "localhost" else 404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, hits
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du cache négatif et des disjoncteurs")
+    parser.add_argument("--latency-ms", type=float, default=200, help="Latence de chaque réponse du serveur")
+    parser.add_argument("--runs", type=int, default=20, help="Recherches du même nom")
+    args = parser.parse_args()
+
+    server, hits = start_server(args.latency_ms / 1000)
+    port = server.server_port
+
+    def search(ctx: dict) -> dict | None:
+        # Quatre variantes du nom, comme scrape_wikipedia_image
+        for variant in (ctx["name"], ctx["name"].replace(" ", "_"), ctx["name"].lower(), ctx["name"].split()[0]):
+            resp = http_client.get(f"http://127.0.0.1:{port}/search/{variant}", source="bench_search")
+            if resp.status_code == 200:
+                return {"found": True}
+        return None
+
+    def broken(ctx: dict) -> dict | None:
+        try:
+            resp = http_client.get(f"http://localhost:{port}/player/{ctx['name']}", source="bench_broken")
+        except http_client.CircuitOpen:
+            return None
+        return {"broken": True} if resp.status_code == 200 else None
+
+    engine = ScrapeEngine([
+        SourceAdapter("search", search, outputs=("found",), ttl=3600, negative_ttl=3600),
+        SourceAdapter("broken", broken, outputs=("broken",), ttl=3600, negative_ttl=3600),
+    ], cache=TTLCache(name="bench_scrape"), negative_cache=TTLCache(name="bench_scrape_negative"))
+
+    timings = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        engine.run({"name": "Zzyzx Qwerty"})
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"Recherche introuvable : {timings[0]:.1f} ms la première fois, "
+          f"{statistics.median(timings[1:]):.3f} ms ensuite (médiane sur {args.runs - 1})")
+    print(f"Requêtes au site sans résultat : {hits['127.0.0.1']} sur {args.runs} recherches "
+          f"(4 par recherche sans cache négatif : {4 * args.runs})")
+
+    # Progression : chaque nouvelle absence double la durée de mémorisation
+    key = engine.adapters[0].cache_key({"name": "Zzyzx Qwerty"})
+    durations = []
+    for _ in range(6):
+        entry = engine.negative_cache.get(key)
+        durations.append(entry["until"] - time.time())
+        # Fin de l'absence mémorisée : la recherche suivante interroge à nouveau la source
+        engine.negative_cache.set(key, {**entry, "until": 0}, 60)
+        engine.run({"name": "Zzyzx Qwerty"})
+    print("Durée de mémorisation après chaque absence (h) : "
+          + ", ".join(f"{d / 3600:.0f}" for d in durations))
+
+    # Disjoncteur : le site en panne n'est plus interrogé après CIRCUIT_FAILURES échecs
+    for label, threshold in (("sans disjoncteur", 0), ("avec disjoncteur", http_client.CIRCUIT_FAILURES or 5)):
+        http_client.CIRCUIT_FAILURES = threshold
+        http_client.circuit_breaker.reset()
+        before, seconds = hits["localhost"], engine.get_stats()["broken"]["seconds"]
+        for i in range(args.runs):
+            # Noms distincts d'une passe à l'autre (aucune absence déjà mémorisée)
+            engine.run({"name": f"Player {threshold} {i}"})
+        elapsed = engine.get_stats()["broken"]["seconds"] - seconds
+        print(f"Site en panne, {label} : {hits['localhost'] - before} requêtes sur {args.runs} recherches, "
+              f"{elapsed * 1000 / args.runs:.1f} ms par recherche passés sur ce site")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
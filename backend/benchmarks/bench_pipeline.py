@@ -0,0 +1,137 @@
+# Filename: backend/benchmarks/bench_pipeline.py
+# Description: Benchmark de bout en bout de scrape_and_save_player_data, hors ligne, sur un panel de joueurs.
+#
+# Usage (depuis backend/) :
+#   # 1) enregistrer une fois les échanges HTTP (réseau + OPENAI_API_KEY nécessaires)
+#   python -m benchmarks.bench_pipeline --record --fixtures benchmarks/fixtures
+#   # 2) rejouer autant que nécessaire, sans réseau, avec une latence simulée
+#   python -m benchmarks.bench_pipeline --fixtures benchmarks/fixtures --latency-ms 80
+#
+# Mesures : latence bout en bout (p50/p95/max), temps par étape du moteur de sources,
+# requêtes HTTP par source et pic d'allocations Python (tracemalloc) par joueur.
+# Chaque passe part de caches vides et d'une base SQLite temporaire.
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import database  # noqa: E402
+from scraping import http_client, scraper  # noqa: E402
+
+PANEL = [
+    "Jude Bellingham", "Lamine Yamal", "Kylian Mbappé", "Erling Haaland", "Vinícius Júnior",
+    "Pedri", "Gavi", "Florian Wirtz", "Jamal Musiala", "Bukayo Saka",
+    "Phil Foden", "Rodri", "Declan Rice", "Martin Ødegaard", "Mohamed Salah",
+    "Virgil van Dijk", "Trent Alexander-Arnold", "Harry Kane", "Son Heung-min", "Bruno Fernandes",
+    "Kevin De Bruyne", "Bernardo Silva", "Rúben Dias", "Josko Gvardiol", "William Saliba",
+    "Achraf Hakimi", "Ousmane Dembélé", "Warren Zaïre-Emery", "Bradley Barcola", "Victor Osimhen",
+    "Khvicha Kvaratskhelia", "Lautaro Martínez", "Nicolò Barella", "Alessandro Bastoni", "Rafael Leão",
+    "Theo Hernández", "Federico Valverde", "Eduardo Camavinga", "Aurélien Tchouaméni", "Antoine Griezmann",
+    "Jan Oblak", "Robert Lewandowski", "Frenkie de Jong", "Ronald Araújo", "Xavi Simons",
+    "Cole Palmer", "Enzo Fernández", "Moisés Caicedo", "Alexander Isak", "Fredy Guarín",
+]
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def reset_caches():
+    scraper.ENGINE.cache.clear()
+    scraper.ENGINE.negative_cache.clear()
+    http_client.circuit_breaker.reset()
+    scraper._wd_label_cache.clear()
+
+def stage_seconds() -> dict:
+    return {name: s["seconds"] for name, s in scraper.ENGINE.get_stats().items()}
+
+def run_panel(players: list, allocations: bool, verbose: bool) -> list:
+    """Scrape chaque joueur ; retourne [(nom, secondes, {étape: secondes}, pic mémoire, ok)]."""
+    results = []
+    if allocations:
+        tracemalloc.start()
+    for name in players:
+        before = stage_seconds()
+        if allocations:
+            tracemalloc.reset_peak()
+        out = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(sys.stdout if verbose else out):
+            saved = scraper.scrape_and_save_player_data(name)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if allocations else 0
+        after = stage_seconds()
+        stages = {stage: after[stage] - before.get(stage, 0.0) for stage in after}
+        results.append((name, elapsed, stages, peak, bool(saved and saved.get("id"))))
+    if allocations:
+        tracemalloc.stop()
+    return results
+
+def report(results: list, allocations: bool):
+    latencies = [r[1] for r in results]
+    print(f"\nJoueurs: {len(results)}  sauvegardés: {sum(r[4] for r in results)}")
+    print(f"Bout en bout (s) : total={sum(latencies):.2f}  p50={percentile(latencies, 50):.3f}  "
+          f"p95={percentile(latencies, 95):.3f}  max={max(latencies):.3f}")
+
+    print(f"\n{'étape':<14} | {'total (s)':>9} | {'moyenne (ms)':>12} | {'p95 (ms)':>9}")
+    for stage in scraper.ENGINE.get_stats():
+        values = [r[2].get(stage, 0.0) for r in results]
+        print(f"{stage:<14} | {sum(values):>9.2f} | {statistics.mean(values) * 1000:>12.1f} | "
+              f"{percentile(values, 95) * 1000:>9.1f}")
+
+    print(f"\n{'source HTTP':<14} | {'requêtes':>8} | {'erreurs':>7} | {'Mo':>7} | {'attente débit (s)':>17}")
+    for source, s in sorted(http_client.get_stats().items()):
+        print(f"{source:<14} | {s['requests']:>8} | {s['errors']:>7} | {s['bytes'] / 1e6:>7.2f} | "
+              f"{s['rate_limit_wait']:>17.2f}")
+
+    if allocations:
+        peaks = [r[3] / 1e6 for r in results]
+        print(f"\nPic d'allocations par joueur (Mo) : p50={percentile(peaks, 50):.1f}  "
+              f"p95={percentile(peaks, 95):.1f}  max={max(peaks):.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hors ligne du pipeline de scraping")
+    parser.add_argument("--fixtures", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures"),
+                        help="Dossier de l'archive des échanges HTTP")
+    parser.add_argument("--record", action="store_true", help="Interroge les vraies sources et archive les réponses")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latence ajoutée à chaque réponse rejouée")
+    parser.add_argument("--players", type=int, default=len(PANEL), help="Taille du panel (max 50)")
+    parser.add_argument("--repeat", type=int, default=1, help="Nombre de passes (caches vidés à chaque passe)")
+    parser.add_argument("--keep-rate-limits", action="store_true",
+                        help="Conserve les espacements par hôte en rejeu (désactivés par défaut)")
+    parser.add_argument("--no-allocations", action="store_true", help="Désactive tracemalloc (temps plus fidèles)")
+    parser.add_argument("--verbose", action="store_true", help="Affiche les logs du pipeline")
+    args = parser.parse_args()
+    if args.record:
+        from dotenv import load_dotenv
+        load_dotenv()  # OPENAI_API_KEY pour enregistrer les réponses de normalisation
+
+    players = PANEL[:args.players]
+    http_client.configure_mode("record" if args.record else "replay", args.fixtures, args.latency_ms)
+    if not args.record and not args.keep_rate_limits:
+        for adapter in scraper.SOURCES:
+            for host in adapter.hosts:
+                http_client.rate_limiter.configure(host, 0)
+
+    print(f"Mode: {http_client.HTTP_MODE}  archive: {args.fixtures}  latence: {args.latency_ms} ms")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for run in range(args.repeat):
+            database.DB_PATH = os.path.join(tmp_dir, f"pipeline_{run}.db")
+            reset_caches()
+            http_client.reset_stats()
+            results = run_panel(players, allocations=not args.no_allocations, verbose=args.verbose)
+            print(f"\n=== Passe {run + 1}/{args.repeat} ===")
+            report(results, allocations=not args.no_allocations)
+
+if __name__ == "__main__":
+    main()
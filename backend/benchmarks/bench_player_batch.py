@@ -0,0 +1,74 @@
+# Filename: backend/benchmarks/bench_player_batch.py
+# Description: Benchmark de la lecture groupée des joueurs (POST /players/batch) face aux appels unitaires.
+#
+# Usage (depuis backend/) :
+#   python -m benchmarks.bench_player_batch
+#   python -m benchmarks.bench_player_batch --players 100000 --shortlist 20
+#
+# Mesures sur une base temporaire de joueurs synthétiques, pour une liste de `--shortlist` joueurs :
+#   - un GET /players/{id} par joueur (fiche + métriques, deux connexions par joueur),
+#   - un POST /players/batch (une requête IN avec jointure des métriques), complet ou projeté.
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import database  # noqa: E402
+from benchmarks.bench_bulk_upsert import make_players  # noqa: E402
+
+def median_ms(run, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la lecture groupée des joueurs")
+    parser.add_argument("--players", type=int, default=100_000)
+    parser.add_argument("--shortlist", type=int, default=20, help="Joueurs demandés par appel")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--http", action="store_true", help="Mesure aussi les endpoints via TestClient")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database.DB_PATH = os.path.join(tmp_dir, "batch.db")
+        database.init_db()
+        database.save_players_bulk(make_players(args.players))
+        ids = random.Random(0).sample(range(1, args.players + 1), args.shortlist)
+        names = [f"Benchmark Player {i - 1}" for i in ids]
+
+        def one_by_one():
+            for player_id in ids:
+                database.get_player_by_id(player_id)
+                database.get_player_metrics(player_id)
+
+        unit = median_ms(one_by_one, args.repeat)
+        batch = median_ms(lambda: database.get_players_batch(ids, include_metrics=True), args.repeat)
+        by_name = median_ms(lambda: database.get_players_batch(names=names, include_metrics=True), args.repeat)
+        projected = median_ms(lambda: database.get_players_batch(ids, fields=["market_value_eur", "goals"]), args.repeat)
+        print(f"{args.shortlist} joueurs : {unit:.2f} ms un par un (fiche + métriques), "
+              f"{batch:.2f} ms groupés par ID, {by_name:.2f} ms groupés par nom, "
+              f"{projected:.2f} ms groupés et projetés (2 colonnes, sans métriques)")
+
+        if args.http:
+            from fastapi.testclient import TestClient
+            import main as api
+            with TestClient(api.app) as client:
+                # Attend la construction de l'index d'autocomplétion lancée au démarrage
+                import autocomplete
+                autocomplete.get_index()
+                unit = median_ms(lambda: [client.get(f"/players/{i}") for i in ids], max(3, args.repeat // 10))
+                batch = median_ms(lambda: client.post("/players/batch", json={"ids": ids, "include_metrics": True}),
+                                  max(3, args.repeat // 10))
+            print(f"HTTP : {unit:.1f} ms pour {args.shortlist} GET /players/{{id}}, {batch:.1f} ms pour un POST /players/batch")
+
+if __name__ == "__main__":
+    main()
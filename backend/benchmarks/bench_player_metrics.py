@@ -0,0 +1,98 @@
+# Filename: backend/benchmarks/bench_player_metrics.py
+# Description: Benchmark du calcul des métriques dérivées (par 90 minutes, rangs centiles par poste).
+#
+# Usage (depuis backend/) :
+#   python -m benchmarks.bench_player_metrics
+#   python -m benchmarks.bench_player_metrics --players 100000 --updates 200
+#
+# Mesures sur une base temporaire de joueurs synthétiques :
+#   - reconstruction complète de player_metrics (NumPy) comparée à PERCENT_RANK() en SQL pur,
+#   - surcoût de la mise à jour incrémentale lors d'une sauvegarde individuelle,
+#   - lecture des métriques d'un joueur et top 10 d'un poste sur l'index (poste, métrique).
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import database  # noqa: E402
+from benchmarks.bench_bulk_upsert import make_players  # noqa: E402
+
+def sql_window_rebuild(conn):
+    """Référence : mêmes rangs calculés par SQLite (une fonction de fenêtrage par métrique)."""
+    conn.create_function("position_group", 1, database.position_group, deterministic=True)
+    columns = ", ".join(database.PLAYER_METRICS)
+    ranks = ", ".join(
+        f"CASE WHEN position_group IS NOT NULL AND {m} IS NOT NULL THEN ROUND(100 * PERCENT_RANK() OVER "
+        f"(PARTITION BY position_group, {m} IS NULL ORDER BY {m}), 1) END"
+        for m in database.PLAYER_METRICS
+    )
+    return conn.execute(
+        f"SELECT player_id, position_group, {columns}, {ranks} FROM ({database._METRICS_BASE_SQL}) AS base"
+    ).fetchall()
+
+def timed_saves(players) -> list:
+    samples = []
+    for player in players:
+        start = time.perf_counter()
+        database.save_player_to_db(player)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des métriques dérivées des joueurs")
+    parser.add_argument("--players", type=int, default=100_000)
+    parser.add_argument("--updates", type=int, default=200, help="Sauvegardes individuelles mesurées")
+    parser.add_argument("--reads", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database.DB_PATH = os.path.join(tmp_dir, "metrics.db")
+        database.init_db()
+        start = time.perf_counter()
+        database.save_players_bulk(make_players(args.players))
+        print(f"{args.players} joueurs insérés (métriques comprises) en {time.perf_counter() - start:.1f} s")
+
+        conn = database.get_db_connection()
+        start = time.perf_counter()
+        database._rebuild_player_metrics(conn)
+        rebuild = time.perf_counter() - start
+        start = time.perf_counter()
+        reference = sql_window_rebuild(conn)
+        window = time.perf_counter() - start
+        stored = {row[0]: tuple(row) for row in conn.execute("SELECT * FROM player_metrics")}
+        width = 2 + 2 * len(database.PLAYER_METRICS)
+        mismatches = sum(tuple(row) != stored[row[0]][:width] for row in reference)
+        print(f"Reconstruction complète : {rebuild * 1000:.0f} ms "
+              f"(PERCENT_RANK() SQL, lecture seule : {window * 1000:.0f} ms, écarts : {mismatches})")
+
+        with_metrics = timed_saves(make_players(args.updates, offset=args.players))
+        refresh = database.refresh_player_metrics
+        database.refresh_player_metrics = lambda names=None: None
+        try:
+            without_metrics = timed_saves(make_players(args.updates, offset=args.players * 2))
+        finally:
+            database.refresh_player_metrics = refresh
+        print(f"save_player_to_db : {statistics.median(without_metrics) * 1000:.2f} ms sans métriques, "
+              f"{statistics.median(with_metrics) * 1000:.2f} ms avec mise à jour incrémentale")
+
+        start = time.perf_counter()
+        for i in range(args.reads):
+            database.get_player_metrics(1 + i % args.players)
+        print(f"get_player_metrics : {(time.perf_counter() - start) / args.reads * 1000:.3f} ms")
+
+        start = time.perf_counter()
+        for _ in range(args.reads):
+            conn.execute(
+                "SELECT player_id, goals_per90 FROM player_metrics WHERE position_group = ? "
+                "ORDER BY goals_per90 DESC LIMIT 10", ("forward",)
+            ).fetchall()
+        print(f"Top 10 attaquants (buts / 90 min) : {(time.perf_counter() - start) / args.reads * 1000:.3f} ms")
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# Filename: backend/benchmarks/bench_response_cache.py
+# Description: Benchmark du cache HTTP des lectures (ETag, 304, LRU des corps sérialisés).
+#
+# Usage (depuis backend/) :
+#   python -m benchmarks.bench_response_cache
+#   python -m benchmarks.bench_response_cache --players 20000 --requests 200
+#
+# Mesures via TestClient sur une base temporaire de joueurs synthétiques, pour /countries,
+# /players?country=... et /players/{id} :
+#   - sans cache (RESPONSE_CACHE_SIZE=0 et sans If-None-Match : l'endpoint s'exécute),
+#   - corps servi depuis le LRU,
+#   - revalidation If-None-Match -> 304 (ni lecture de la base ni corps),
+# ainsi que le coût de database.get_table_versions() sans écriture intermédiaire.
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import database  # noqa: E402
+from benchmarks.bench_bulk_upsert import make_players  # noqa: E402
+
+def median_ms(run, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du cache HTTP des lectures")
+    parser.add_argument("--players", type=int, default=20_000)
+    parser.add_argument("--requests", type=int, default=200, help="Requêtes mesurées par cas")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database.DB_PATH = os.path.join(tmp_dir, "response_cache.db")
+        database.init_db()
+        database.save_players_bulk(make_players(args.players))
+
+        from fastapi.testclient import TestClient
+        import main as api
+        import response_cache
+        with TestClient(api.app) as client:
+            # Attend la construction de l'index d'autocomplétion lancée au démarrage
+            import autocomplete
+            autocomplete.get_index()
+
+            versions = median_ms(database.get_table_versions, args.requests * 10)
+            print(f"get_table_versions() : {versions * 1000:.1f} µs\n")
+            for url in ("/countries", "/players?country=France", "/players/42"):
+                size = len(client.get(url).content)
+                response_cache.bodies.clear()
+                response_cache.bodies.max_entries = 0
+                uncached = median_ms(lambda: client.get(url), args.requests)
+                response_cache.bodies.max_entries = response_cache.RESPONSE_CACHE_SIZE
+                client.get(url)
+                cached = median_ms(lambda: client.get(url), args.requests)
+                etag = client.get(url).headers["etag"]
+                revalidated = median_ms(lambda: client.get(url, headers={"If-None-Match": etag}), args.requests)
+                print(f"{url} ({size / 1024:.0f} Ko) : {uncached:.2f} ms sans cache, "
+                      f"{cached:.2f} ms depuis le LRU, {revalidated:.2f} ms en 304 (0 octet)")
+
+if __name__ == "__main__":
+    main()
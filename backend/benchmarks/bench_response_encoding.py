@@ -0,0 +1,78 @@
+# Filename: backend/benchmarks/bench_response_encoding.py
+# Description: Benchmark de la sérialisation JSON (json, orjson) et de la compression (gzip, brotli) des réponses.
+#
+# Usage (depuis backend/) :
+#   python -m benchmarks.bench_response_encoding
+#   python -m benchmarks.bench_response_encoding --rows 1000 10000 --repeat 5
+#
+# Pour une réponse /players de N lignes complètes (rapport de scouting compris) :
+#   - temps de sérialisation : chemin FastAPI par défaut (jsonable_encoder + json.dumps),
+#     JSONResponse directe (json_response), orjson (JSON_SERIALIZER=orjson),
+#   - octets transmis et temps de compression : brut, gzip, brotli (si le module est installé).
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+import database  # noqa: E402
+import response_encoding  # noqa: E402
+from benchmarks.bench_bulk_upsert import make_players  # noqa: E402
+
+# Rapport de scouting type (~1,5 Ko), comme ceux générés par OpenAI
+REPORT = ("Attaquant rapide et technique, efficace dans les petits espaces. " * 24).strip()
+
+def median_ms(run, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la sérialisation et de la compression des réponses")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database.DB_PATH = os.path.join(tmp_dir, "encoding.db")
+        database.init_db()
+        players = [dict(p, scouting_report=REPORT) for p in make_players(max(args.rows))]
+        database.save_players_bulk(players)
+        all_rows = database.list_players()
+
+        for count in args.rows:
+            content = {"players": all_rows[:count]}
+            print(f"--- {count} lignes ---")
+            default = median_ms(lambda: JSONResponse(jsonable_encoder(content)), args.repeat)
+            direct = median_ms(lambda: JSONResponse(content), args.repeat)
+            line = f"Sérialisation : {default:.1f} ms (jsonable_encoder + json), {direct:.1f} ms (json direct)"
+            if response_encoding.orjson is not None:
+                fast = median_ms(lambda: response_encoding.ORJSONResponse(content), args.repeat)
+                line += f", {fast:.1f} ms (orjson)"
+            else:
+                line += " (orjson non installé)"
+            print(line)
+
+            body = JSONResponse(content).body
+            print(f"Transmis : {len(body) / 1024:.0f} Ko brut")
+            encodings = ["gzip"] + (["br"] if response_encoding.brotli is not None else [])
+            for encoding in encodings:
+                compressed = response_encoding.compress(body, encoding)
+                elapsed = median_ms(lambda: response_encoding.compress(body, encoding), args.repeat)
+                print(f"           {len(compressed) / 1024:.0f} Ko {encoding} "
+                      f"({len(compressed) / len(body):.1%}, compression {elapsed:.1f} ms)")
+            if response_encoding.brotli is None:
+                print("           brotli non installé (pip install brotli)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# Filename: backend/benchmarks/bench_similarity.py
+# Description: Benchmark de la recherche de joueurs similaires (construction de l'index, requêtes, mises à jour).
+#
+# Usage (depuis backend/) :
+#   python -m benchmarks.bench_similarity
+#   python -m benchmarks.bench_similarity --players 100000 --queries 500 --k 20
+#
+# Mesures sur une base temporaire de joueurs synthétiques :
+#   - construction de l'index (lecture SQLite + matrice NumPy + standardisation),
+#   - latence p50/p95 des requêtes top-k (cosinus, euclidienne, avec et sans filtres),
+#   - coût d'une sauvegarde de joueur avec mise à jour incrémentale de l'index.
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import database  # noqa: E402
+import similarity  # noqa: E402
+from benchmarks.bench_bulk_upsert import COUNTRIES, make_players  # noqa: E402
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+def timed_queries(index: similarity.SimilarityIndex, ids: list, queries: int, k: int, **kwargs) -> list:
+    rng = random.Random(0)
+    samples = []
+    for _ in range(queries):
+        start = time.perf_counter()
+        index.neighbours(rng.choice(ids), k, **kwargs)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la recherche de joueurs similaires")
+    parser.add_argument("--players", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--updates", type=int, default=200, help="Sauvegardes avec mise à jour de l'index")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database.DB_PATH = os.path.join(tmp_dir, "similarity.db")
+        database.init_db()
+        start = time.perf_counter()
+        database.save_players_bulk(make_players(args.players))
+        print(f"{args.players} joueurs insérés en {time.perf_counter() - start:.1f} s")
+
+        start = time.perf_counter()
+        index = similarity.get_index()
+        print(f"Construction de l'index : {(time.perf_counter() - start) * 1000:.0f} ms "
+              f"({index.size} lignes x {len(similarity.FEATURES)} colonnes)\n")
+
+        ids = list(index.row_of)
+        scenarios = [
+            ("cosinus", {"metric": "cosine"}),
+            ("euclidienne", {"metric": "euclidean"}),
+            ("cosinus + âge <= 23", {"metric": "cosine", "max_age": 23}),
+            ("cosinus + valeur <= 20 M€", {"metric": "cosine", "max_value": 20_000_000}),
+            ("cosinus + nationalité", {"metric": "cosine", "nationality": COUNTRIES[0]}),
+            ("cosinus + tous filtres", {"metric": "cosine", "min_age": 18, "max_age": 25,
+                                        "max_value": 30_000_000, "nationality": COUNTRIES[1], "position": "Forward"}),
+        ]
+        print(f"{'requête (k=' + str(args.k) + ')':<28} | {'p50 (ms)':>8} | {'p95 (ms)':>8}")
+        for label, kwargs in scenarios:
+            samples = timed_queries(index, ids, args.queries, args.k, **kwargs)
+            print(f"{label:<28} | {percentile(samples, 50) * 1000:>8.2f} | {percentile(samples, 95) * 1000:>8.2f}")
+
+        # Sauvegardes : l'écouteur d'écriture met l'index à jour ligne par ligne
+        players = list(make_players(args.updates, offset=args.players))
+        samples = []
+        for player in players:
+            start = time.perf_counter()
+            database.save_player_to_db(player)
+            samples.append(time.perf_counter() - start)
+        database.remove_player_write_listener(index.update_players)
+        baseline = []
+        for player in make_players(args.updates, offset=args.players * 2):
+            start = time.perf_counter()
+            database.save_player_to_db(player)
+            baseline.append(time.perf_counter() - start)
+        print(f"\nsave_player_to_db : {statistics.median(baseline) * 1000:.2f} ms sans index, "
+              f"{statistics.median(samples) * 1000:.2f} ms avec mise à jour de l'index "
+              f"({index.size} lignes après ajout)")
+
+if __name__ == "__main__":
+    main()
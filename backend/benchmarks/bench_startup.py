@@ -0,0 +1,139 @@
+# Filename: backend/benchmarks/bench_startup.py
+# Description: Benchmark du démarrage à froid de l'API : temps d'import détaillé par module et délai avant /health.
+#
+# Usage (depuis backend/) :
+#   python -m benchmarks.bench_startup
+#   python -m benchmarks.bench_startup --repeat 10 --workers 1 2 --top 20
+#
+# Mesures, chacune dans un processus Python neuf (comme un nouveau conteneur ou worker) :
+#   1. `python -X importtime -c "import main"` : temps total d'import et répartition par
+#      paquet (temps propre cumulé), avec l'état des modules lourds (importés ou différés) ;
+#   2. coût des imports différés, payé au premier /scrape-player ou au premier appel OpenAI ;
+#   3. uvicorn : délai entre le lancement du processus et la première réponse 200 de /health.
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import requests
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Modules suivis individuellement (temps cumulé, enfants compris)
+WATCHED_MODULES = ("fastapi", "pydantic", "starlette", "dotenv", "database", "metrics", "tracing",
+                   "profiling", "timeseries", "scraping.scraper", "scraping.http_client", "requests", "bs4", "lxml")
+
+def run_importtime(statement: str, env: dict) -> list:
+    """Exécute `statement` avec -X importtime ; retourne [(module, temps propre µs, temps cumulé µs)]."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                          cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+def import_breakdown(env: dict, repeat: int) -> dict:
+    totals, by_package, watched = [], defaultdict(list), defaultdict(list)
+    for _ in range(repeat):
+        rows = run_importtime("import main", env)
+        cumulative = {name: cum for name, _, cum in rows}
+        totals.append(cumulative["main"])
+        packages = defaultdict(int)
+        for name, self_us, _ in rows:
+            packages[name.split(".")[0]] += self_us
+        for package, us in packages.items():
+            by_package[package].append(us)
+        for module in WATCHED_MODULES:
+            if module in cumulative:
+                watched[module].append(cumulative[module])
+    return {
+        "total": statistics.median(totals),
+        "packages": {p: statistics.median(v) for p, v in by_package.items()},
+        "watched": {m: statistics.median(v) for m, v in watched.items()},
+    }
+
+def deferred_cost(env: dict, repeat: int) -> dict:
+    """Temps d'import des modules différés lorsqu'ils sont chargés après main."""
+    costs = defaultdict(list)
+    for _ in range(repeat):
+        rows = run_importtime("import main; import scraping.scraper", env)
+        cumulative = {name: cum for name, _, cum in rows}
+        for module in ("scraping", "scraping.scraper", "scraping.http_client", "requests", "bs4"):
+            if module in cumulative:
+                costs[module].append(cumulative[module])
+    return {m: statistics.median(v) for m, v in costs.items()}
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def time_to_ready(env: dict, workers: int, timeout: float = 60.0) -> float:
+    """Secondes entre le lancement d'uvicorn et la première réponse 200 de /health."""
+    port = free_port()
+    cmd = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+           "--workers", str(workers), "--log-level", "warning"]
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn s'est arrêté (code {proc.returncode})")
+            try:
+                if requests.get(f"http://127.0.0.1:{port}/health", timeout=0.5).status_code == 200:
+                    return time.perf_counter() - start
+            except requests.RequestException:
+                pass
+            time.sleep(0.01)
+        raise RuntimeError(f"uvicorn n'a pas répondu en {timeout} s")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du démarrage à froid de l'API")
+    parser.add_argument("--repeat", type=int, default=5, help="Processus neufs par mesure (médiane)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1], help="Nombres de workers uvicorn")
+    parser.add_argument("--top", type=int, default=12, help="Paquets affichés dans la répartition")
+    parser.add_argument("--skip-server", action="store_true", help="Ne mesure que les imports")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env = dict(os.environ)
+        env.pop("PORT", None)
+        env.update({"DATA_DIR": tmp_dir, "LOG_LEVEL": "WARNING", "OPENAI_API_KEY": env.get("OPENAI_API_KEY") or "bench"})
+
+        breakdown = import_breakdown(env, args.repeat)
+        print(f"Import de main : {breakdown['total'] / 1000:.1f} ms (médiane sur {args.repeat} processus)\n")
+        print(f"{'paquet':<24} | {'temps propre (ms)':>17}")
+        for package, us in sorted(breakdown["packages"].items(), key=lambda kv: -kv[1])[:args.top]:
+            print(f"{package:<24} | {us / 1000:>17.1f}")
+
+        print(f"\n{'module suivi':<24} | {'cumulé (ms)':>11}")
+        for module in WATCHED_MODULES:
+            us = breakdown["watched"].get(module)
+            print(f"{module:<24} | {us / 1000:>11.1f}" if us is not None else f"{module:<24} | {'différé':>11}")
+
+        deferred = deferred_cost(env, args.repeat)
+        print("\nImports différés (payés au premier scraping / appel OpenAI) :")
+        for module, us in deferred.items():
+            print(f"  {module:<22} {us / 1000:>8.1f} ms")
+
+        if not args.skip_server:
+            print()
+            for workers in args.workers:
+                samples = [time_to_ready(env, workers) for _ in range(args.repeat)]
+                print(f"uvicorn workers={workers} : prêt en {statistics.median(samples) * 1000:.0f} ms "
+                      f"(min {min(samples) * 1000:.0f}, max {max(samples) * 1000:.0f})")
+
+if __name__ == "__main__":
+    main()
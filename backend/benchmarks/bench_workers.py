@@ -0,0 +1,122 @@
+# Filename: backend/benchmarks/bench_workers.py
+# Description: Montée en charge de l'API sur plusieurs cœurs (workers uvicorn) et cohérence de l'état partagé.
+#
+# Usage (depuis backend/) :
+#   python -m benchmarks.bench_workers
+#   python -m benchmarks.bench_workers --workers 1 2 4 8 --duration 20 --users 64 --shared-state sqlite
+#
+# Pour chaque nombre de workers :
+#   1. débit et latence (p50/p95) d'un mélange de lectures (/countries, /players, /player-by-name),
+#      avec l'accélération par rapport au premier nombre de workers mesuré ;
+#   2. cohérence : N requêtes /scrape-player simultanées pour un même joueur, réparties sur les
+#      workers. On compte les normalisations de nom reçues par le stub OpenAI : avec l'état partagé
+#      (SHARED_STATE=sqlite), le verrou de scraping et le cache de sources communs n'en laissent
+#      passer qu'une ; en mode memory, chaque worker refait la sienne.
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+from types import SimpleNamespace
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmarks.bench_pipeline import PANEL  # noqa: E402
+from loadtest.openai_stub import StubHandler, start_stub  # noqa: E402
+from loadtest.run import DB_PROFILES, LoadRun, free_port, prepare_db, start_server, summarize  # noqa: E402
+
+def default_workers() -> list:
+    counts, n = [], 1
+    while n <= (os.cpu_count() or 1):
+        counts.append(n)
+        n *= 2
+    return counts if len(counts) > 1 else [1, 2]
+
+def concurrent_scrapes(base_url: str, player_name: str, count: int, timeout: float) -> int:
+    """Lance `count` /scrape-player simultanés (connexions distinctes) ; retourne le nombre de réponses 200."""
+    ok = []
+    barrier = threading.Barrier(count)
+
+    def call():
+        barrier.wait()
+        try:
+            resp = requests.post(f"{base_url}/scrape-player", json={"player_name": player_name}, timeout=timeout)
+            ok.append(resp.status_code == 200)
+        except requests.RequestException:
+            ok.append(False)
+
+    threads = [threading.Thread(target=call) for _ in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(ok)
+
+def main():
+    parser = argparse.ArgumentParser(description="Montée en charge multi-worker de l'API X-scout")
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers(), help="Nombres de workers uvicorn")
+    parser.add_argument("--shared-state", choices=("auto", "memory", "sqlite"), default="auto",
+                        help="auto : memory pour 1 worker, sqlite au-delà")
+    parser.add_argument("--db-profile", choices=sorted(DB_PROFILES), default="small")
+    parser.add_argument("--duration", type=float, default=15.0, help="Durée de la mesure de débit (s)")
+    parser.add_argument("--users", type=int, default=32, help="Utilisateurs virtuels simultanés")
+    parser.add_argument("--scrapes", type=int, default=8, help="Scrapings simultanés du même joueur")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--openai-latency-ms", type=float, default=200.0)
+    parser.add_argument("--fixtures", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures"))
+    parser.add_argument("--replay-latency-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    load_args = SimpleNamespace(timeout=args.timeout, think_ms=0.0, burst_size=0, burst_every=0,
+                                users=args.users, duration=args.duration, fixtures=args.fixtures,
+                                replay_latency_ms=args.replay_latency_ms)
+    stub = start_stub(0, args.openai_latency_ms)
+    openai_url = f"http://127.0.0.1:{stub.server_address[1]}/v1/chat/completions"
+    seeded = DB_PROFILES[args.db_profile]
+    rows, baseline = [], None
+    print(f"Cœurs disponibles : {os.cpu_count()}  base : {args.db_profile} ({seeded} joueurs)")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for i, workers in enumerate(args.workers):
+            mode = args.shared_state if args.shared_state != "auto" else ("sqlite" if workers > 1 else "memory")
+            data_dir = os.path.join(tmp_dir, f"w{workers}")
+            prepare_db(data_dir, seeded)
+            port = free_port()
+            server = start_server(port, workers, data_dir, openai_url, load_args, extra_env={
+                "SHARED_STATE": mode,
+                "SHARED_STATE_PATH": os.path.join(data_dir, "shared_state.db"),
+            })
+            base_url = f"http://127.0.0.1:{port}"
+            try:
+                run = LoadRun(base_url, seeded, load_args)
+                elapsed = run.run()
+                summary = summarize(run.latencies, run.errors, elapsed)
+                total = sum(len(v) for v in run.latencies.values())
+                every = sorted(x for v in run.latencies.values() for x in v)
+                rps = total / elapsed
+                baseline = baseline or rps
+
+                before = StubHandler.requests_by_kind["player_name"]
+                ok = concurrent_scrapes(base_url, PANEL[i % len(PANEL)], args.scrapes, args.timeout)
+                normalizations = StubHandler.requests_by_kind["player_name"] - before
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+
+            rows.append((workers, mode, rps, rps / baseline,
+                         every[len(every) // 2] * 1000 if every else 0.0,
+                         every[int(len(every) * 0.95)] * 1000 if every else 0.0,
+                         sum(s["errors"] for s in summary.values()), ok, normalizations))
+
+    stub.shutdown()
+    print(f"\n{'workers':>7} | {'état':>6} | {'RPS':>7} | {'x':>5} | {'p50 (ms)':>8} | {'p95 (ms)':>8} | "
+          f"{'erreurs':>7} | {'scrapes OK':>10} | {'normalisations LLM':>18}")
+    for workers, mode, rps, speedup, p50, p95, errors, ok, normalizations in rows:
+        print(f"{workers:>7} | {mode:>6} | {rps:>7.1f} | {speedup:>5.2f} | {p50:>8.1f} | {p95:>8.1f} | "
+              f"{errors:>7} | {ok:>4}/{args.scrapes:<5} | {normalizations:>18}")
+
+if __name__ == "__main__":
+    main()
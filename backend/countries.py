@@ -0,0 +1,184 @@
+# Filename: backend/countries.py
+# Description: Normalisation des nationalités vers les noms anglais attendus par le globe (table locale, puis OpenAI).
+#
+# Utilisée à l'écriture (pipeline de scraping, tâche de fond de /player-by-name) : le résultat est
+# enregistré avec players.nationality_normalized = 1, même lorsqu'il est identique à la valeur
+# d'origine, pour que les lectures n'aient jamais à redemander OpenAI.
+
+import logging
+import os
+
+import tracing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OPENAI_API_URL = "https://api.openai.com/v1/chat/completions"
+
+# Noms de pays en français -> noms anglais attendus par le globe
+COUNTRY_MAPPING = {
+    "Espagne": "Spain",
+    "Angleterre": "England",
+    "Écosse": "Scotland",
+    "Pays de Galles": "Wales",
+    "Irlande du Nord": "Northern Ireland",
+    "Irlande": "Ireland",
+    "Allemagne": "Germany",
+    "Italie": "Italy",
+    "Brésil": "Brazil",
+    "Argentine": "Argentina",
+    "Belgique": "Belgium",
+    "Pays-Bas": "Netherlands",
+    "Croatie": "Croatia",
+    "Serbie": "Serbia",
+    "Slovénie": "Slovenia",
+    "Slovaquie": "Slovakia",
+    "Hongrie": "Hungary",
+    "Roumanie": "Romania",
+    "Bulgarie": "Bulgaria",
+    "Bosnie-Herzégovine": "Bosnia and Herzegovina",
+    "Monténégro": "Montenegro",
+    "Macédoine du Nord": "North Macedonia",
+    "Albanie": "Albania",
+    "Géorgie": "Georgia",
+    "Ukraine": "Ukraine",
+    "Finlande": "Finland",
+    "Islande": "Iceland",
+    "Maroc": "Morocco",
+    "Sénégal": "Senegal",
+    "Côte d'Ivoire": "Ivory Coast",
+    "Cameroun": "Cameroon",
+    "Égypte": "Egypt",
+    "Algérie": "Algeria",
+    "Tunisie": "Tunisia",
+    "Guinée": "Guinea",
+    "République démocratique du Congo": "DR Congo",
+    "RD Congo": "DR Congo",
+    "Cap-Vert": "Cape Verde",
+    "Gambie": "Gambia",
+    "Japon": "Japan",
+    "Corée du Sud": "South Korea",
+    "Chine": "China",
+    "Iran": "Iran",
+    "États-Unis": "United States",
+    "USA": "United States",
+    "Mexique": "Mexico",
+    "Jamaïque": "Jamaica",
+    "Colombie": "Colombia",
+    "Chili": "Chile",
+    "Pérou": "Peru",
+    "Équateur": "Ecuador",
+    "Bolivie": "Bolivia",
+    "Russie": "Russia",
+    "Pologne": "Poland",
+    "Suède": "Sweden",
+    "Norvège": "Norway",
+    "Danemark": "Denmark",
+    "Suisse": "Switzerland",
+    "Autriche": "Austria",
+    "République tchèque": "Czech Republic",
+    "Grèce": "Greece",
+    "Turquie": "Turkey",
+    "Israël": "Israel",
+    "Arabie saoudite": "Saudi Arabia",
+    "Émirats arabes unis": "United Arab Emirates",
+    "Australie": "Australia",
+    "Nouvelle-Zélande": "New Zealand",
+    "Afrique du Sud": "South Africa",
+    # Variantes anglaises fréquentes (Wikidata, Transfermarkt)
+    "United States of America": "United States",
+    "Côte d’Ivoire": "Ivory Coast",
+    "Republic of Ireland": "Ireland",
+    "Korea Republic": "South Korea",
+    "Czechia": "Czech Republic",
+    "Türkiye": "Turkey",
+    "Democratic Republic of the Congo": "DR Congo",
+    "Kingdom of the Netherlands": "Netherlands",
+}
+
+# Noms déjà au format du globe
+GLOBE_COUNTRIES = {
+    "Spain", "England", "Scotland", "Wales", "Northern Ireland", "Ireland", "Germany", "Italy",
+    "France", "Portugal", "Belgium", "Netherlands", "Croatia", "Serbia", "Slovenia", "Slovakia",
+    "Hungary", "Romania", "Bulgaria", "Bosnia and Herzegovina", "Montenegro", "North Macedonia",
+    "Albania", "Kosovo", "Georgia", "Ukraine", "Russia", "Poland", "Sweden", "Norway", "Denmark",
+    "Finland", "Iceland", "Switzerland", "Austria", "Czech Republic", "Greece", "Turkey", "Israel",
+    "Brazil", "Argentina", "Uruguay", "Paraguay", "Colombia", "Chile", "Peru", "Ecuador",
+    "Venezuela", "Bolivia", "United States", "Canada", "Mexico", "Jamaica", "Costa Rica",
+    "Morocco", "Senegal", "Ivory Coast", "Nigeria", "Ghana", "Cameroon", "Egypt", "Algeria",
+    "Tunisia", "Mali", "Guinea", "Gabon", "DR Congo", "Burkina Faso", "Cape Verde", "Gambia",
+    "Japan", "South Korea", "China", "Iran", "Qatar", "Saudi Arabia", "United Arab Emirates",
+    "Australia", "New Zealand", "South Africa",
+}
+
+def normalize_country_name_locally(country_name):
+    """Normalisation sans appel réseau (table de correspondance) ; None si le nom est inconnu."""
+    if not country_name:
+        return None
+    if country_name in COUNTRY_MAPPING:
+        return COUNTRY_MAPPING[country_name]
+    if country_name in GLOBE_COUNTRIES:
+        return country_name
+    return None
+
+@tracing.traced("player.normalize_country")
+def normalize_country_name_with_openai(country_name):
+    """
+    Normalise le nom d'un pays (table locale, sinon OpenAI) pour correspondre au mapping du globe.
+    None si le pays est inconnu de la table et qu'OpenAI n'a pas pu répondre.
+    """
+    if not country_name:
+        return None
+
+    # Vérifie d'abord la table de correspondance (noms français et noms déjà en anglais)
+    local = normalize_country_name_locally(country_name)
+    if local:
+        return local
+
+    api_key = os.getenv("OPENAI_API_KEY", "")
+    if not api_key:
+        return None
+
+    # Utilise OpenAI pour normaliser si nécessaire
+    try:
+        from scraping import http_client
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+
+        prompt = f"""Normalise le nom de ce pays en anglais (format standard): "{country_name}"
+Réponds UNIQUEMENT avec le nom du pays en anglais, sans explication, sans guillemets, sans ponctuation.
+Exemples: "Espagne" -> "Spain", "Angleterre" -> "England", "États-Unis" -> "United States"
+Réponds uniquement le nom normalisé:"""
+
+        openai_body = {
+            "model": "gpt-4o-mini",
+            "messages": [
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.3,
+            "max_tokens": 20
+        }
+
+        api_url = os.getenv("OPENAI_API_URL", DEFAULT_OPENAI_API_URL)
+        resp = http_client.chat_completion(api_url, openai_body, "normalize_country", headers=headers, timeout=5)
+        resp.raise_for_status()
+        response_data = resp.json()
+        normalized = response_data.get('choices', [{}])[0].get('message', {}).get('content', '').strip()
+        # Nettoie la réponse (enlève guillemets, points, etc.)
+        normalized = normalized.strip('"\'.,;!?')
+        return normalized or None
+    except Exception as e:
+        logger.warning("Erreur lors de la normalisation du pays: %s", e, extra={"country": country_name})
+        return None
+
+def normalize_nationality_fields(nationality):
+    """
+    Colonnes players à enregistrer pour une nationalité brute : nom au format du globe et
+    drapeau nationality_normalized (1 si la normalisation a abouti, 0 sinon). Dictionnaire
+    vide pour une nationalité absente ou "Unknown".
+    """
+    if not nationality or nationality.lower() == "unknown":
+        return {}
+    normalized = normalize_country_name_with_openai(nationality)
+    return {"nationality": normalized or nationality, "nationality_normalized": 1 if normalized else 0}
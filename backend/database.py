@@ -1,34 +1,259 @@
 # Filename: backend/database.py
 # Description: Module centralisé pour toutes les opérations de base de données
 
+import contextvars
 import sqlite3
+import logging
 import os
-from typing import Optional, Dict, Any, List
+import re
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Iterable, Tuple, Callable
+
+import metrics
+import tracing
+
+logger = logging.getLogger(__name__)
 
 # Configuration centralisée de la base de données
 DB_NAME = "players.db"
 
+# Nombre de joueurs par transaction pour les insertions en masse
+BULK_BATCH_SIZE = 500
+
+# RETURNING est disponible à partir de SQLite 3.35
+SUPPORTS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Limite de paramètres liés par requête (999 avant SQLite 3.32)
+MAX_SQL_VARIABLES = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+
+# Durée de conservation de l'historique des valeurs marchandes (0 = illimitée)
+MARKET_VALUE_RETENTION_DAYS = int(os.getenv("MARKET_VALUE_RETENTION_DAYS", "3650"))
+
+# Minutes minimales pour que les ratios par 90 minutes soient significatifs
+PER90_MIN_MINUTES = 90
+
+# Au-delà de ce nombre de joueurs écrits, les métriques dérivées sont recalculées en une passe
+METRICS_INCREMENTAL_MAX = 200
+
+# Une mise à jour incrémentale ne reclasse que les joueurs écrits : les rangs centiles des autres
+# dérivent. Recalcul complet dès que les joueurs reclassés un par un depuis le dernier dépassent
+# cette part de la table (coût amorti constant par écriture)
+METRICS_REBUILD_RATIO = float(os.getenv("METRICS_REBUILD_RATIO", "0.02"))
+
+# Nombre de joueurs conservés par classement (métrique x regroupement)
+LEADERBOARD_SIZE = int(os.getenv("LEADERBOARD_SIZE", "100"))
+
 # Chemin de la base de données compatible Railway + Local
 # Railway : utilise /app/data (volume persistant recommandé)
-# Local : utilise ./data (dossier créé automatiquement)
-if os.getenv("RAILWAY_ENVIRONMENT") or os.getenv("PORT"):
+# Local : utilise ./data (dossier créé à la première connexion)
+if os.getenv("DATA_DIR"):
+    # Dossier explicite (tests de charge, benchmarks, déploiements personnalisés)
+    BASE_DIR = os.getenv("DATA_DIR")
+elif os.getenv("RAILWAY_ENVIRONMENT") or os.getenv("PORT"):
     # Production Railway : utilise /app/data
     BASE_DIR = "/app/data"
 else:
     # Développement local : utilise ./data
     BASE_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
 
-# Crée le répertoire si nécessaire
-os.makedirs(BASE_DIR, exist_ok=True)
-
 DB_PATH = os.path.join(BASE_DIR, DB_NAME)
 
+# --- Valeurs marchandes ---
+# Multiplicateurs des unités rencontrées (Transfermarkt EN/DE/FR, Wikidata, réponses LLM)
+_MARKET_VALUE_UNITS = {
+    'bn': 1_000_000_000, 'billion': 1_000_000_000, 'billions': 1_000_000_000,
+    'mrd': 1_000_000_000, 'milliard': 1_000_000_000, 'milliards': 1_000_000_000,
+    'milliarde': 1_000_000_000, 'milliarden': 1_000_000_000,
+    'm': 1_000_000, 'mio': 1_000_000, 'mil': 1_000_000, 'mln': 1_000_000,
+    'million': 1_000_000, 'millions': 1_000_000, 'millionen': 1_000_000,
+    'k': 1_000, 'th': 1_000, 'tsd': 1_000, 'thousand': 1_000, 'mille': 1_000, 'tausend': 1_000,
+}
+# Mots de devise admis directement après un nombre sans unité ("80000000 EUR")
+_MARKET_VALUE_CURRENCIES = {'eur', 'euro', 'euros', 'usd', 'dollar', 'dollars', 'gbp', 'pound', 'pounds', 'chf'}
+# Nombre suivi du mot éventuel qui le qualifie ("Mio." -> "mio", le point est ignoré)
+_MARKET_VALUE_RE = re.compile(r"(\d+(?:[.,\s]\d+)*)\s*([a-zà-ÿ]+)?", re.IGNORECASE)
+
+@lru_cache(maxsize=4096)
+def parse_market_value(value: Any) -> Optional[int]:
+    """
+    Convertit une valeur marchande libre en euros entiers.
+    Ex: "€80.00m" -> 80000000, "€500k" -> 500000, "80,00 Mio. €" -> 80000000, "1.2 billion" -> 1200000000,
+    "80 Millionen €" -> 80000000, "1,2 Mrd. €" -> 1200000000, "500 Tsd. €" -> 500000.
+    Retourne None si aucune valeur exploitable n'est trouvée, ou si le nombre est suivi d'un mot
+    inconnu ("80 Spieler") : mieux vaut aucune valeur qu'une valeur fausse d'un facteur un million.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value) if value > 0 else None
+
+    m = _MARKET_VALUE_RE.search(str(value))
+    if not m:
+        return None
+    number, unit = m.group(1), (m.group(2) or '').lower()
+    if unit and unit not in _MARKET_VALUE_UNITS:
+        if unit not in _MARKET_VALUE_CURRENCIES:
+            return None
+        unit = ''
+    number = re.sub(r"\s", "", number)
+
+    # Distingue séparateur décimal et séparateur de milliers
+    if '.' in number and ',' in number:
+        decimal_sep = '.' if number.rfind('.') > number.rfind(',') else ','
+        thousands_sep = ',' if decimal_sep == '.' else '.'
+        number = number.replace(thousands_sep, '').replace(decimal_sep, '.')
+    elif ',' in number or '.' in number:
+        sep = ',' if ',' in number else '.'
+        parts = number.split(sep)
+        if len(parts) > 2 or (not unit and len(parts[-1]) == 3):
+            number = number.replace(sep, '')
+        else:
+            number = number.replace(sep, '.')
+
+    try:
+        amount = float(number) * _MARKET_VALUE_UNITS.get(unit, 1)
+    except ValueError:
+        return None
+    return int(round(amount)) if amount > 0 else None
+
+metrics.gauge(
+    "xscout_function_cache_lookups", "Consultations cumulées des caches de fonctions (lru_cache) par résultat",
+    ("cache", "result"),
+    callback=lambda: {
+        ("parse_market_value", "hit"): parse_market_value.cache_info().hits,
+        ("parse_market_value", "miss"): parse_market_value.cache_info().misses,
+    },
+)
+
+def format_market_value(value_eur: Optional[int]) -> Optional[str]:
+    """Formate une valeur en euros au format Transfermarkt (ex: 80000000 -> "€80.00m")."""
+    if not value_eur:
+        return None
+    if value_eur >= 1_000_000:
+        return f"€{value_eur / 1_000_000:.2f}m"
+    return f"€{value_eur / 1_000:.0f}k"
+
+# Colonnes de players à usage interne, jamais renvoyées par l'API
+INTERNAL_PLAYER_COLUMNS = ("nationality_normalized",)
+
+def public_player(player: Dict[str, Any]) -> Dict[str, Any]:
+    """Fiche joueur sans les colonnes internes (réponses de l'API)."""
+    for column in INTERNAL_PLAYER_COLUMNS:
+        player.pop(column, None)
+    return player
+
+# --- Postes ---
+POSITION_GROUPS = ("goalkeeper", "defender", "midfielder", "forward")
+
+# Mots-clés des postes (Transfermarkt EN/DE, FBref, Wikidata, libellés français)
+_POSITION_KEYWORDS = (
+    ("goalkeeper", ("goalkeeper", "keeper", "gardien", "torwart", "gk")),
+    ("defender", ("defender", "back", "défenseur", "defenseur", "verteidiger", "libero", "df")),
+    ("midfielder", ("midfield", "milieu", "mittelfeld", "mf")),
+    ("forward", ("forward", "striker", "winger", "attaquant", "ailier", "sturm", "avant", "fw")),
+)
+
+@lru_cache(maxsize=1024)
+def position_group(position: Optional[str]) -> Optional[str]:
+    """Regroupe un libellé de poste libre en gardien / défenseur / milieu / attaquant."""
+    if not position:
+        return None
+    text = position.lower()
+    tokens = set(re.split(r"[^a-zéèêàç]+", text))
+    for group, keywords in _POSITION_KEYWORDS:
+        if any((k in tokens) if len(k) <= 2 else (k in text) for k in keywords):
+            return group
+    return None
+
+# --- Noms ---
+# Lettres sans décomposition Unicode (NFKD ne les ramène pas à une lettre ASCII)
+_FOLD_TRANSLATION = str.maketrans({
+    "ø": "o", "đ": "d", "ð": "d", "ł": "l", "ß": "ss", "æ": "ae", "œ": "oe", "þ": "th", "ı": "i",
+})
+_FOLD_SEPARATORS_RE = re.compile(r"[^0-9a-z]+")
+
+def fold_name(text: Optional[str]) -> str:
+    """Forme de comparaison d'un nom : minuscules, sans accents ni ponctuation ("Ødegaard" -> "odegaard")."""
+    if not text:
+        return ""
+    text = text.lower()
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text.translate(_FOLD_TRANSLATION))
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _FOLD_SEPARATORS_RE.sub(" ", text).strip()
+
+def _sql_operation(sql: str) -> str:
+    return sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+
+class TracedCursor(sqlite3.Cursor):
+    """Curseur dont chaque requête est tracée (span) et mesurée (histogramme par opération)."""
+
+    def _timed(self, run, sql: str, batch: bool):
+        operation = _sql_operation(sql)
+        with tracing.span(f"SQLite {operation}", **{
+            "db.system": "sqlite",
+            "db.operation": operation,
+            "db.statement": " ".join(sql.split())[:500],
+            "db.batch": batch or None,
+        }) as sp:
+            start = time.perf_counter()
+            try:
+                result = run()
+            except sqlite3.Error:
+                metrics.DB_QUERY_ERRORS.inc(operation=operation)
+                raise
+            finally:
+                metrics.DB_QUERY_SECONDS.observe(time.perf_counter() - start, operation=operation)
+            sp.set_attribute("db.sqlite.rowcount", self.rowcount)
+        return result
+
+    def execute(self, sql, parameters=()):
+        return self._timed(lambda: super(TracedCursor, self).execute(sql, parameters), sql, False)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._timed(lambda: super(TracedCursor, self).executemany(sql, seq_of_parameters), sql, True)
+
+class TracedConnection(sqlite3.Connection):
+    """Connexion dont les curseurs (y compris ceux de conn.execute) sont tracés et mesurés."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._counted_open = True
+        metrics.DB_CONNECTIONS_OPENED.inc()
+        metrics.DB_CONNECTIONS_OPEN.inc()
+
+    def close(self):
+        if getattr(self, "_counted_open", False):
+            self._counted_open = False
+            metrics.DB_CONNECTIONS_OPEN.dec()
+        super().close()
+
+    def __del__(self):
+        # Connexion abandonnée sans close() : libérée par le ramasse-miettes
+        if getattr(self, "_counted_open", False):
+            self._counted_open = False
+            metrics.DB_CONNECTIONS_OPEN.dec()
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
 def get_db_connection():
     """Retourne une connexion à la base de données avec row_factory configuré."""
     # S'assure que le répertoire existe
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
     # check_same_thread=False est important avec FastAPI (multi-threading)
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, factory=TracedConnection)
     conn.row_factory = sqlite3.Row
     return conn
 
@@ -49,6 +274,7 @@ def init_db():
         position_tm TEXT,
         position_fbref TEXT,
         market_value TEXT,
+        market_value_eur INTEGER,
         height TEXT,
         weight TEXT,
         goals INTEGER,
@@ -92,6 +318,7 @@ def init_db():
         player_id INTEGER,
         player_name TEXT,
         market_value TEXT,
+        market_value_eur INTEGER,
         date_recorded TEXT,
         created_at TEXT
     )
@@ -101,32 +328,844 @@ def init_db():
     columns_to_add = [
         'scouting_report', 'image_url', 'weight', 'yellow_cards', 
         'red_cards', 'minutes_played', 'goals_per_match', 'assists_per_match',
-        'contract_expires', 'position_tm', 'position_fbref', 'created_at', 'updated_at'
+        'contract_expires', 'position_tm', 'position_fbref', 'created_at', 'updated_at',
+        'market_value_eur', 'nationality_normalized'
     ]
     for col in columns_to_add:
         try:
             if col in ['goals_per_match', 'assists_per_match']:
                 cur.execute(f"ALTER TABLE players ADD COLUMN {col} REAL")
-            elif col in ['yellow_cards', 'red_cards', 'minutes_played']:
+            elif col in ['yellow_cards', 'red_cards', 'minutes_played', 'market_value_eur', 'nationality_normalized']:
                 cur.execute(f"ALTER TABLE players ADD COLUMN {col} INTEGER")
             elif col in ['created_at', 'updated_at']:
                 cur.execute(f"ALTER TABLE players ADD COLUMN {col} TEXT DEFAULT CURRENT_TIMESTAMP")
             else:
                 cur.execute(f"ALTER TABLE players ADD COLUMN {col} TEXT")
+            if col == 'market_value_eur':
+                # Nouvelle colonne : rétro-remplissage depuis le texte existant
+                _backfill_market_value_eur(conn, 'players')
         except sqlite3.OperationalError:
             pass  # La colonne existe déjà
-    
+
+    try:
+        cur.execute("ALTER TABLE market_value_history ADD COLUMN market_value_eur INTEGER")
+        _backfill_market_value_eur(conn, 'market_value_history')
+    except sqlite3.OperationalError:
+        pass  # La colonne existe déjà
+
+    # Transferts : dédoublonnage sur (joueur, club de départ, club d'arrivée, date)
+    try:
+        cur.execute("""
+            DELETE FROM transfers WHERE id NOT IN (
+                SELECT MIN(id) FROM transfers
+                GROUP BY player_id, from_club, to_club, transfer_date
+            )
+        """)
+        cur.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_transfers_dedup
+            ON transfers(player_id, from_club, to_club, transfer_date)
+        """)
+    except sqlite3.OperationalError as e:
+        logger.warning("Index de dédoublonnage des transferts non créé: %s", e)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_transfers_player_date ON transfers(player_id, transfer_date)")
+
+    # Statistiques FBref par saison et compétition (toutes les lignes de la table "Standard Stats")
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS player_season_stats (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        player_id INTEGER NOT NULL,
+        season TEXT NOT NULL,
+        comp TEXT NOT NULL DEFAULT '',
+        squad TEXT NOT NULL DEFAULT '',
+        age INTEGER,
+        country TEXT,
+        matches_played INTEGER,
+        starts INTEGER,
+        minutes INTEGER,
+        goals INTEGER,
+        assists INTEGER,
+        penalties INTEGER,
+        yellow_cards INTEGER,
+        red_cards INTEGER,
+        xg REAL,
+        xg_assist REAL,
+        source_url TEXT,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (player_id, season, comp, squad)
+    )
+    """)
+
+    # Index pour les filtres et tris par valeur marchande
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_players_market_value_eur ON players(market_value_eur)")
+
+    # Série temporelle compacte des valeurs marchandes : un point (jour, euros) par changement.
+    # day = nombre de jours depuis le 1970-01-01, clé primaire sans rowid (stockage minimal).
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'market_value_points'")
+    points_table_exists = cur.fetchone() is not None
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS market_value_points (
+        player_id INTEGER NOT NULL,
+        day INTEGER NOT NULL,
+        value_eur INTEGER NOT NULL,
+        PRIMARY KEY (player_id, day)
+    ) WITHOUT ROWID
+    """)
+    if not points_table_exists:
+        # Migration : reprend l'historique texte existant
+        cur.execute("""
+            INSERT OR IGNORE INTO market_value_points (player_id, day, value_eur)
+            SELECT player_id, CAST(julianday(date_recorded) - 2440587.5 AS INTEGER), market_value_eur
+            FROM market_value_history
+            WHERE player_id IS NOT NULL AND market_value_eur IS NOT NULL
+              AND julianday(date_recorded) IS NOT NULL
+        """)
+
+    # Métriques dérivées (par 90 minutes, rangs centiles par poste), recalculées après chaque écriture
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'player_metrics'")
+    metrics_table_exists = cur.fetchone() is not None
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS player_metrics (
+        player_id INTEGER PRIMARY KEY,
+        position_group TEXT,
+        minutes_played INTEGER,
+        market_value_eur INTEGER,
+        goals_per90 REAL,
+        assists_per90 REAL,
+        contributions_per90 REAL,
+        minutes_played_pct REAL,
+        market_value_eur_pct REAL,
+        goals_per90_pct REAL,
+        assists_per90_pct REAL,
+        contributions_per90_pct REAL,
+        nationality TEXT,
+        age_band TEXT,
+        goals INTEGER,
+        assists INTEGER,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    rebuild_metrics = not metrics_table_exists
+    for col, col_type in (('nationality', 'TEXT'), ('age_band', 'TEXT'), ('goals', 'INTEGER'), ('assists', 'INTEGER')):
+        try:
+            cur.execute(f"ALTER TABLE player_metrics ADD COLUMN {col} {col_type}")
+            rebuild_metrics = True
+        except sqlite3.OperationalError:
+            pass  # La colonne existe déjà
+    _create_player_metrics_indexes(conn)
+
+    # Classements : les LEADERBOARD_SIZE meilleurs joueurs par (métrique, regroupement, groupe),
+    # dans l'ordre de la clé primaire (parcours d'une page = lecture d'une plage de la clé)
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'leaderboard_entries'")
+    rebuild_metrics = rebuild_metrics or cur.fetchone() is None
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS leaderboard_entries (
+        metric TEXT NOT NULL,
+        dimension TEXT NOT NULL,
+        group_key TEXT NOT NULL,
+        value NUMERIC NOT NULL,
+        player_id INTEGER NOT NULL,
+        PRIMARY KEY (metric, dimension, group_key, value DESC, player_id)
+    ) WITHOUT ROWID
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_leaderboard_entries_player ON leaderboard_entries(player_id)")
+
+    # Autres noms d'un joueur (recherches déjà résolues, fautes de frappe, surnoms), par forme repliée
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS player_aliases (
+        alias_key TEXT PRIMARY KEY,
+        alias TEXT NOT NULL,
+        player_id INTEGER NOT NULL,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    ) WITHOUT ROWID
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_player_aliases_player ON player_aliases(player_id)")
+
+    # Versions des tables exposées par l'API (ETag des réponses), incrémentées à chaque écriture.
+    # Chaque démarrage les incrémente aussi : les migrations ont pu modifier les données.
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS table_versions (
+        table_name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """)
+    _bump_table_versions(VERSIONED_TABLES, conn)
+
     conn.commit()
+    if rebuild_metrics:
+        # Migration : calcule les métriques et classements des joueurs déjà présents
+        _rebuild_player_metrics(conn)
     conn.close()
+    _initialized_paths.add(DB_PATH)
+
+# Fichiers déjà initialisés par ce processus (schéma et migrations exécutés une seule fois)
+_initialized_paths = set()
+_init_lock = threading.Lock()
+
+def ensure_db():
+    """Exécute init_db() une seule fois par processus et par fichier de base."""
+    if DB_PATH in _initialized_paths:
+        return
+    with _init_lock:
+        if DB_PATH not in _initialized_paths:
+            init_db()
+
+def _backfill_market_value_eur(conn: sqlite3.Connection, table: str):
+    """Remplit market_value_eur à partir de la colonne texte market_value (migration)."""
+    conn.create_function("parse_market_value", 1, parse_market_value, deterministic=True)
+    conn.execute(f"""
+        UPDATE {table} SET market_value_eur = parse_market_value(market_value)
+        WHERE market_value_eur IS NULL AND market_value IS NOT NULL
+    """)
+
+def _day_number(d: date) -> int:
+    return (d - date(1970, 1, 1)).days
+
+def _day_to_date(day: int) -> date:
+    return date(1970, 1, 1) + timedelta(days=day)
+
+def record_market_value(player_id: int, market_value: Any, recorded_on: Optional[date] = None) -> bool:
+    """
+    Ajoute un point à l'historique des valeurs marchandes, uniquement si la valeur
+    diffère du dernier point enregistré. Applique ensuite la politique de rétention.
+    Retourne True si un point a été ajouté.
+    """
+    value_eur = parse_market_value(market_value)
+    if not player_id or value_eur is None:
+        return False
+
+    day = _day_number(recorded_on or date.today())
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+        cur.execute("""
+            INSERT OR REPLACE INTO market_value_points (player_id, day, value_eur)
+            SELECT ?, ?, ?
+            WHERE COALESCE((
+                SELECT value_eur FROM market_value_points
+                WHERE player_id = ? AND day <= ? ORDER BY day DESC LIMIT 1
+            ), -1) != ?
+        """, (player_id, day, value_eur, player_id, day, value_eur))
+        added = cur.rowcount > 0
+
+        if added and MARKET_VALUE_RETENTION_DAYS > 0:
+            # Supprime les points trop anciens en gardant le dernier avant la limite
+            # (la valeur reste connue au début de la fenêtre de rétention)
+            cutoff = day - MARKET_VALUE_RETENTION_DAYS
+            cur.execute("""
+                DELETE FROM market_value_points
+                WHERE player_id = ? AND day < (
+                    SELECT MAX(day) FROM market_value_points WHERE player_id = ? AND day <= ?
+                )
+            """, (player_id, player_id, cutoff))
+
+        if added:
+            _bump_table_versions(("market_value_points",), conn)
+        conn.commit()
+        conn.close()
+        return added
+    except sqlite3.Error as e:
+        logger.error("Erreur lors de l'enregistrement de la valeur marchande: %s", e, extra={"player_id": player_id})
+        if 'conn' in locals():
+            conn.close()
+        return False
+
+def save_transfers(player_id: int, player_name: str, transfers: Iterable[Dict[str, Any]]) -> int:
+    """
+    Enregistre l'historique des transferts d'un joueur de façon incrémentale :
+    les transferts déjà connus (même joueur, clubs et date) sont complétés, jamais dupliqués.
+    Retourne le nombre de lignes insérées ou mises à jour.
+    """
+    if not player_id:
+        return 0
+
+    # '' plutôt que NULL : SQLite considère deux NULL comme distincts dans un index unique
+    rows = [
+        (
+            player_id, player_name,
+            t.get('from_club') or '', t.get('to_club') or '', t.get('transfer_date') or '',
+            t.get('transfer_fee'), t.get('transfer_type'), t.get('season')
+        )
+        for t in transfers
+        if t.get('from_club') or t.get('to_club')
+    ]
+    if not rows:
+        return 0
+
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+        changes_before = conn.total_changes
+        cur.executemany("""
+            INSERT INTO transfers (
+                player_id, player_name, from_club, to_club, transfer_date,
+                transfer_fee, transfer_type, season, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(player_id, from_club, to_club, transfer_date) DO UPDATE SET
+                transfer_fee = COALESCE(excluded.transfer_fee, transfers.transfer_fee),
+                transfer_type = COALESCE(excluded.transfer_type, transfers.transfer_type),
+                season = COALESCE(excluded.season, transfers.season)
+            WHERE COALESCE(excluded.transfer_fee, transfers.transfer_fee) IS NOT transfers.transfer_fee
+               OR COALESCE(excluded.transfer_type, transfers.transfer_type) IS NOT transfers.transfer_type
+               OR COALESCE(excluded.season, transfers.season) IS NOT transfers.season
+        """, rows)
+        changed = conn.total_changes - changes_before
+        if changed:
+            _bump_table_versions(("transfers",), conn)
+        conn.commit()
+        conn.close()
+        return changed
+    except sqlite3.Error as e:
+        logger.error("Erreur lors de l'enregistrement des transferts: %s", e, extra={"player": player_name})
+        if 'conn' in locals():
+            conn.close()
+        return 0
+
+SEASON_STATS_COLUMNS = [
+    'season', 'comp', 'squad', 'age', 'country', 'matches_played', 'starts', 'minutes',
+    'goals', 'assists', 'penalties', 'yellow_cards', 'red_cards', 'xg', 'xg_assist', 'source_url'
+]
+
+def save_season_stats(player_id: int, season_rows: Iterable[Dict[str, Any]]) -> int:
+    """
+    Enregistre toutes les lignes saison/compétition d'un joueur en une seule transaction
+    (UPSERT sur joueur + saison + compétition + club). Retourne le nombre de lignes écrites.
+    """
+    if not player_id:
+        return 0
+    rows = [
+        (player_id, *[row.get(col) if col not in ('comp', 'squad') else (row.get(col) or '')
+                      for col in SEASON_STATS_COLUMNS])
+        for row in season_rows
+        if row.get('season')
+    ]
+    if not rows:
+        return 0
+
+    columns = ['player_id'] + SEASON_STATS_COLUMNS
+    updates = ', '.join(
+        f"{col} = COALESCE(excluded.{col}, player_season_stats.{col})"
+        for col in SEASON_STATS_COLUMNS if col not in ('season', 'comp', 'squad')
+    )
+    try:
+        conn = get_db_connection()
+        conn.executemany(f"""
+            INSERT INTO player_season_stats ({', '.join(columns)})
+            VALUES ({', '.join('?' * len(columns))})
+            ON CONFLICT(player_id, season, comp, squad) DO UPDATE SET
+                {updates}, updated_at = CURRENT_TIMESTAMP
+        """, rows)
+        _bump_table_versions(("player_season_stats",), conn)
+        conn.commit()
+        conn.close()
+        return len(rows)
+    except sqlite3.Error as e:
+        logger.error("Erreur lors de l'enregistrement des stats par saison: %s", e, extra={"player_id": player_id})
+        if 'conn' in locals():
+            conn.close()
+        return 0
+
+def get_season_stats(player_id: int) -> List[Dict[str, Any]]:
+    """Retourne les stats saison par saison d'un joueur, avec les ratios par 90 minutes."""
+    try:
+        conn = get_db_connection()
+        rows = conn.execute("""
+            SELECT *,
+                   CASE WHEN minutes > 0 THEN ROUND(goals * 90.0 / minutes, 2) END AS goals_per90,
+                   CASE WHEN minutes > 0 THEN ROUND(assists * 90.0 / minutes, 2) END AS assists_per90
+            FROM player_season_stats
+            WHERE player_id = ?
+            ORDER BY season, comp, squad
+        """, (player_id,)).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+    except sqlite3.Error as e:
+        logger.error("Erreur lors de la lecture des stats par saison: %s", e, extra={"player_id": player_id})
+        if 'conn' in locals():
+            conn.close()
+        return []
+
+def get_market_value_series(
+    player_id: int,
+    start: Optional[date] = None,
+    end: Optional[date] = None
+) -> List[Tuple[date, int]]:
+    """Retourne les points (date, valeur en euros) d'un joueur, triés par date croissante."""
+    query = "SELECT day, value_eur FROM market_value_points WHERE player_id = ?"
+    params: List[Any] = [player_id]
+    if start:
+        query += " AND day >= ?"
+        params.append(_day_number(start))
+    if end:
+        query += " AND day <= ?"
+        params.append(_day_number(end))
+    query += " ORDER BY day"
+
+    try:
+        conn = get_db_connection()
+        rows = conn.execute(query, params).fetchall()
+        conn.close()
+        return [(_day_to_date(day), value_eur) for day, value_eur in rows]
+    except sqlite3.Error as e:
+        logger.error("Erreur lors de la lecture de l'historique des valeurs: %s", e, extra={"player_id": player_id})
+        if 'conn' in locals():
+            conn.close()
+        return []
+
+# --- Métriques dérivées (table player_metrics) ---
+# Colonnes classées par rang centile (0-100) parmi les joueurs du même groupe de postes
+PLAYER_METRICS = ("minutes_played", "market_value_eur", "goals_per90", "assists_per90", "contributions_per90")
+
+# Tranches d'âge des classements : (libellé, âge minimal, âge maximal)
+AGE_BANDS = (("u21", 1, 20), ("21-24", 21, 24), ("25-28", 25, 28), ("29+", 29, 200))
+
+# Valeurs brutes des métriques, calculées depuis la table players
+_METRICS_BASE_SQL = f"""
+    SELECT id AS player_id,
+           position_group(position) AS position_group,
+           minutes_played,
+           CASE WHEN market_value_eur > 0 THEN market_value_eur END AS market_value_eur,
+           CASE WHEN minutes_played >= {PER90_MIN_MINUTES}
+                THEN ROUND(COALESCE(goals, 0) * 90.0 / minutes_played, 3) END AS goals_per90,
+           CASE WHEN minutes_played >= {PER90_MIN_MINUTES}
+                THEN ROUND(COALESCE(assists, 0) * 90.0 / minutes_played, 3) END AS assists_per90,
+           CASE WHEN minutes_played >= {PER90_MIN_MINUTES}
+                THEN ROUND((COALESCE(goals, 0) + COALESCE(assists, 0)) * 90.0 / minutes_played, 3) END AS contributions_per90,
+           NULLIF(nationality, '') AS nationality,
+           CASE {" ".join(f"WHEN age BETWEEN {low} AND {high} THEN '{label}'" for label, low, high in AGE_BANDS)} END AS age_band,
+           goals,
+           assists
+    FROM players
+"""
+_METRICS_BASE_COLUMNS = ("player_id", "position_group", *PLAYER_METRICS, "nationality", "age_band", "goals", "assists")
+
+# Ratios par match stockés dans la table players (colonnes historiques)
+_PER_MATCH_EXPR = {
+    'goals_per_match': "CASE WHEN appearances > 0 THEN ROUND(COALESCE(goals, 0) * 1.0 / appearances, 2) END",
+    'assists_per_match': "CASE WHEN appearances > 0 THEN ROUND(COALESCE(assists, 0) * 1.0 / appearances, 2) END",
+}
+
+def _create_player_metrics_indexes(conn: sqlite3.Connection):
+    """Index (poste, métrique) : classements par poste et comptage des rangs incrémentaux."""
+    for metric in PLAYER_METRICS:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_player_metrics_{metric} ON player_metrics(position_group, {metric})")
+
+def _update_per_match(conn: sqlite3.Connection, where: str = "1 = 1", params: tuple = ()):
+    """Remplit goals_per_match / assists_per_match sans réécrire les lignes déjà à jour."""
+    assignments = ", ".join(f"{col} = {expr}" for col, expr in _PER_MATCH_EXPR.items())
+    changed = " OR ".join(f"{col} IS NOT ({expr})" for col, expr in _PER_MATCH_EXPR.items())
+    conn.execute(f"UPDATE players SET {assignments} WHERE ({where}) AND ({changed})", params)
+
+def _percent_ranks(groups, values):
+    """
+    Rangs centiles (0-100, arrondis au dixième) de `values` au sein de chaque groupe, comme
+    PERCENT_RANK() : nombre de valeurs strictement inférieures / (effectif du groupe - 1).
+    NaN pour les valeurs manquantes ou sans groupe (-1).
+    """
+    import numpy as np
+
+    pct = np.full(len(values), np.nan)
+    rows = np.flatnonzero(~np.isnan(values) & (groups >= 0))
+    order = rows[np.lexsort((values[rows], groups[rows]))]
+    g, v = groups[order], values[order]
+    group_start = np.searchsorted(g, g, "left")
+    group_size = np.searchsorted(g, g, "right") - group_start
+    # Position de la première occurrence de chaque valeur (ex aequo = même rang)
+    is_first = np.r_[True, (g[1:] != g[:-1]) | (v[1:] != v[:-1])]
+    first = np.maximum.accumulate(np.where(is_first, np.arange(len(v)), 0))
+    # Arrondi au dixième supérieur à partir de ,05 comme ROUND() de SQLite
+    pct[order] = np.floor(1000 * (first - group_start) / np.maximum(1, group_size - 1) + 0.5) / 10
+    return pct
+
+# Joueurs reclassés incrémentalement depuis le dernier recalcul complet de ce processus
+_metrics_drift = {"rows": None, "refreshed": 0}
+_metrics_drift_lock = threading.Lock()
+
+def _rebuild_player_metrics(conn: sqlite3.Connection):
+    """
+    Recalcule toute la table player_metrics en une passe : valeurs par 90 minutes lues en
+    une requête, rangs centiles par poste calculés de façon vectorisée (NumPy, chargé
+    uniquement ici), puis réécriture en bloc. Environ deux fois plus rapide que
+    PERCENT_RANK() en SQL, qui trie toute la table une fois par métrique.
+    Les joueurs sans poste reconnu ou sans valeur pour une métrique ne sont pas classés.
+    """
+    import numpy as np
+
+    conn.create_function("position_group", 1, position_group, deterministic=True)
+    rows = conn.execute(_METRICS_BASE_SQL).fetchall()
+    ranks = []
+    if rows:
+        columns = list(zip(*rows))
+        group_index = {g: i for i, g in enumerate(POSITION_GROUPS)}
+        groups = np.array([group_index.get(g, -1) for g in columns[1]])
+        for j in range(len(PLAYER_METRICS)):
+            pct = _percent_ranks(groups, np.array(columns[2 + j], dtype=np.float64))
+            ranks.append(np.where(np.isnan(pct), None, pct).tolist())
+
+    all_columns = [*_METRICS_BASE_COLUMNS, *(m + "_pct" for m in PLAYER_METRICS)]
+    conn.execute("DELETE FROM player_metrics")
+    # Index supprimés pendant le remplissage puis recréés d'un bloc (3 à 4 fois plus rapide
+    # que leur mise à jour ligne par ligne) ; le tout dans la même transaction
+    for metric in PLAYER_METRICS:
+        conn.execute(f"DROP INDEX IF EXISTS idx_player_metrics_{metric}")
+    conn.executemany(
+        f"INSERT INTO player_metrics ({', '.join(all_columns)}) VALUES ({', '.join('?' * len(all_columns))})",
+        [tuple(row) + pcts for row, pcts in zip(rows, zip(*ranks))],
+    )
+    _create_player_metrics_indexes(conn)
+    _rebuild_leaderboards(conn, rows)
+    _update_per_match(conn)
+    conn.commit()
+    with _metrics_drift_lock:
+        _metrics_drift.update(rows=len(rows), refreshed=0)
+
+def _metrics_rebuild_due(conn: sqlite3.Connection, refreshed: int) -> bool:
+    """Comptabilise `refreshed` joueurs reclassés un par un ; True si un recalcul complet est dû."""
+    if METRICS_REBUILD_RATIO <= 0:
+        return False
+    with _metrics_drift_lock:
+        if _metrics_drift["rows"] is None:
+            _metrics_drift["rows"] = conn.execute("SELECT COUNT(*) FROM player_metrics").fetchone()[0]
+        _metrics_drift["refreshed"] += refreshed
+        return _metrics_drift["refreshed"] > METRICS_REBUILD_RATIO * _metrics_drift["rows"]
+
+def _refresh_player_metrics_rows(conn: sqlite3.Connection, player_ids: List[int]):
+    """
+    Met à jour les métriques de quelques joueurs : rang centile = nombre de joueurs du même
+    poste strictement inférieurs / (effectif classé - 1), comme PERCENT_RANK(), compté sur
+    l'index (poste, métrique). Les rangs des autres joueurs ne bougent qu'à la prochaine
+    reconstruction complète. Sans poste reconnu, le joueur n'est pas classé.
+    """
+    conn.create_function("position_group", 1, position_group, deterministic=True)
+    columns = ", ".join(_METRICS_BASE_COLUMNS)
+    ranks = ", ".join(
+        f"""{m}_pct = CASE WHEN {m} IS NOT NULL THEN ROUND(100.0 * (
+                SELECT COUNT(*) FROM player_metrics AS o
+                WHERE o.position_group = player_metrics.position_group AND o.{m} < player_metrics.{m}
+            ) / MAX(1, (
+                SELECT COUNT(*) FROM player_metrics AS o
+                WHERE o.position_group = player_metrics.position_group AND o.{m} IS NOT NULL
+            ) - 1), 1) END"""
+        for m in PLAYER_METRICS
+    )
+    for start in range(0, len(player_ids), MAX_SQL_VARIABLES):
+        chunk = player_ids[start:start + MAX_SQL_VARIABLES]
+        placeholders = ", ".join("?" * len(chunk))
+        conn.execute(f"""
+            INSERT OR REPLACE INTO player_metrics ({columns})
+            SELECT {columns} FROM ({_METRICS_BASE_SQL} WHERE id IN ({placeholders})) AS base
+        """, chunk)
+        conn.execute(f"UPDATE player_metrics SET {ranks} WHERE player_id IN ({placeholders})", chunk)
+        _update_per_match(conn, f"id IN ({placeholders})", tuple(chunk))
+    _refresh_leaderboards(conn, player_ids)
+    conn.commit()
+
+# --- Classements (table leaderboard_entries) ---
+LEADERBOARD_METRICS = ("goals", "assists", "minutes_played", "market_value_eur", "goals_per90", "assists_per90", "contributions_per90")
+
+# Regroupement -> colonne de player_metrics qui définit le groupe (None : classement général)
+LEADERBOARD_DIMENSIONS = {"all": None, "position": "position_group", "nationality": "nationality", "age_band": "age_band"}
+
+def _rebuild_leaderboards(conn: sqlite3.Connection, rows: List[tuple]):
+    """
+    Recalcule tous les classements à partir des lignes de _METRICS_BASE_SQL : pour chaque
+    métrique et regroupement, un tri NumPy (groupe, valeur décroissante, id) et les
+    LEADERBOARD_SIZE premiers de chaque groupe.
+    """
+    import numpy as np
+
+    conn.execute("DELETE FROM leaderboard_entries")
+    if not rows:
+        return
+    columns = dict(zip(_METRICS_BASE_COLUMNS, zip(*rows)))
+    ids = np.array(columns["player_id"], dtype=np.int64)
+    entries = []
+    for dimension, group_column in LEADERBOARD_DIMENSIONS.items():
+        if group_column is None:
+            keys, codes = [""], np.zeros(len(ids), dtype=np.int64)
+        else:
+            key_index: Dict[str, int] = {}
+            codes = np.array([key_index.setdefault(g, len(key_index)) if g else -1 for g in columns[group_column]])
+            keys = list(key_index)
+        for metric in LEADERBOARD_METRICS:
+            values = np.array(columns[metric], dtype=np.float64)
+            valid = np.flatnonzero(~np.isnan(values) & (codes >= 0))
+            order = valid[np.lexsort((ids[valid], -values[valid], codes[valid]))]
+            ordered_codes = codes[order]
+            rank = np.arange(len(order)) - np.searchsorted(ordered_codes, ordered_codes, "left")
+            top = order[rank < LEADERBOARD_SIZE]
+            entries.extend(zip(
+                [metric] * len(top), [dimension] * len(top), [keys[c] for c in codes[top]],
+                values[top].tolist(), ids[top].tolist(),
+            ))
+    conn.executemany(
+        "INSERT INTO leaderboard_entries (metric, dimension, group_key, value, player_id) VALUES (?, ?, ?, ?, ?)",
+        entries,
+    )
+
+def _update_leaderboard(conn: sqlite3.Connection, key: Tuple[str, str, str], player_id: int,
+                        value: Optional[float], was_listed: bool):
+    """
+    Replace un joueur (déjà retiré) dans un classement qui contient les LEADERBOARD_SIZE
+    meilleurs du groupe : insertion s'il bat le dernier (ou si le classement n'était pas
+    plein), en évinçant ce dernier si besoin. S'il ne bat plus le dernier alors qu'il
+    occupait une place d'un classement plein, la place revient au meilleur joueur non
+    classé du groupe, lu dans player_metrics (éventuellement lui-même).
+    """
+    metric, dimension, group_key = key
+    where = "metric = ? AND dimension = ? AND group_key = ?"
+    count = conn.execute(f"SELECT COUNT(*) FROM leaderboard_entries WHERE {where}", key).fetchone()[0]
+    last = conn.execute(
+        f"SELECT value, player_id FROM leaderboard_entries WHERE {where} ORDER BY value ASC, player_id DESC LIMIT 1", key
+    ).fetchone()
+    was_full = count + was_listed >= LEADERBOARD_SIZE
+    beats_last = last is not None and value is not None and (value, -player_id) > (last[0], -last[1])
+    if value is not None and (beats_last or not was_full):
+        conn.execute("INSERT INTO leaderboard_entries (metric, dimension, group_key, value, player_id) VALUES (?, ?, ?, ?, ?)",
+                     (*key, value, player_id))
+        if count >= LEADERBOARD_SIZE:
+            conn.execute(f"DELETE FROM leaderboard_entries WHERE {where} AND value = ? AND player_id = ?", (*key, *last))
+    elif was_listed and was_full:
+        group_column = LEADERBOARD_DIMENSIONS[dimension]
+        group_filter, params = (f"AND {group_column} = ?", [group_key]) if group_column else ("", [])
+        candidate = conn.execute(f"""
+            SELECT player_id, {metric} FROM player_metrics
+            WHERE {metric} IS NOT NULL {group_filter}
+              AND player_id NOT IN (SELECT player_id FROM leaderboard_entries WHERE {where})
+            ORDER BY {metric} DESC, player_id LIMIT 1
+        """, (*params, *key)).fetchone()
+        if candidate:
+            conn.execute("INSERT INTO leaderboard_entries (metric, dimension, group_key, value, player_id) VALUES (?, ?, ?, ?, ?)",
+                         (*key, candidate[1], candidate[0]))
+
+def _refresh_leaderboards(conn: sqlite3.Connection, player_ids: List[int]):
+    """Met à jour les classements des joueurs dont les métriques viennent d'être recalculées."""
+    for player_id in player_ids:
+        listed = {tuple(row) for row in conn.execute(
+            "SELECT metric, dimension, group_key FROM leaderboard_entries WHERE player_id = ?", (player_id,))}
+        conn.execute("DELETE FROM leaderboard_entries WHERE player_id = ?", (player_id,))
+        row = conn.execute("SELECT * FROM player_metrics WHERE player_id = ?", (player_id,)).fetchone()
+        targets = {}
+        for metric in LEADERBOARD_METRICS:
+            if row is None or row[metric] is None:
+                continue
+            for dimension, group_column in LEADERBOARD_DIMENSIONS.items():
+                group_key = row[group_column] if group_column else ""
+                if group_key is not None:
+                    targets[(metric, dimension, group_key)] = row[metric]
+        for key in listed | targets.keys():
+            _update_leaderboard(conn, key, player_id, targets.get(key), key in listed)
+
+def get_leaderboard(metric: str, dimension: str = "all", group_key: str = "", limit: int = 20,
+                    after: Optional[Tuple[float, int]] = None) -> List[Dict[str, Any]]:
+    """
+    Page d'un classement, du meilleur au moins bon. `after` = (valeur, player_id) de la
+    dernière ligne de la page précédente : pagination par curseur sur la clé primaire.
+    """
+    query = """
+        SELECT e.value, e.player_id, p.name, p.age, p.nationality, p.current_club, p.position, p.image_url
+        FROM leaderboard_entries AS e JOIN players AS p ON p.id = e.player_id
+        WHERE e.metric = ? AND e.dimension = ? AND e.group_key = ?
+    """
+    params: List[Any] = [metric, dimension, group_key]
+    if after is not None:
+        query += " AND (e.value < ? OR (e.value = ? AND e.player_id > ?))"
+        params.extend([after[0], after[0], after[1]])
+    query += " ORDER BY e.value DESC, e.player_id LIMIT ?"
+    params.append(limit)
+    try:
+        conn = get_db_connection()
+        rows = conn.execute(query, params).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+    except sqlite3.Error as e:
+        logger.error("Erreur lors de la lecture d'un classement: %s", e, extra={"metric": metric, "dimension": dimension})
+        if 'conn' in locals():
+            conn.close()
+        return []
+
+def list_leaderboard_groups() -> Dict[str, List[str]]:
+    """Groupes disponibles pour chaque regroupement (postes, nationalités, tranches d'âge)."""
+    try:
+        conn = get_db_connection()
+        rows = conn.execute("SELECT DISTINCT dimension, group_key FROM leaderboard_entries ORDER BY dimension, group_key").fetchall()
+        conn.close()
+    except sqlite3.Error as e:
+        logger.error("Erreur lors de la lecture des classements: %s", e)
+        if 'conn' in locals():
+            conn.close()
+        rows = []
+    groups: Dict[str, List[str]] = {dimension: [] for dimension in LEADERBOARD_DIMENSIONS if dimension != "all"}
+    for dimension, group_key in rows:
+        if dimension in groups:
+            groups[dimension].append(group_key)
+    return groups
+
+def refresh_player_metrics(names: Optional[List[str]] = None):
+    """
+    Recalcule les métriques dérivées après une écriture : incrémentalement pour quelques
+    joueurs, en une passe complète pour un lot important (ou si `names` vaut None), ou
+    lorsque les mises à jour incrémentales cumulées dépassent METRICS_REBUILD_RATIO.
+    """
+    try:
+        conn = get_db_connection()
+        if names is None or len(names) > METRICS_INCREMENTAL_MAX:
+            _rebuild_player_metrics(conn)
+        elif names:
+            cur = conn.execute(
+                f"SELECT id FROM players WHERE name IN ({', '.join('?' * len(names))})", list(names)
+            )
+            player_ids = [row[0] for row in cur.fetchall()]
+            _refresh_player_metrics_rows(conn, player_ids)
+            if _metrics_rebuild_due(conn, len(player_ids)):
+                _rebuild_player_metrics(conn)
+        conn.close()
+    except sqlite3.Error as e:
+        logger.error("Erreur lors du calcul des métriques dérivées: %s", e, extra={"players": len(names or [])})
+        if 'conn' in locals():
+            conn.close()
+
+def get_player_metrics(player_id: int) -> Optional[Dict[str, Any]]:
+    """Métriques dérivées d'un joueur : ratios par match, par 90 minutes et rangs centiles à son poste."""
+    try:
+        conn = get_db_connection()
+        row = conn.execute("""
+            SELECT m.*, p.goals_per_match, p.assists_per_match
+            FROM player_metrics AS m JOIN players AS p ON p.id = m.player_id
+            WHERE m.player_id = ?
+        """, (player_id,)).fetchone()
+        conn.close()
+        return dict(row) if row else None
+    except sqlite3.Error as e:
+        logger.error("Erreur lors de la récupération des métriques: %s", e, extra={"player_id": player_id})
+        if 'conn' in locals():
+            conn.close()
+        return None
+
+# --- Versions des tables (validation des réponses HTTP mises en cache) ---
+# Tables lues par les endpoints mis en cache ; player_metrics et les classements suivent "players"
+VERSIONED_TABLES = ("players", "transfers", "market_value_points", "player_season_stats")
+
+_BUMP_VERSION_SQL = """
+    INSERT INTO table_versions (table_name, version) VALUES (?, 1)
+    ON CONFLICT(table_name) DO UPDATE SET version = version + 1
+"""
+
+def _bump_table_versions(tables: Iterable[str], conn: Optional[sqlite3.Connection] = None):
+    """Incrémente la version des tables modifiées, dans la transaction de `conn` si fournie."""
+    if conn is not None:
+        conn.executemany(_BUMP_VERSION_SQL, [(table,) for table in tables])
+        return
+    try:
+        conn = get_db_connection()
+        conn.executemany(_BUMP_VERSION_SQL, [(table,) for table in tables])
+        conn.commit()
+        conn.close()
+    except sqlite3.Error as e:
+        logger.error("Erreur lors de l'incrément des versions: %s", e, extra={"tables": list(tables)})
+        if conn is not None:
+            conn.close()
+
+# Connexion dédiée à la lecture des versions : PRAGMA data_version n'y change que si une autre
+# connexion (autre thread, autre worker) a validé une écriture depuis la lecture précédente
+_versions_lock = threading.Lock()
+_versions_conn: Optional[sqlite3.Connection] = None
+_versions_path: Optional[str] = None
+_versions_data_version: Optional[int] = None
+_versions: Dict[str, int] = {}
+
+def get_table_versions() -> Dict[str, int]:
+    """
+    Versions courantes des tables (dictionnaire vide en cas d'erreur). Sans écriture depuis
+    l'appel précédent, coûte un PRAGMA data_version (quelques microsecondes).
+    """
+    global _versions_conn, _versions_path, _versions_data_version, _versions
+    with _versions_lock:
+        try:
+            if _versions_conn is None or _versions_path != DB_PATH:
+                if _versions_conn is not None:
+                    _versions_conn.close()
+                _versions_conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+                _versions_path, _versions_data_version = DB_PATH, None
+            data_version = _versions_conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version != _versions_data_version:
+                _versions = dict(_versions_conn.execute("SELECT table_name, version FROM table_versions"))
+                _versions_data_version = data_version
+            return _versions
+        except sqlite3.Error as e:
+            logger.error("Erreur lors de la lecture des versions: %s", e)
+            if _versions_conn is not None:
+                _versions_conn.close()
+            _versions_conn = None
+            return {}
+
+# --- Écoute des écritures sur la table players (index en mémoire, caches dérivés) ---
+_player_write_listeners: List[Callable[[List[str]], None]] = []
+
+def add_player_write_listener(listener: Callable[[List[str]], None]):
+    """Enregistre une fonction appelée avec les noms des joueurs écrits, après chaque commit."""
+    if listener not in _player_write_listeners:
+        _player_write_listeners.append(listener)
+
+def remove_player_write_listener(listener: Callable[[List[str]], None]):
+    if listener in _player_write_listeners:
+        _player_write_listeners.remove(listener)
+
+# Noms écrits pendant le bloc coalesce_player_writes() en cours (contexte du thread appelant)
+_pending_player_writes: contextvars.ContextVar = contextvars.ContextVar("pending_player_writes", default=None)
+
+@contextmanager
+def coalesce_player_writes():
+    """
+    Regroupe les notifications d'écriture du bloc (ex: un scraping qui enregistre le joueur,
+    son alias puis son rapport) en une seule à la sortie : métriques, version "players"
+    et écouteurs ne sont alors mis à jour qu'une fois. Les blocs imbriqués rejoignent le
+    bloc englobant.
+    """
+    if _pending_player_writes.get() is not None:
+        yield
+        return
+    pending: Dict[str, None] = {}
+    token = _pending_player_writes.set(pending)
+    try:
+        yield
+    finally:
+        _pending_player_writes.reset(token)
+        if pending:
+            _notify_player_write(list(pending))
+
+def _notify_player_write(names: List[str]):
+    pending = _pending_player_writes.get()
+    if pending is not None:
+        pending.update(dict.fromkeys(names))
+        return
+    # Tables dérivées d'abord : les écouteurs lisent des métriques à jour
+    refresh_player_metrics(names)
+    # Puis la version : une réponse mise en cache sous la nouvelle version inclut ces métriques
+    if names:
+        _bump_table_versions(("players",))
+    for listener in list(_player_write_listeners):
+        try:
+            listener(names)
+        except Exception as e:
+            logger.error("Erreur d'un écouteur d'écriture: %s", e, extra={"players": len(names)})
+
+def _prepare_player_row(player_data: Dict[str, Any], table_columns: set) -> Dict[str, Any]:
+    """Filtre les données d'un joueur sur les colonnes existantes et calcule les colonnes dérivées."""
+    valid_data = {k: v for k, v in player_data.items() if k in table_columns and v is not None}
+    if 'market_value' in valid_data and 'market_value_eur' in table_columns and 'market_value_eur' not in valid_data:
+        market_value_eur = parse_market_value(valid_data['market_value'])
+        if market_value_eur is not None:
+            valid_data['market_value_eur'] = market_value_eur
+    return valid_data
 
 def save_player_to_db(player_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """Insère ou met à jour les données d'un joueur avec gestion d'erreurs améliorée."""
     if not player_data or not player_data.get('name'):
-        print("-> Données invalides pour la sauvegarde")
+        logger.warning("Données invalides pour la sauvegarde")
         return None
     
     try:
-        init_db()  # S'assure que la DB est initialisée
+        ensure_db()  # S'assure que la DB est initialisée (une fois par processus)
         conn = get_db_connection()
         cur = conn.cursor()
 
@@ -135,68 +1174,155 @@ def save_player_to_db(player_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         table_columns = {row[1] for row in cur.fetchall()}
         
         # Filtre les données pour ne garder que les colonnes existantes
-        valid_data = {k: v for k, v in player_data.items() if k in table_columns and v is not None}
+        valid_data = _prepare_player_row(player_data, table_columns)
         
         if not valid_data or 'name' not in valid_data:
-            print("-> Aucune donnée valide à sauvegarder")
+            logger.warning("Aucune donnée valide à sauvegarder", extra={"player": player_data.get('name')})
             conn.close()
             return None
 
         # Construit la requête SQL de manière plus sûre
         columns = list(valid_data.keys())
         if not columns:
-            print("-> Aucune colonne valide pour la sauvegarde")
+            logger.warning("Aucune colonne valide pour la sauvegarde", extra={"player": player_data.get('name')})
             conn.close()
             return None
             
-        placeholders = ', '.join('?' * len(columns))
-        columns_str = ', '.join(columns)
-        
-        # Utilise INSERT OR REPLACE de manière plus sûre
-        sql = f"INSERT OR REPLACE INTO players ({columns_str}) VALUES ({placeholders})"
-        
-        # Prépare les valeurs dans le bon ordre et convertit None en NULL SQL
-        values = []
-        for col in columns:
-            val = valid_data[col]
-            # Convertit None en chaîne vide pour les champs TEXT
-            if val is None:
-                val = ''
-            values.append(val)
-
-        cur.execute(sql, values)
-        conn.commit()
-        
-        # Récupère le joueur sauvegardé
-        player_name = valid_data.get('name')
-        cur.execute("SELECT * FROM players WHERE name = ?", (player_name,))
-        row = cur.fetchone()
+        # UPSERT : conserve l'id, created_at et les colonnes absentes (ex: scouting_report)
+        sql = _players_upsert_sql(columns)
+        values = [valid_data[col] for col in columns]
+
+        if SUPPORTS_RETURNING:
+            cur.execute(sql + " RETURNING *", values)
+            row = cur.fetchone()
+            conn.commit()
+        else:
+            cur.execute(sql, values)
+            conn.commit()
+            # Récupère le joueur sauvegardé
+            cur.execute("SELECT * FROM players WHERE name = ?", (valid_data['name'],))
+            row = cur.fetchone()
         
         if row:
             saved_player = dict(row)
             conn.close()
+            _notify_player_write([saved_player['name']])
             return saved_player
         else:
             conn.close()
             return None
             
     except sqlite3.Error as e:
-        print(f"Erreur DB lors de la sauvegarde de {player_data.get('name')}: {e}")
-        import traceback
-        print(f"Traceback DB: {traceback.format_exc()}")
+        logger.exception("Erreur DB lors de la sauvegarde: %s", e, extra={"player": player_data.get('name')})
         if 'conn' in locals():
             conn.close()
         return None
     except Exception as e:
-        print(f"Erreur inattendue lors de la sauvegarde: {e}")
-        import traceback
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.exception("Erreur inattendue lors de la sauvegarde: %s", e, extra={"player": player_data.get('name')})
         if 'conn' in locals():
             conn.close()
         return None
 
+# Colonnes jamais écrasées lors d'une mise à jour d'un joueur existant
+UPSERT_PRESERVED_COLUMNS = {'id', 'name', 'created_at', 'updated_at'}
+
+def _players_upsert_sql(columns: List[str], row_count: int = 1) -> str:
+    """
+    Construit la requête d'UPSERT (multi-lignes) pour la table players.
+    Contrairement à INSERT OR REPLACE, la ligne existante est mise à jour sur place :
+    l'id reste stable et une valeur NULL ne remplace jamais une valeur déjà stockée.
+    """
+    row_placeholders = '(' + ', '.join('?' * len(columns)) + ')'
+    values_sql = ', '.join([row_placeholders] * row_count)
+    assignments = [
+        f"{col} = COALESCE(excluded.{col}, players.{col})"
+        for col in columns if col not in UPSERT_PRESERVED_COLUMNS
+    ]
+    assignments.append("updated_at = CURRENT_TIMESTAMP")
+    return (
+        f"INSERT INTO players ({', '.join(columns)}) VALUES {values_sql} "
+        f"ON CONFLICT(name) DO UPDATE SET {', '.join(assignments)}"
+    )
+
+def _write_players_batch(cur: sqlite3.Cursor, batch: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Écrit un lot de joueurs (sans commit) et retourne {nom: id}."""
+    # Regroupe les joueurs par jeu de colonnes pour partager la même requête
+    groups: Dict[tuple, List[tuple]] = {}
+    for valid_data in batch:
+        columns = tuple(valid_data.keys())
+        groups.setdefault(columns, []).append(tuple(valid_data[col] for col in columns))
+
+    saved_ids: Dict[str, int] = {}
+    for columns, rows in groups.items():
+        columns = list(columns)
+        if SUPPORTS_RETURNING:
+            # Une seule requête multi-lignes par paquet : les ids reviennent via RETURNING
+            rows_per_statement = max(1, MAX_SQL_VARIABLES // len(columns))
+            for start in range(0, len(rows), rows_per_statement):
+                chunk = rows[start:start + rows_per_statement]
+                sql = _players_upsert_sql(columns, len(chunk)) + " RETURNING id, name"
+                params = [val for row in chunk for val in row]
+                for player_id, name in cur.execute(sql, params).fetchall():
+                    saved_ids[name] = player_id
+        else:
+            cur.executemany(_players_upsert_sql(columns), rows)
+            name_index = columns.index('name')
+            names = [row[name_index] for row in rows]
+            for start in range(0, len(names), MAX_SQL_VARIABLES):
+                chunk = names[start:start + MAX_SQL_VARIABLES]
+                cur.execute(
+                    f"SELECT id, name FROM players WHERE name IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                )
+                saved_ids.update({name: player_id for player_id, name in cur.fetchall()})
+    return saved_ids
+
+def save_players_bulk(players: Iterable[Dict[str, Any]], batch_size: int = BULK_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Insère ou met à jour un lot de joueurs en regroupant les écritures par transaction
+    de `batch_size` joueurs. Retourne un dictionnaire {nom: id} des joueurs sauvegardés.
+    """
+    saved_ids: Dict[str, int] = {}
+    batch_size = max(1, batch_size)
+
+    try:
+        ensure_db()
+        conn = get_db_connection()
+        cur = conn.cursor()
+
+        cur.execute("PRAGMA table_info(players)")
+        table_columns = {row[1] for row in cur.fetchall()}
+
+        batch = []
+        for player_data in players:
+            if not player_data or not player_data.get('name'):
+                continue
+            batch.append(_prepare_player_row(player_data, table_columns))
+            if len(batch) >= batch_size:
+                saved_ids.update(_write_players_batch(cur, batch))
+                conn.commit()
+                batch = []
+
+        if batch:
+            saved_ids.update(_write_players_batch(cur, batch))
+            conn.commit()
+
+        conn.close()
+        _notify_player_write(list(saved_ids))
+        return saved_ids
+
+    except sqlite3.Error as e:
+        logger.error("Erreur DB lors de la sauvegarde en masse: %s", e, extra={"saved": len(saved_ids)})
+        if 'conn' in locals():
+            conn.rollback()
+            conn.close()
+        # Les lots précédents sont déjà validés : index et caches doivent les voir
+        if saved_ids:
+            _notify_player_write(list(saved_ids))
+        return saved_ids
+
 def update_player_field(player_name: str, field: str, value: Any) -> bool:
-    """Met à jour un champ spécifique d'un joueur."""
+    """Met à jour un champ spécifique d'un joueur ; False si aucun joueur ne porte ce nom."""
     if not player_name or not field:
         return False
     
@@ -209,10 +1335,15 @@ def update_player_field(player_name: str, field: str, value: Any) -> bool:
         table_columns = {row[1] for row in cur.fetchall()}
         
         if field not in table_columns:
-            print(f"-> Colonne '{field}' n'existe pas dans la table players")
+            logger.warning("Colonne inexistante dans la table players", extra={"field": field})
             conn.close()
             return False
         
+        # La valeur marchande texte entraîne la mise à jour de sa version numérique
+        if field == 'market_value' and 'market_value_eur' in table_columns:
+            cur.execute("UPDATE players SET market_value_eur = ? WHERE name = ?",
+                       (parse_market_value(value), player_name))
+
         # Vérifie si la colonne updated_at existe avant de l'utiliser
         if 'updated_at' in table_columns:
             cur.execute(f"UPDATE players SET {field} = ?, updated_at = CURRENT_TIMESTAMP WHERE name = ?", 
@@ -220,12 +1351,45 @@ def update_player_field(player_name: str, field: str, value: Any) -> bool:
         else:
             cur.execute(f"UPDATE players SET {field} = ? WHERE name = ?", 
                        (value, player_name))
+        updated = cur.rowcount > 0
         
         conn.commit()
         conn.close()
-        return True
+        # Aucun joueur de ce nom : rien à rafraîchir
+        if updated:
+            _notify_player_write([player_name])
+        return updated
     except Exception as e:
-        print(f"-> Erreur lors de la mise à jour de {field} pour {player_name}: {e}")
+        logger.error("Erreur lors de la mise à jour d'un champ: %s", e, extra={"field": field, "player": player_name})
+        if 'conn' in locals():
+            conn.close()
+        return False
+
+def save_player_alias(player_id: int, alias: str) -> bool:
+    """
+    Associe un autre nom à un joueur (ex: la recherche "mbape" résolue en "Kylian Mbappé").
+    Ignoré si l'alias replié est vide ou identique au nom du joueur ; un alias déjà connu
+    est réattribué au dernier joueur trouvé.
+    """
+    alias_key = fold_name(alias)
+    if not player_id or not alias_key:
+        return False
+    try:
+        conn = get_db_connection()
+        row = conn.execute("SELECT name FROM players WHERE id = ?", (player_id,)).fetchone()
+        if row is None or fold_name(row["name"]) == alias_key:
+            conn.close()
+            return False
+        conn.execute(
+            "INSERT OR REPLACE INTO player_aliases (alias_key, alias, player_id) VALUES (?, ?, ?)",
+            (alias_key, alias.strip(), player_id),
+        )
+        conn.commit()
+        conn.close()
+        _notify_player_write([row["name"]])
+        return True
+    except sqlite3.Error as e:
+        logger.error("Erreur lors de l'enregistrement d'un alias: %s", e, extra={"player_id": player_id})
         if 'conn' in locals():
             conn.close()
         return False
@@ -242,7 +1406,7 @@ def get_player_by_name(player_name: str) -> Optional[Dict[str, Any]]:
             return dict(row)
         return None
     except Exception as e:
-        print(f"Erreur lors de la récupération du joueur {player_name}: {e}")
+        logger.error("Erreur lors de la récupération du joueur: %s", e, extra={"player": player_name})
         if 'conn' in locals():
             conn.close()
         return None
@@ -259,11 +1423,92 @@ def get_player_by_id(player_id: int) -> Optional[Dict[str, Any]]:
             return dict(row)
         return None
     except Exception as e:
-        print(f"Erreur lors de la récupération du joueur ID {player_id}: {e}")
+        logger.error("Erreur lors de la récupération du joueur: %s", e, extra={"player_id": player_id})
         if 'conn' in locals():
             conn.close()
         return None
 
+def get_players_batch(ids: Optional[List[int]] = None, names: Optional[List[str]] = None,
+                      fields: Optional[List[str]] = None, include_metrics: bool = False
+                      ) -> Tuple[Dict[int, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """
+    Plusieurs joueurs en une seule requête (IN), par ID et/ou par nom exact ; un nom absent de
+    players est ensuite cherché parmi les alias (forme repliée). `fields` restreint les colonnes
+    renvoyées (id et name toujours inclus, ValueError si une colonne n'existe pas) et
+    `include_metrics` joint player_metrics (clé "metrics", comme get_player_metrics).
+    Retourne ({id: joueur}, {nom demandé: joueur}) ; les entrées introuvables sont absentes.
+    """
+    ids = list(dict.fromkeys(ids or []))
+    names = list(dict.fromkeys(names or []))
+    by_id: Dict[int, Dict[str, Any]] = {}
+    by_name: Dict[str, Dict[str, Any]] = {}
+    if not ids and not names:
+        return by_id, by_name
+    try:
+        conn = get_db_connection()
+        table_columns = [row[1] for row in conn.execute("PRAGMA table_info(players)")
+                         if row[1] not in INTERNAL_PLAYER_COLUMNS]
+        if fields is not None:
+            unknown = sorted(set(fields) - set(table_columns))
+            if unknown:
+                conn.close()
+                raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        columns = [c for c in table_columns if fields is None or c in fields or c in ('id', 'name')]
+        select = ", ".join(f"p.{c}" for c in columns)
+        joins = ""
+        if include_metrics:
+            # Colonnes préfixées "metrics." puis regroupées ; player_id NULL = pas encore de métriques
+            metric_columns = [row[1] for row in conn.execute("PRAGMA table_info(player_metrics)")]
+            select += "".join(f', m.{c} AS "metrics.{c}"' for c in metric_columns)
+            select += ', p.goals_per_match AS "metrics.goals_per_match", p.assists_per_match AS "metrics.assists_per_match"'
+            joins = " LEFT JOIN player_metrics AS m ON m.player_id = p.id"
+
+        def fetch(where: str, params: List[Any], key: str = "") -> List[sqlite3.Row]:
+            return conn.execute(f"SELECT {key}{select} FROM players AS p{joins} WHERE {where}", params).fetchall()
+
+        def to_players(rows: List[sqlite3.Row]) -> List[Dict[str, Any]]:
+            if not rows:
+                return []
+            keys = rows[0].keys()
+            player_slots = [(i, k) for i, k in enumerate(keys) if not k.startswith("metrics.")]
+            metric_slots = [(i, k[len("metrics."):]) for i, k in enumerate(keys) if k.startswith("metrics.")]
+            players = []
+            for row in rows:
+                player = {k: row[i] for i, k in player_slots}
+                if include_metrics:
+                    player_metrics = {k: row[i] for i, k in metric_slots}
+                    player["metrics"] = player_metrics if player_metrics["player_id"] is not None else None
+                players.append(player)
+            return players
+
+        clauses, params = [], []
+        if ids:
+            clauses.append(f"p.id IN ({','.join('?' * len(ids))})")
+            params.extend(ids)
+        if names:
+            clauses.append(f"p.name IN ({','.join('?' * len(names))})")
+            params.extend(names)
+        for player in to_players(fetch(" OR ".join(clauses), params)):
+            if player["id"] in ids:
+                by_id[player["id"]] = player
+            if player["name"] in names:
+                by_name[player["name"]] = player
+
+        missing = {fold_name(name): name for name in names if name not in by_name and fold_name(name)}
+        if missing:
+            joins = f" JOIN player_aliases AS a ON a.player_id = p.id{joins}"
+            rows = fetch(f"a.alias_key IN ({','.join('?' * len(missing))})", list(missing), "a.alias_key, ")
+            for player in to_players(rows):
+                by_name[missing[player.pop("alias_key")]] = player
+        conn.close()
+        return by_id, by_name
+    except sqlite3.Error as e:
+        logger.error("Erreur lors de la récupération groupée des joueurs: %s", e,
+                     extra={"ids": len(ids), "names": len(names)})
+        if 'conn' in locals():
+            conn.close()
+        return by_id, by_name
+
 def list_players(filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
     """Récupère la liste des joueurs avec filtres optionnels."""
     try:
@@ -286,6 +1531,17 @@ def list_players(filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any
             if filters.get('max_age'):
                 query += " AND age <= ?"
                 params.append(filters['max_age'])
+            if filters.get('min_value') is not None:
+                query += " AND market_value_eur >= ?"
+                params.append(filters['min_value'])
+            if filters.get('max_value') is not None:
+                query += " AND market_value_eur <= ?"
+                params.append(filters['max_value'])
+            # Tri par valeur marchande : "market_value" (croissant) ou "-market_value" (décroissant)
+            if filters.get('sort') == 'market_value':
+                query += " ORDER BY market_value_eur IS NULL, market_value_eur ASC"
+            elif filters.get('sort') == '-market_value':
+                query += " ORDER BY market_value_eur IS NULL, market_value_eur DESC"
         
         cur.execute(query, tuple(params))
         rows = cur.fetchall()
@@ -293,7 +1549,7 @@ def list_players(filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any
         
         return [dict(row) for row in rows]
     except Exception as e:
-        print(f"Erreur lors de la récupération de la liste des joueurs: {e}")
+        logger.error("Erreur lors de la récupération de la liste des joueurs: %s", e)
         if 'conn' in locals():
             conn.close()
         return []
@@ -0,0 +1,225 @@
+# Filename: backend/image_cache.py
+# Description: Cache disque des photos de joueurs (copie adressée par contenu, variantes redimensionnées, résultats négatifs).
+#
+# Les image_url enregistrées pointent vers Wikimedia (Special:FilePath, souvent l'original de
+# plusieurs Mo) ou vers des miniatures Wikipedia. Chaque URL n'est téléchargée qu'une fois :
+#   - IMAGE_CACHE_DIR/originals/<sha256[:2]>/<sha256> : octets reçus, nommés par leur empreinte
+#     (deux URL qui servent la même image partagent la copie),
+#   - IMAGE_CACHE_DIR/refs/<empreinte de l'URL>.json : URL -> sha256, ou échec avec expiration
+#     (IMAGE_NEGATIVE_TTL pour une image absente, IMAGE_ERROR_TTL pour une erreur passagère),
+#   - IMAGE_CACHE_DIR/variants/<sha256[:2]>/<sha256>/<largeur>.<format> : variantes WebP/JPEG.
+# Le redimensionnement demande Pillow (optionnel) ; sans lui, l'image d'origine est servie telle
+# quelle. Les largeurs sont arrondies à IMAGE_WIDTHS pour borner le nombre de variantes.
+
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional, Tuple
+
+import metrics
+import shared_state
+from database import BASE_DIR
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    Image = None
+
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", os.path.join(BASE_DIR, "images"))
+# Largeurs servies (px) : une largeur demandée est arrondie à la valeur supérieure
+IMAGE_WIDTHS = tuple(sorted(int(w) for w in os.getenv("IMAGE_WIDTHS", "96,200,400,800").split(",") if w.strip()))
+# Largeur demandée à Wikimedia pour les liens Special:FilePath (évite de télécharger l'original)
+IMAGE_SOURCE_WIDTH = int(os.getenv("IMAGE_SOURCE_WIDTH", "800"))
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "80"))
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", str(15 * 1024 * 1024)))
+IMAGE_FETCH_TIMEOUT = float(os.getenv("IMAGE_FETCH_TIMEOUT", "10"))
+# Durée de mémorisation d'une image introuvable (404, pas une image) et d'une erreur passagère (5xx, 429, réseau)
+IMAGE_NEGATIVE_TTL = int(os.getenv("IMAGE_NEGATIVE_TTL", str(7 * 24 * 3600)))
+IMAGE_ERROR_TTL = int(os.getenv("IMAGE_ERROR_TTL", "600"))
+# Cache-Control des photos servies et des réponses 404 (joueur sans photo, qui peut en recevoir une au scraping suivant)
+IMAGE_MAX_AGE = int(os.getenv("IMAGE_MAX_AGE", str(7 * 24 * 3600)))
+IMAGE_MISSING_MAX_AGE = int(os.getenv("IMAGE_MISSING_MAX_AGE", "3600"))
+
+MEDIA_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+def resizing_available() -> bool:
+    return Image is not None
+
+def _webp_supported() -> bool:
+    return Image is not None and features.check("webp")
+
+def choose_width(width: Optional[int]) -> int:
+    """Plus petite largeur servie couvrant `width` (la plus grande si aucune)."""
+    if not width or width <= 0:
+        return IMAGE_WIDTHS[-1]
+    for candidate in IMAGE_WIDTHS:
+        if candidate >= width:
+            return candidate
+    return IMAGE_WIDTHS[-1]
+
+def choose_format(requested: Optional[str], accept: Optional[str]) -> str:
+    """"webp" ou "jpeg" : format demandé, sinon WebP si le navigateur l'accepte."""
+    requested = (requested or "").lower()
+    if requested in ("jpg", "jpeg"):
+        return "jpeg"
+    if requested == "webp" or (not requested and "image/webp" in (accept or "")):
+        return "webp" if _webp_supported() else "jpeg"
+    return "jpeg"
+
+def source_url(url: str) -> str:
+    """URL réellement téléchargée : Special:FilePath renvoie une miniature si une largeur est demandée."""
+    if "Special:FilePath" in url and "width=" not in url and IMAGE_SOURCE_WIDTH > 0:
+        return url + ("&" if "?" in url else "?") + f"width={IMAGE_SOURCE_WIDTH}"
+    return url
+
+# --- Stockage disque (écritures atomiques : fichier temporaire puis os.replace) ---
+
+def _url_key(url: str) -> str:
+    return hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
+
+def _ref_path(url: str) -> str:
+    return os.path.join(IMAGE_CACHE_DIR, "refs", _url_key(url) + ".json")
+
+def _original_path(sha: str) -> str:
+    return os.path.join(IMAGE_CACHE_DIR, "originals", sha[:2], sha)
+
+def _variant_path(sha: str, width: int, fmt: str) -> str:
+    return os.path.join(IMAGE_CACHE_DIR, "variants", sha[:2], sha, f"{width}.{fmt}")
+
+def _write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def _read(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+def _read_ref(url: str) -> Optional[dict]:
+    """Entrée connue pour l'URL, ou None si jamais téléchargée (ou échec expiré)."""
+    data = _read(_ref_path(url))
+    if data is None:
+        return None
+    try:
+        ref = json.loads(data)
+    except ValueError:
+        return None
+    if "sha256" in ref:
+        return ref if os.path.exists(_original_path(ref["sha256"])) else None
+    return ref if ref.get("expires_at", 0) > time.time() else None
+
+def _write_ref(url: str, ref: dict):
+    _write_atomic(_ref_path(url), json.dumps(ref).encode())
+
+# --- Téléchargement ---
+
+def _fetch(url: str) -> dict:
+    """Télécharge l'image et retourne l'entrée à mémoriser (image ou échec avec expiration)."""
+    from scraping import http_client
+    import requests
+
+    def failure(reason: str, ttl: int) -> dict:
+        logger.info("Photo indisponible", extra={"image_url": url, "reason": reason})
+        return {"missing": True, "reason": reason, "expires_at": time.time() + ttl}
+
+    try:
+        resp = http_client.get(source_url(url), source="images", timeout=IMAGE_FETCH_TIMEOUT)
+    except requests.RequestException as e:
+        return failure(type(e).__name__, IMAGE_ERROR_TTL)
+    if resp.status_code == 429 or resp.status_code >= 500:
+        return failure(f"http_{resp.status_code}", IMAGE_ERROR_TTL)
+    if resp.status_code != 200:
+        return failure(f"http_{resp.status_code}", IMAGE_NEGATIVE_TTL)
+    content_type = resp.headers.get("Content-Type", "").split(";")[0].strip()
+    if not content_type.startswith("image/"):
+        return failure("not_an_image", IMAGE_NEGATIVE_TTL)
+    if len(resp.content) > IMAGE_MAX_BYTES:
+        return failure("too_large", IMAGE_NEGATIVE_TTL)
+    sha = hashlib.sha256(resp.content).hexdigest()
+    path = _original_path(sha)
+    if not os.path.exists(path):
+        _write_atomic(path, resp.content)
+    return {"sha256": sha, "content_type": content_type, "size": len(resp.content)}
+
+def get_original(url: str) -> Optional[dict]:
+    """
+    Entrée {"sha256", "content_type"} de l'image, téléchargée au premier appel ; None si
+    l'image est indisponible (échec mémorisé). Un seul téléchargement par URL à la fois,
+    tous workers confondus.
+    """
+    ref = _read_ref(url)
+    result = "hit"
+    if ref is None:
+        with shared_state.lock("image:" + _url_key(url), ttl=IMAGE_FETCH_TIMEOUT * 3,
+                               timeout=IMAGE_FETCH_TIMEOUT * 3):
+            # Un autre worker a pu télécharger l'image pendant l'attente du verrou
+            ref = _read_ref(url)
+            if ref is None:
+                result = "miss"
+                ref = _fetch(url)
+                _write_ref(url, ref)
+    if result == "hit" and ref.get("missing"):
+        result = "negative"
+    metrics.CACHE_LOOKUPS.inc(cache="images", result=result)
+    return None if ref.get("missing") else ref
+
+# --- Variantes ---
+
+def _render(data: bytes, width: int, fmt: str) -> bytes:
+    with Image.open(io.BytesIO(data)) as img:
+        # JPEG : décodage directement à une échelle réduite (1/2, 1/4, 1/8) quand c'est possible
+        img.draft("RGB", (width, max(1, img.height * width // max(img.width, 1))))
+        img = ImageOps.exif_transpose(img)
+        if img.width > width:
+            img.thumbnail((width, img.height), Image.LANCZOS)
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        if fmt == "jpeg" and has_alpha:
+            rgba = img.convert("RGBA")
+            img = Image.new("RGB", rgba.size, (255, 255, 255))
+            img.paste(rgba, mask=rgba.getchannel("A"))
+        elif img.mode not in ("RGB", "RGBA") or (img.mode == "RGBA" and fmt == "jpeg"):
+            img = img.convert("RGBA" if has_alpha else "RGB")
+        out = io.BytesIO()
+        if fmt == "webp":
+            img.save(out, "WEBP", quality=IMAGE_QUALITY, method=4)
+        else:
+            img.save(out, "JPEG", quality=IMAGE_QUALITY, optimize=True, progressive=True)
+        return out.getvalue()
+
+def variant_etag(original: dict, width: int, fmt: str) -> str:
+    """ETag d'une variante : empreinte de l'original, largeur et format (l'original seul sans Pillow)."""
+    if not resizing_available():
+        return f'"{original["sha256"][:32]}"'
+    return f'"{original["sha256"][:32]}-{width}-{fmt}"'
+
+def get_variant(original: dict, width: int, fmt: str) -> Tuple[bytes, str]:
+    """(octets, type de contenu) de la variante, calculée puis conservée sur disque au premier appel."""
+    sha = original["sha256"]
+    if not resizing_available():
+        return _read(_original_path(sha)) or b"", original["content_type"]
+    path = _variant_path(sha, width, fmt)
+    data = _read(path)
+    if data is not None:
+        metrics.CACHE_LOOKUPS.inc(cache="image_variants", result="hit")
+        return data, MEDIA_TYPES[fmt]
+    metrics.CACHE_LOOKUPS.inc(cache="image_variants", result="miss")
+    source = _read(_original_path(sha)) or b""
+    try:
+        data = _render(source, width, fmt)
+    except Exception as e:
+        # Format non reconnu par Pillow (SVG...) : l'original est servi tel quel
+        logger.warning("Redimensionnement impossible: %s", e, extra={"sha256": sha})
+        return source, original["content_type"]
+    _write_atomic(path, data)
+    return data, MEDIA_TYPES[fmt]
@@ -0,0 +1,115 @@
+# Filename: backend/loadtest/openai_stub.py
+# Description: Serveur local compatible OpenAI Chat Completions pour les tests de charge (réponses factices).
+#
+# Usage (depuis backend/) :
+#   python -m loadtest.openai_stub --port 8765 --latency-ms 300
+#   OPENAI_API_URL=http://127.0.0.1:8765/v1/chat/completions uvicorn main:app
+
+import argparse
+import json
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPORT_TEXT = (
+    "ANALYSE TECHNIQUE: joueur complet, bonne lecture du jeu et qualité de passe. "
+    "ANALYSE STATISTIQUE: production régulière au regard du poste. "
+    "POTENTIEL & VALEUR MARCHANDE: marge de progression importante. "
+    "RECOMMANDATIONS STRATÉGIQUES: adapté à un club européen de premier plan. "
+    "PRÉDICTIONS: valeur marchande en hausse sur les deux prochaines saisons. "
+) * 6
+
+def _prompt(body: dict) -> str:
+    return " ".join(m.get("content", "") for m in body.get("messages", []) if isinstance(m, dict))
+
+def prompt_kind(body: dict) -> str:
+    """Type de prompt envoyé par le backend (player_name, country, enrich, nationality, report)."""
+    prompt = _prompt(body)
+    if "Nom fourni:" in prompt:
+        return "player_name"
+    if "Normalise le nom de ce pays" in prompt:
+        return "country"
+    if "format JSON strict" in prompt:
+        return "enrich"
+    if "Quelle est la nationalité" in prompt:
+        return "nationality"
+    return "report"
+
+def fake_completion(body: dict) -> str:
+    """Réponse plausible selon le type de prompt envoyé par le backend."""
+    kind, prompt = prompt_kind(body), _prompt(body)
+    if kind == "player_name":
+        m = re.search(r'Nom fourni: "([^"]*)"', prompt)
+        return m.group(1) if m else "Unknown"
+    if kind == "country":
+        m = re.search(r'pays en anglais \(format standard\): "([^"]*)"', prompt)
+        return m.group(1) if m else "Unknown"
+    if kind == "enrich":
+        return json.dumps({"goals": 0, "assists": 0, "appearances": 0, "image_url": None, "nationality": "France"})
+    if kind == "nationality":
+        return "France"
+    return REPORT_TEXT
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency_ms = 0.0
+    requests_served = 0
+    requests_by_kind: Counter = Counter()
+    _lock = threading.Lock()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            body = {}
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        content = fake_completion(body)
+        payload = json.dumps({
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": len(json.dumps(body)) // 4,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": (len(json.dumps(body)) + len(content)) // 4,
+            },
+        }).encode("utf-8")
+        with StubHandler._lock:
+            StubHandler.requests_served += 1
+            StubHandler.requests_by_kind[prompt_kind(body)] += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub(port: int = 0, latency_ms: float = 0.0) -> ThreadingHTTPServer:
+    """Démarre le stub dans un thread ; retourne le serveur (server.server_address[1] = port)."""
+    StubHandler.latency_ms = latency_ms
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="openai-stub", daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub OpenAI Chat Completions")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    args = parser.parse_args()
+    server = start_stub(args.port, args.latency_ms)
+    print(f"Stub OpenAI sur http://127.0.0.1:{server.server_address[1]}/v1/chat/completions")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
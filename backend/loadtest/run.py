@@ -0,0 +1,254 @@
+# Filename: backend/loadtest/run.py
+# Description: Test de charge de l'API FastAPI (uvicorn) avec un stub OpenAI et des fixtures de scraping rejouées.
+#
+# Usage (depuis backend/) :
+#   python -m loadtest.run --workers 1 2 4 --db-profiles small large --duration 30 --users 32
+#   python -m loadtest.run --fixtures benchmarks/fixtures --replay-latency-ms 120 --json loadtest.json
+#
+# Pour chaque combinaison (nombre de workers uvicorn, profil de base), le script :
+#   1. prépare une base SQLite dédiée (empty / small / large joueurs synthétiques),
+#   2. démarre le stub OpenAI et uvicorn (OPENAI_API_URL -> stub, SCRAPER_HTTP_MODE=replay),
+#   3. simule des utilisateurs en boucle fermée sur un mélange réaliste d'endpoints
+#      (sondage du globe /countries, navigation /players, /player-by-name) et des rafales
+#      de /scrape-player,
+#   4. affiche p50/p95/p99 et RPS par endpoint.
+#
+# Les fixtures s'enregistrent avec benchmarks.bench_pipeline --record ; sans archive,
+# les sources de scraping échouent vite (FixtureMissing) et seules la DB et l'IA sont sollicitées.
+
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import database  # noqa: E402
+from benchmarks.bench_bulk_upsert import COUNTRIES, POSITIONS, make_players  # noqa: E402
+from benchmarks.bench_pipeline import PANEL  # noqa: E402
+from loadtest.openai_stub import start_stub  # noqa: E402
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+DB_PROFILES = {"empty": 0, "small": 1_000, "large": 50_000}
+
+# Poids du mélange de requêtes (hors rafales de scraping)
+DEFAULT_MIX = {"countries": 40, "players": 35, "player_by_name": 25}
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def prepare_db(data_dir: str, players: int):
+    """Crée la base du profil avec `players` joueurs synthétiques (insertion groupée)."""
+    os.makedirs(data_dir, exist_ok=True)
+    database.DB_PATH = os.path.join(data_dir, database.DB_NAME)
+    database.init_db()
+    if players:
+        database.save_players_bulk(make_players(players))
+
+def start_server(port: int, workers: int, data_dir: str, openai_url: str, args,
+                 extra_env: dict = None) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.pop("PORT", None)
+    env.update({
+        "DATA_DIR": data_dir,
+        "OPENAI_API_URL": openai_url,
+        "OPENAI_API_KEY": env.get("OPENAI_API_KEY") or "loadtest",
+        "SCRAPER_HTTP_MODE": "replay",
+        "SCRAPER_FIXTURES": os.path.abspath(args.fixtures),
+        "SCRAPER_REPLAY_LATENCY_MS": str(args.replay_latency_ms),
+        "SCRAPER_HTTP_LIVE_HOSTS": "127.0.0.1",
+        "LOG_LEVEL": "WARNING",
+    })
+    env.update(extra_env or {})
+    cmd = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+           "--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"uvicorn s'est arrêté (code {proc.returncode})")
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return proc
+        except requests.RequestException:
+            pass
+        time.sleep(0.3)
+    proc.terminate()
+    raise RuntimeError("uvicorn n'a pas démarré en 60 s")
+
+class LoadRun:
+    """Utilisateurs virtuels en boucle fermée + rafales de scraping ; collecte des latences par endpoint."""
+
+    def __init__(self, base_url: str, seeded_players: int, args):
+        self.base_url = base_url
+        self.seeded_players = seeded_players
+        self.args = args
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.mix = list(DEFAULT_MIX.items())
+
+    def _record(self, endpoint: str, seconds: float, ok: bool):
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            if not ok:
+                self.errors[endpoint] += 1
+
+    def _call(self, session: requests.Session, endpoint: str, method: str, path: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            resp = session.request(method, self.base_url + path, timeout=self.args.timeout, **kwargs)
+            ok = resp.status_code < 500 and resp.status_code != 429
+        except requests.RequestException:
+            ok = False
+        self._record(endpoint, time.perf_counter() - start, ok)
+
+    def _random_request(self, rng: random.Random) -> tuple:
+        endpoint = rng.choices([e for e, _ in self.mix], weights=[w for _, w in self.mix])[0]
+        if endpoint == "countries":
+            return endpoint, "/countries"
+        if endpoint == "players":
+            choice = rng.random()
+            if choice < 0.4:
+                return endpoint, f"/players?country={rng.choice(COUNTRIES)}"
+            if choice < 0.7:
+                return endpoint, f"/players?position={rng.choice(POSITIONS)}&max_age={rng.randint(20, 35)}"
+            return endpoint, f"/players?min_value={rng.randint(1, 50) * 1_000_000}&sort=-market_value"
+        # /player-by-name : joueurs de la base (ou du panel scrapé lorsque la base est vide)
+        if self.seeded_players and rng.random() < 0.8:
+            name = f"Benchmark Player {rng.randrange(self.seeded_players)}"
+        else:
+            name = rng.choice(PANEL)
+        return endpoint, f"/player-by-name/{requests.utils.quote(name)}"
+
+    def _user(self, seed: int):
+        rng = random.Random(seed)
+        session = requests.Session()
+        while not self._stop.is_set():
+            endpoint, path = self._random_request(rng)
+            self._call(session, endpoint, "GET", path)
+            if self.args.think_ms:
+                time.sleep(rng.expovariate(1000 / self.args.think_ms))
+
+    def _bursts(self):
+        rng = random.Random(0)
+        while not self._stop.wait(self.args.burst_every):
+            threads = [
+                threading.Thread(target=self._call, args=(
+                    requests.Session(), "scrape_player", "POST", "/scrape-player"),
+                    kwargs={"json": {"player_name": rng.choice(PANEL)}})
+                for _ in range(self.args.burst_size)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+    def run(self) -> float:
+        threads = [threading.Thread(target=self._user, args=(i,), daemon=True) for i in range(self.args.users)]
+        if self.args.burst_size:
+            threads.append(threading.Thread(target=self._bursts, daemon=True))
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        time.sleep(self.args.duration)
+        self._stop.set()
+        for t in threads:
+            t.join(timeout=self.args.timeout + 1)
+        return time.perf_counter() - start
+
+def summarize(latencies: dict, errors: dict, elapsed: float) -> dict:
+    summary = {}
+    for endpoint, values in sorted(latencies.items()):
+        summary[endpoint] = {
+            "requests": len(values),
+            "errors": errors.get(endpoint, 0),
+            "rps": round(len(values) / elapsed, 1),
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+        }
+    return summary
+
+def print_summary(workers: int, profile: str, summary: dict):
+    print(f"\n=== workers={workers}  base={profile} ({DB_PROFILES[profile]} joueurs) ===")
+    print(f"{'endpoint':<16} | {'requêtes':>8} | {'erreurs':>7} | {'RPS':>7} | {'p50 (ms)':>9} | {'p95 (ms)':>9} | {'p99 (ms)':>9}")
+    for endpoint, s in summary.items():
+        print(f"{endpoint:<16} | {s['requests']:>8} | {s['errors']:>7} | {s['rps']:>7} | "
+              f"{s['p50_ms']:>9} | {s['p95_ms']:>9} | {s['p99_ms']:>9}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge de l'API X-scout")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Nombres de workers uvicorn")
+    parser.add_argument("--db-profiles", nargs="+", default=["small", "large"], choices=sorted(DB_PROFILES))
+    parser.add_argument("--duration", type=float, default=30.0, help="Durée de chaque mesure (s)")
+    parser.add_argument("--users", type=int, default=32, help="Utilisateurs virtuels simultanés")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Temps de réflexion moyen entre deux requêtes")
+    parser.add_argument("--burst-every", type=float, default=10.0, help="Intervalle entre rafales de /scrape-player (s)")
+    parser.add_argument("--burst-size", type=int, default=5, help="Requêtes /scrape-player par rafale (0 = aucune)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--openai-latency-ms", type=float, default=300.0, help="Latence du stub OpenAI")
+    parser.add_argument("--fixtures", default=os.path.join(BACKEND_DIR, "benchmarks", "fixtures"),
+                        help="Archive des échanges HTTP rejoués par le scraper")
+    parser.add_argument("--replay-latency-ms", type=float, default=100.0, help="Latence ajoutée aux réponses rejouées")
+    parser.add_argument("--json", help="Écrit les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    stub = start_stub(0, args.openai_latency_ms)
+    openai_url = f"http://127.0.0.1:{stub.server_address[1]}/v1/chat/completions"
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for profile in args.db_profiles:
+            # Base de référence préparée une fois, copiée pour chaque nombre de workers
+            reference_dir = os.path.join(tmp_dir, f"{profile}_reference")
+            prepare_db(reference_dir, DB_PROFILES[profile])
+            for workers in args.workers:
+                data_dir = os.path.join(tmp_dir, f"{profile}_w{workers}")
+                os.makedirs(data_dir, exist_ok=True)
+                with open(os.path.join(reference_dir, database.DB_NAME), "rb") as src, \
+                        open(os.path.join(data_dir, database.DB_NAME), "wb") as dst:
+                    dst.write(src.read())
+
+                port = free_port()
+                server = start_server(port, workers, data_dir, openai_url, args)
+                try:
+                    run = LoadRun(f"http://127.0.0.1:{port}", DB_PROFILES[profile], args)
+                    elapsed = run.run()
+                finally:
+                    server.terminate()
+                    server.wait(timeout=30)
+
+                summary = summarize(run.latencies, run.errors, elapsed)
+                print_summary(workers, profile, summary)
+                results.append({"workers": workers, "db_profile": profile, "seconds": round(elapsed, 1),
+                                "endpoints": summary})
+
+    stub.shutdown()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\nRésultats écrits dans {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -3,33 +3,159 @@
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import Match
 from pydantic import BaseModel
 import sqlite3
-import requests
 import sys
 import os
 import json
+import base64
+import hashlib
+import logging
 import re
+import threading
+import time
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import List, Optional
+from dotenv import load_dotenv
+
+# Charge les variables d'environnement depuis un fichier .env (si présent), une seule fois
+# et avant les modules du backend qui lisent leur configuration à l'import (DATA_DIR, PROFILING_*...)
+load_dotenv()
 
 # Import correct du scraper (robuste Railway)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, BASE_DIR)  # important sur Railway
 
-from scraping.scraper import scrape_and_save_player_data
+# Le scraper (BeautifulSoup, lxml) et le client HTTP (requests) ne sont importés qu'au
+# premier appel qui en a besoin : ils représentent un quart du temps d'import de l'API.
 
 # Import du module de base de données centralisé
 from database import (
     get_db_connection, 
-    init_db, 
+    ensure_db, 
     save_player_to_db, 
     update_player_field,
     get_player_by_name as db_get_player_by_name,
     get_player_by_id as db_get_player_by_id,
-    list_players as db_list_players
+    get_players_batch,
+    list_players as db_list_players,
+    get_market_value_series,
+    get_season_stats,
+    get_player_metrics,
+    get_leaderboard,
+    list_leaderboard_groups,
+    position_group,
+    LEADERBOARD_DIMENSIONS,
+    LEADERBOARD_METRICS,
+    LEADERBOARD_SIZE,
+    format_market_value,
+    coalesce_player_writes,
+    public_player
 )
+from countries import normalize_country_name_locally, normalize_country_name_with_openai, normalize_nationality_fields
+from timeseries import lttb
+import metrics
+import profiling
+import report_queue
+import response_cache
+import response_encoding
+from response_encoding import json_response
+import shared_state
+import tracing
+
+logger = logging.getLogger(__name__)
+
+# Logs structurés et exporteur de spans (LOG_LEVEL, LOG_FORMAT, TRACING_EXPORTER)
+tracing.configure()
+
+# --- Configuration IA ---
+# ⚠️ SÉCURITÉ : Ne pas commiter la clé API dans le code !
+# Configurez votre clé API OpenAI via une variable d'environnement ou un fichier .env
+# Pour obtenir une clé : https://platform.openai.com/api-keys
+# Si la variable n'existe pas, utilise une valeur par défaut vide (à configurer)
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+OPENAI_API_URL = os.getenv("OPENAI_API_URL", "https://api.openai.com/v1/chat/completions")
+
+def _http_client():
+    """Client HTTP partagé (requests), importé au premier appel sortant."""
+    from scraping import http_client
+    return http_client
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialisation exécutée une seule fois au démarrage de chaque worker (et non à l'import)."""
+    start = time.perf_counter()
+    # Schéma et migrations SQLite : les écritures suivantes n'ont plus à les rejouer.
+    # En multi-worker, un verrou partagé évite que plusieurs workers migrent en même temps.
+    def init_database():
+        with shared_state.lock("init_db", ttl=60, timeout=60):
+            ensure_db()
+    await run_in_threadpool(init_database)
+    # Index d'autocomplétion construit en arrière-plan : le démarrage n'attend pas sa construction
+    def warm_autocomplete():
+        import autocomplete
+        autocomplete.get_index()
+    threading.Thread(target=warm_autocomplete, name="autocomplete-warmup", daemon=True).start()
+    # Vérification que la clé API est configurée
+    if not OPENAI_API_KEY:
+        logger.warning("OPENAI_API_KEY n'est pas configurée (variable d'environnement ou fichier .env, voir README.md)")
+    logger.info("API prête", extra={"startup_ms": round((time.perf_counter() - start) * 1000, 1)})
+    yield
+
+app = FastAPI(title="Unified Scouting API", version="3.0", lifespan=lifespan,
+              default_response_class=response_encoding.ResponseClass)
+
+# --- Cache HTTP des lectures (ETag, 304, Cache-Control, LRU des corps) ---
+def _cached_route(scope):
+    """Route qui traitera la requête (même ordre que le routeur), si elle est mise en cache."""
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route if getattr(route, "path", None) in response_cache.CACHE_RULES else None
+    return None
+
+@app.middleware("http")
+async def cache_responses(request: Request, call_next):
+    """
+    Réponses des routes de response_cache.CACHE_RULES validées par un ETag calculé avant
+    l'endpoint (versions des tables lues) : 304 si le client a déjà la version courante,
+    corps conservé dans le LRU sinon, et Cache-Control propre à chaque route.
+    Déclaré avant CORSMiddleware, qui l'enveloppe : les 304 et les corps du LRU reçoivent
+    aussi les en-têtes CORS.
+    """
+    route = _cached_route(request.scope) if request.method == "GET" else None
+    if route is None:
+        return await call_next(request)
+    tables, cache_control = response_cache.CACHE_RULES[route.path]
+    url = f"{request.url.path}?{request.url.query}"
+    etag = response_cache.compute_etag(tables, url)
+    if etag is None:
+        return await call_next(request)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    # Réponse servie sans passer par le routeur : la route est renseignée pour les métriques
+    request.scope["route"] = route
 
-app = FastAPI(title="Unified Scouting API", version="3.0")
+    if response_cache.matches(request.headers.get("if-none-match"), etag):
+        response_cache.record("not_modified")
+        return Response(status_code=304, headers=headers)
+    cached = response_cache.bodies.get(url, etag)
+    if cached is not None:
+        response_cache.record("hit")
+        body, media_type = cached
+        return Response(content=body, media_type=media_type, headers=headers)
+
+    response_cache.record("miss")
+    response = await call_next(request)
+    if response.status_code != 200:
+        return response
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    media_type = response.headers.get("content-type", "application/json")
+    response_cache.bodies.put(url, etag, body, media_type, tables)
+    return Response(content=body, media_type=media_type, headers=headers)
 
 # --- Middleware CORS ---
 app.add_middleware(
@@ -44,26 +170,76 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# --- Configuration Base de Données & IA ---
-# ⚠️ SÉCURITÉ : Ne pas commiter la clé API dans le code !
-# Configurez votre clé API OpenAI via une variable d'environnement ou un fichier .env
-# Pour obtenir une clé : https://platform.openai.com/api-keys
-import os
-from dotenv import load_dotenv
-
-# Charge les variables d'environnement depuis un fichier .env (si présent)
-load_dotenv()
+# --- Compression des grosses réponses (gzip / brotli) ---
+@app.middleware("http")
+async def compress_responses(request: Request, call_next):
+    """
+    Compresse les corps JSON et texte d'au moins COMPRESSION_MIN_SIZE octets selon
+    Accept-Encoding. Un corps à ETag déjà compressé pour cet encodage est réutilisé.
+    """
+    response = await call_next(request)
+    content_length = int(response.headers.get("content-length") or 0)
+    if (response.status_code in (204, 304) or "content-encoding" in response.headers
+            or not response_encoding.is_compressible(response.headers.get("content-type"), content_length)):
+        return response
+    # La représentation dépend d'Accept-Encoding, y compris lorsqu'elle n'est pas compressée
+    response.headers.append("Vary", "Accept-Encoding")
+    encoding = response_encoding.negotiate(request.headers.get("accept-encoding"))
+    if encoding is None:
+        return response
 
-# Récupère la clé API depuis la variable d'environnement
-# Si la variable n'existe pas, utilise une valeur par défaut vide (à configurer)
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-OPENAI_API_URL = "https://api.openai.com/v1/chat/completions"
+    raw = b"".join([chunk async for chunk in response.body_iterator])
+    etag = response.headers.get("etag")
+    cached = response_encoding.compressed_bodies.get(f"{encoding} {etag}", etag) if etag else None
+    if cached is not None:
+        body = cached[0]
+    else:
+        body = await run_in_threadpool(response_encoding.compress, raw, encoding)
+        if etag:
+            response_encoding.compressed_bodies.put(f"{encoding} {etag}", etag, body, encoding, ())
+    # En-têtes d'origine copiés tels quels (plusieurs Set-Cookie...), seuls ceux de l'encodage changent
+    compressed = Response(content=body, status_code=response.status_code)
+    compressed.raw_headers = list(response.raw_headers)
+    headers = compressed.headers
+    headers["Content-Encoding"] = encoding
+    headers["Content-Length"] = str(len(body))
+    headers["Vary"] = ", ".join(dict.fromkeys(v.strip() for line in headers.getlist("vary") for v in line.split(",")))
+    if etag:
+        # ETag faible : la représentation compressée diffère octet par octet
+        headers["ETag"] = etag if etag.startswith("W/") else f"W/{etag}"
+    return compressed
 
-# Vérification que la clé API est configurée
-if not OPENAI_API_KEY:
-    print("⚠️  ATTENTION: OPENAI_API_KEY n'est pas configurée!")
-    print("   Configurez-la via une variable d'environnement ou un fichier .env")
-    print("   Voir README.md pour plus d'informations")
+# --- Traces, métriques et logs par requête ---
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Span racine de chaque requête HTTP, histogramme de latence par route et log d'accès structuré."""
+    start = time.perf_counter()
+    metrics.API_REQUESTS_IN_PROGRESS.inc()
+    status = 500
+    route_path = "unmatched"
+    try:
+        with tracing.span(f"HTTP {request.method}", **{
+            "http.request.method": request.method,
+            "url.path": request.url.path,
+        }) as sp:
+            response = await call_next(request)
+            status = response.status_code
+            # Gabarit de route (ex: /players/{player_id}) pour limiter la cardinalité
+            route = request.scope.get("route")
+            if route is not None:
+                route_path = route.path
+                sp.update_name(f"{request.method} {route_path}")
+            sp.set_attributes({"http.route": route_path, "http.response.status_code": status})
+            logger.info("%s %s %s", request.method, request.url.path, status, extra={
+                "route": route_path,
+                "status": status,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+            })
+        return response
+    finally:
+        metrics.API_REQUESTS_IN_PROGRESS.dec()
+        metrics.API_REQUEST_SECONDS.observe(
+            time.perf_counter() - start, method=request.method, route=route_path, status=status)
 
 # --- Route racine ---
 @app.get("/")
@@ -98,10 +274,64 @@ def health_check():
             content={"status": "unhealthy", "database": "disconnected", "error": str(e)}
         )
 
+# --- Profilage à la demande (PROFILING_ENABLED + jeton admin) ---
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    """
+    Profile la requête par échantillonnage si le jeton admin est fourni (en-tête X-Profile
+    ou ?profile=...) ou si elle est tirée au sort (PROFILING_SAMPLE_RATE). L'id du profil
+    enregistré est renvoyé dans l'en-tête X-Profile-Id.
+    """
+    if not profiling.PROFILING_ENABLED:
+        return await call_next(request)
+    requested = profiling.is_authorized(request.headers.get("X-Profile") or request.query_params.get("profile"))
+    if not requested and not profiling.should_sample(request.url.path):
+        return await call_next(request)
+
+    profiler = profiling.SamplingProfiler().start()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        profiler.stop()
+        profile_id = await run_in_threadpool(
+            profiling.store.save, profiler, request.method, request.url.path, status, requested)
+    if profile_id:
+        response.headers["X-Profile-Id"] = profile_id
+    return response
+
+def _require_profiling_token(request: Request):
+    if not profiling.is_authorized(request.headers.get("X-Profile") or request.query_params.get("profile")):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+@app.get("/admin/profiles", include_in_schema=False)
+def list_profiles(request: Request):
+    """Profils conservés (les requêtes les plus lentes en premier)."""
+    _require_profiling_token(request)
+    return {"profiles": profiling.store.list()}
+
+@app.get("/admin/profiles/{profile_id}", include_in_schema=False)
+def get_profile(profile_id: str, request: Request, format: str = "speedscope"):
+    """Profil au format speedscope (JSON) ou en piles repliées (format=collapsed) pour flamegraph."""
+    _require_profiling_token(request)
+    content = profiling.store.read(profile_id, format)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "collapsed":
+        return PlainTextResponse(content)
+    return Response(content, media_type="application/json")
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Métriques au format texte Prometheus (API, SQLite, scraping, caches, OpenAI)."""
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
 # --- Endpoints de l'IA ---
 @app.post("/ai")
 async def ai_proxy(request: Request):
     """Proxy pour les requêtes vers l'API OpenAI."""
+    import requests
     body = await request.json()
     try:
         # Adaptation du format pour OpenAI Chat Completions
@@ -127,7 +357,7 @@ async def ai_proxy(request: Request):
         else:
             openai_body = body
         
-        resp = requests.post(OPENAI_API_URL, json=openai_body, headers=headers)
+        resp = _http_client().chat_completion(OPENAI_API_URL, openai_body, "ai_proxy", headers=headers)
         resp.raise_for_status()
         return resp.json()
     except requests.exceptions.HTTPError as err:
@@ -139,118 +369,55 @@ async def ai_proxy(request: Request):
 class PlayerRequest(BaseModel):
     player_name: str
 
-def normalize_country_name_with_openai(country_name):
-    """Normalise le nom d'un pays avec OpenAI pour correspondre au mapping du globe."""
-    if not country_name:
-        return None
-    
-    # Mapping simple pour les cas courants
-    country_mapping = {
-        "Espagne": "Spain",
-        "Angleterre": "England",
-        "Allemagne": "Germany",
-        "Italie": "Italy",
-        "Brésil": "Brazil",
-        "Argentine": "Argentina",
-        "Belgique": "Belgium",
-        "Pays-Bas": "Netherlands",
-        "Croatie": "Croatia",
-        "Maroc": "Morocco",
-        "Sénégal": "Senegal",
-        "Côte d'Ivoire": "Ivory Coast",
-        "Cameroun": "Cameroon",
-        "Égypte": "Egypt",
-        "Algérie": "Algeria",
-        "Tunisie": "Tunisia",
-        "Japon": "Japan",
-        "Corée du Sud": "South Korea",
-        "Chine": "China",
-        "États-Unis": "United States",
-        "USA": "United States",
-        "Mexique": "Mexico",
-        "Colombie": "Colombia",
-        "Chili": "Chile",
-        "Pérou": "Peru",
-        "Équateur": "Ecuador",
-        "Russie": "Russia",
-        "Pologne": "Poland",
-        "Suède": "Sweden",
-        "Norvège": "Norway",
-        "Danemark": "Denmark",
-        "Suisse": "Switzerland",
-        "Autriche": "Austria",
-        "République tchèque": "Czech Republic",
-        "Grèce": "Greece",
-        "Turquie": "Turkey",
-        "Israël": "Israel",
-        "Arabie saoudite": "Saudi Arabia",
-        "Émirats arabes unis": "United Arab Emirates",
-        "Australie": "Australia",
-        "Nouvelle-Zélande": "New Zealand",
-        "Afrique du Sud": "South Africa",
-    }
-    
-    # Vérifie d'abord le mapping simple
-    if country_name in country_mapping:
-        return country_mapping[country_name]
-    
-    # Si le nom est déjà en anglais, le retourne tel quel
-    if country_name in ["Spain", "England", "Germany", "Italy", "Brazil", "Argentina", "France", 
-                        "Belgium", "Netherlands", "Croatia", "Morocco", "Senegal", "Japan", 
-                        "United States", "Mexico", "Colombia", "Chile", "Peru", "Ecuador", 
-                        "Russia", "Poland", "Sweden", "Norway", "Denmark", "Switzerland", 
-                        "Austria", "Czech Republic", "Greece", "Turkey", "Israel", "Saudi Arabia",
-                        "United Arab Emirates", "Australia", "New Zealand", "South Africa",
-                        "Cameroon", "Egypt", "Algeria", "Tunisia", "South Korea", "China",
-                        "Ivory Coast", "Nigeria", "Ghana"]:
-        return country_name
-    
-    # Utilise OpenAI pour normaliser si nécessaire
-    try:
-        headers = {
-            "Authorization": f"Bearer {OPENAI_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        
-        prompt = f"""Normalise le nom de ce pays en anglais (format standard): "{country_name}"
-Réponds UNIQUEMENT avec le nom du pays en anglais, sans explication, sans guillemets, sans ponctuation.
-Exemples: "Espagne" -> "Spain", "Angleterre" -> "England", "États-Unis" -> "United States"
-Réponds uniquement le nom normalisé:"""
-        
-        openai_body = {
-            "model": "gpt-4o-mini",
-            "messages": [
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": 0.3,
-            "max_tokens": 20
-        }
-        
-        resp = requests.post(OPENAI_API_URL, json=openai_body, headers=headers, timeout=5)
-        resp.raise_for_status()
-        response_data = resp.json()
-        normalized = response_data.get('choices', [{}])[0].get('message', {}).get('content', '').strip()
-        # Nettoie la réponse (enlève guillemets, points, etc.)
-        normalized = normalized.strip('"\'.,;!?')
-        return normalized if normalized else country_name
-    except Exception as e:
-        print(f"Erreur lors de la normalisation du pays {country_name}: {e}")
-        return country_name
+# Nombre maximal de joueurs (ids + noms) par appel de /players/batch
+PLAYER_BATCH_MAX = 100
+
+class PlayerBatchRequest(BaseModel):
+    ids: List[int] = []
+    names: List[str] = []
+    fields: Optional[List[str]] = None
+    include_metrics: bool = False
+    # Travail OpenAI, uniquement sur demande explicite
+    normalize_countries: bool = False
+    generate_reports: bool = False
+
+# Libellés des métriques dérivées dans le prompt du rapport de scouting
+_METRIC_LABELS = {
+    'goals_per90': "Buts par 90 min",
+    'assists_per90': "Passes décisives par 90 min",
+    'contributions_per90': "Buts + passes par 90 min",
+    'minutes_played': "Minutes jouées",
+    'market_value_eur': "Valeur marchande (€)",
+}
+
+def _metrics_prompt_section(player_metrics):
+    """Section du prompt avec les métriques par 90 minutes et leur rang centile au poste."""
+    if not player_metrics or 'position_group' not in player_metrics:
+        return ""
+    lines = [f"\nMÉTRIQUES COMPARÉES (rang centile parmi les joueurs du poste « {player_metrics.get('position_group') or 'inconnu'} » de la base):"]
+    for metric, label in _METRIC_LABELS.items():
+        value = player_metrics.get(metric)
+        if value is None:
+            continue
+        pct = player_metrics.get(f"{metric}_pct")
+        lines.append(f"- {label}: {value}" + (f" (centile {pct:.0f})" if pct is not None else ""))
+    return "\n".join(lines) if len(lines) > 1 else ""
 
+@tracing.traced("player.scouting_report")
 def generate_scouting_report_with_openai(player_data):
     """Génère un rapport de scouting détaillé avec OpenAI basé sur les données du joueur, incluant analyses avancées et prédictions."""
     if not player_data:
         return None
     
     try:
-        # Calcul de statistiques avancées
+        # Statistiques avancées : ratios et rangs centiles précalculés à l'écriture du joueur
         appearances = player_data.get('appearances', 0) or 0
         goals = player_data.get('goals', 0) or 0
         assists = player_data.get('assists', 0) or 0
-        
-        goals_per_match = round(goals / appearances, 2) if appearances > 0 else 0
-        assists_per_match = round(assists / appearances, 2) if appearances > 0 else 0
         goal_contribution = goals + assists
+        player_metrics = (get_player_metrics(player_data['id']) if player_data.get('id') else None) or player_data
+        goals_per_match = player_metrics.get('goals_per_match') or 0
+        assists_per_match = player_metrics.get('assists_per_match') or 0
         
         # Construction du prompt enrichi pour OpenAI
         prompt = f"""Tu es un expert en scouting footballistique et analyste de données sportives. Analyse les données suivantes d'un joueur et génère un rapport de scouting professionnel et détaillé en français avec des insights avancés.
@@ -273,6 +440,7 @@ STATISTIQUES DE PERFORMANCE:
 - Buts par match: {goals_per_match}
 - Passes décisives par match: {assists_per_match}
 - Contribution totale (buts + passes): {goal_contribution}
+{_metrics_prompt_section(player_metrics)}
 
 Génère un rapport de scouting professionnel et complet qui inclut:
 1. ANALYSE TECHNIQUE: Forces et faiblesses du joueur, style de jeu, caractéristiques techniques détaillées
@@ -298,7 +466,7 @@ Le rapport doit être en français, très professionnel, détaillé (environ 400
             "max_tokens": 1200
         }
         
-        resp = requests.post(OPENAI_API_URL, json=openai_body, headers=headers)
+        resp = _http_client().chat_completion(OPENAI_API_URL, openai_body, "scouting_report", headers=headers)
         resp.raise_for_status()
         response_data = resp.json()
         
@@ -306,9 +474,10 @@ Le rapport doit être en français, très professionnel, détaillé (environ 400
         report = response_data.get('choices', [{}])[0].get('message', {}).get('content', '')
         return report.strip()
     except Exception as e:
-        print(f"Erreur lors de la génération du rapport OpenAI: {e}")
+        logger.error("Erreur lors de la génération du rapport OpenAI: %s", e, extra={"player": player_data.get('name')})
         return None
 
+@tracing.traced("player.enrich")
 def enrich_player_data_with_openai(player_data):
     """Enrichit les données du joueur avec OpenAI si certaines informations manquent."""
     if not player_data or not player_data.get('name'):
@@ -374,7 +543,7 @@ Si tu ne connais pas une valeur, mets 0 pour les nombres, null pour l'URL, ou "U
             "max_tokens": 200
         }
         
-        resp = requests.post(OPENAI_API_URL, json=openai_body, headers=headers, timeout=10)
+        resp = _http_client().chat_completion(OPENAI_API_URL, openai_body, "enrich_player", headers=headers, timeout=10)
         resp.raise_for_status()
         response_data = resp.json()
         enriched_text = response_data.get('choices', [{}])[0].get('message', {}).get('content', '').strip()
@@ -398,29 +567,42 @@ Si tu ne connais pas une valeur, mets 0 pour les nombres, null pour l'URL, ou "U
             if 'nationality' in enriched_data and not player_data.get('nationality'):
                 nationality = enriched_data.get('nationality')
                 if nationality and nationality.lower() != 'unknown' and nationality.lower() != 'null':
-                    player_data['nationality'] = nationality
-                    print(f"-> Nationalité enrichie avec OpenAI: {nationality}")
+                    # Normalisée à l'écriture, comme dans le pipeline de scraping
+                    player_data.update(normalize_nationality_fields(nationality))
+                    logger.info("Nationalité enrichie avec OpenAI", extra={"player": player_data.get('name'), "nationality": player_data['nationality']})
                     # Sauvegarde la nationalité dans la base de données
-                    update_player_field(player_data.get('name'), 'nationality', nationality)
-            print(f"-> Données enrichies avec OpenAI pour {player_data.get('name')}")
+                    _save_nationality(player_data)
+            logger.info("Données enrichies avec OpenAI", extra={"player": player_data.get('name'), "fields": missing_fields})
         except json.JSONDecodeError as e:
-            print(f"-> Erreur parsing JSON OpenAI: {e}")
+            logger.warning("Erreur parsing JSON OpenAI: %s", e, extra={"player": player_data.get('name')})
     except Exception as e:
-        print(f"-> Erreur lors de l'enrichissement OpenAI: {e}")
+        logger.warning("Erreur lors de l'enrichissement OpenAI: %s", e, extra={"player": player_data.get('name')})
     
     return player_data
 
+def _save_nationality(player_data: dict):
+    """Enregistre la nationalité avec son drapeau de normalisation (aucune normalisation à la lecture)."""
+    update_player_field(player_data.get('name'), 'nationality', player_data['nationality'])
+    if 'nationality_normalized' in player_data:
+        update_player_field(player_data.get('name'), 'nationality_normalized', player_data['nationality_normalized'])
+
 @app.post("/scrape-player")
 def trigger_player_scraping(player_req: PlayerRequest):
     """
     Lance le scraping pour un joueur, sauvegarde les données dans la DB,
     génère un rapport de scouting avec OpenAI, normalise les données, et retourne les données complètes.
     """
+    # Joueur, alias, nationalité, rapport : une seule notification d'écriture (métriques, index, ETags)
+    with coalesce_player_writes():
+        return _scrape_player(player_req)
+
+def _scrape_player(player_req: PlayerRequest):
     if not player_req.player_name:
         raise HTTPException(status_code=400, detail="Player name is required")
     
     try:
-        # Scraping des données du joueur
+        # Scraping des données du joueur (module importé au premier scraping)
+        from scraping.scraper import scrape_and_save_player_data
         player_data = scrape_and_save_player_data(player_req.player_name)
         if not player_data:
             raise HTTPException(status_code=404, detail=f"Could not find or scrape data for player: {player_req.player_name}")
@@ -433,22 +615,22 @@ def trigger_player_scraping(player_req: PlayerRequest):
             saved_player = get_player_by_name(player_data.get('name'))
             if not saved_player:
                 # Les données ont été scrapées mais pas sauvegardées en DB
-                print(f"⚠️ ATTENTION: Données scrapées pour {player_data.get('name')} mais sauvegarde DB échouée")
                 # On continue quand même, mais on log l'erreur
+                logger.warning("Données scrapées mais sauvegarde DB échouée", extra={"player": player_data.get('name')})
         except Exception as db_check_error:
-            print(f"⚠️ Erreur lors de la vérification DB: {db_check_error}")
+            logger.warning("Erreur lors de la vérification DB: %s", db_check_error)
             # On continue quand même pour ne pas bloquer l'utilisateur
         
         # Enrichit les données manquantes avec OpenAI
         player_data = enrich_player_data_with_openai(player_data)
         
-        # Normalise le nom du pays pour le globe
+        # Normalise le nom du pays pour le globe (déjà fait par le pipeline si le drapeau est posé)
         if player_data.get('nationality') and player_data['nationality'].lower() != 'unknown':
-            normalized_nationality = normalize_country_name_with_openai(player_data['nationality'])
-            player_data['nationality'] = normalized_nationality or player_data['nationality']
+            if not player_data.get('nationality_normalized'):
+                player_data.update(normalize_nationality_fields(player_data['nationality']))
         elif not player_data.get('nationality') or player_data.get('nationality', '').lower() == 'unknown':
             # Si la nationalité est "Unknown", essaie de la trouver avec OpenAI en utilisant le nom et le club
-            print(f"-> Tentative de trouver la nationalité pour {player_data.get('name')} via OpenAI...")
+            logger.info("Recherche de la nationalité via OpenAI", extra={"player": player_data.get('name')})
             try:
                 nationality_prompt = f"""Quelle est la nationalité de {player_data.get('name', 'N/A')} qui joue pour {player_data.get('current_club', 'N/A')}? 
 Réponds UNIQUEMENT avec le nom du pays en français ou en anglais (ex: "Espagne" ou "Spain", "France", "Cameroun" ou "Cameroon").
@@ -468,7 +650,7 @@ Si tu ne connais pas, réponds "Unknown". Réponds uniquement le nom du pays, sa
                     "max_tokens": 20
                 }
                 
-                resp = requests.post(OPENAI_API_URL, json=openai_body, headers=headers, timeout=10)
+                resp = _http_client().chat_completion(OPENAI_API_URL, openai_body, "find_nationality", headers=headers, timeout=10)
                 resp.raise_for_status()
                 response_data = resp.json()
                 found_nationality = response_data.get('choices', [{}])[0].get('message', {}).get('content', '').strip()
@@ -477,20 +659,20 @@ Si tu ne connais pas, réponds "Unknown". Réponds uniquement le nom du pays, sa
                 found_nationality = re.sub(r'["\']', '', found_nationality).strip()
                 
                 if found_nationality and found_nationality.lower() != 'unknown':
-                    player_data['nationality'] = found_nationality
-                    print(f"-> Nationalité trouvée via OpenAI: {found_nationality}")
+                    logger.info("Nationalité trouvée via OpenAI", extra={"player": player_data.get('name'), "nationality": found_nationality})
                     # Normalise la nationalité trouvée
-                    normalized_nationality = normalize_country_name_with_openai(found_nationality)
-                    player_data['nationality'] = normalized_nationality or found_nationality
+                    player_data.update(normalize_nationality_fields(found_nationality))
             except Exception as e:
-                print(f"-> Erreur lors de la recherche de nationalité: {e}")
+                logger.warning("Erreur lors de la recherche de nationalité: %s", e, extra={"player": player_data.get('name')})
         
         # Génération du rapport de scouting avec OpenAI
-        scouting_report = generate_scouting_report_with_openai(player_data)
-        if scouting_report:
-            player_data['scouting_report'] = scouting_report
-            # Sauvegarde le rapport dans la base de données
-            update_player_field(player_data.get('name'), 'scouting_report', scouting_report)
+        # (l'UPSERT conserve le rapport existant : on ne le régénère que s'il manque)
+        if not player_data.get('scouting_report'):
+            scouting_report = generate_scouting_report_with_openai(player_data)
+            if scouting_report:
+                player_data['scouting_report'] = scouting_report
+                # Sauvegarde le rapport dans la base de données
+                update_player_field(player_data.get('name'), 'scouting_report', scouting_report)
         
         # S'assure que toutes les valeurs numériques sont correctes
         if 'goals' not in player_data or player_data['goals'] is None:
@@ -507,11 +689,11 @@ Si tu ne connais pas, réponds "Unknown". Réponds uniquement le nom du pays, sa
         # S'assure que la nationalité est présente (même si "Unknown")
         if 'nationality' not in player_data or not player_data['nationality']:
             player_data['nationality'] = "Unknown"
-            print(f"-> Attention: Nationalité non trouvée pour {player_data.get('name')}, mise à 'Unknown'")
+            logger.info("Nationalité non trouvée, mise à 'Unknown'", extra={"player": player_data.get('name')})
         
         # Met à jour la base de données avec toutes les données enrichies
         if player_data.get('nationality'):
-            update_player_field(player_data.get('name'), 'nationality', player_data['nationality'])
+            _save_nationality(player_data)
         
         # Normalise les noms de champs pour le frontend
         # S'assure que "club" est mappé vers "current_club" si présent
@@ -542,10 +724,7 @@ Si tu ne connais pas, réponds "Unknown". Réponds uniquement le nom du pays, sa
         raise
     except Exception as e:
         # Log l'erreur complète côté serveur pour le débogage
-        import traceback
-        error_trace = traceback.format_exc()
-        print(f"Erreur de scraping pour {player_req.player_name}: {e}")
-        print(f"Traceback complet:\n{error_trace}")
+        logger.exception("Erreur de scraping: %s", e, extra={"query": player_req.player_name})
         raise HTTPException(
             status_code=500, 
             detail=f"Erreur lors du scraping: {str(e)}. Vérifiez les logs serveur pour plus de détails."
@@ -553,9 +732,18 @@ Si tu ne connais pas, réponds "Unknown". Réponds uniquement le nom du pays, sa
 
 # --- Endpoints de Données Joueurs ---
 @app.get("/players")
-def list_players(name: str = None, country: str = None, position: str = None, max_age: int = None):
+def list_players(
+    name: str = None,
+    country: str = None,
+    position: str = None,
+    max_age: int = None,
+    min_value: int = None,
+    max_value: int = None,
+    sort: str = None
+):
     """
-    Récupère la liste des joueurs, éventuellement filtrée par nom, nationalité, poste ou âge maximum.
+    Récupère la liste des joueurs, éventuellement filtrée par nom, nationalité, poste, âge maximum
+    ou fourchette de valeur marchande (en euros). `sort` accepte "market_value" ou "-market_value".
     """
     filters = {}
     if name:
@@ -566,9 +754,72 @@ def list_players(name: str = None, country: str = None, position: str = None, ma
         filters['position'] = position
     if max_age:
         filters['max_age'] = max_age
+    if min_value is not None:
+        filters['min_value'] = min_value
+    if max_value is not None:
+        filters['max_value'] = max_value
+    if sort in ('market_value', '-market_value'):
+        filters['sort'] = sort
     
-    players = db_list_players(filters if filters else None)
-    return {"players": players}
+    players = [public_player(p) for p in db_list_players(filters if filters else None)]
+    return json_response({"players": players})
+
+@app.post("/players/batch")
+def get_players_batch_endpoint(batch: PlayerBatchRequest):
+    """
+    Plusieurs joueurs en un appel (ids et/ou noms exacts ou alias), en une requête SQL.
+    `fields` limite les colonnes renvoyées, `include_metrics` ajoute les métriques dérivées.
+    Les entrées introuvables sont listées dans `missing`. Aucun appel OpenAI sauf demande
+    explicite : `normalize_countries` (nationalités pour le globe) et `generate_reports`
+    (rapports de scouting manquants, générés puis enregistrés).
+    """
+    if len(batch.ids) + len(batch.names) > PLAYER_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {PLAYER_BATCH_MAX} ids and names per request")
+    try:
+        by_id, by_name = get_players_batch(batch.ids, batch.names, batch.fields, batch.include_metrics)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    results = [{"id": player_id, "found": player_id in by_id, "player": by_id.get(player_id)}
+               for player_id in dict.fromkeys(batch.ids)]
+    results += [{"name": name, "found": name in by_name, "player": by_name.get(name)}
+                for name in dict.fromkeys(batch.names)]
+    # Un même joueur peut être demandé par ID et par nom : traité une seule fois
+    players = list({r["player"]["id"]: r["player"] for r in results if r["player"]}.values())
+
+    if batch.normalize_countries:
+        normalized = {}
+        for player in players:
+            country = player.get('nationality')
+            if country:
+                if country not in normalized:
+                    normalized[country] = normalize_country_name_with_openai(country) or country
+                player['nationality'] = normalized[country]
+    if batch.generate_reports:
+        # Un seul rafraîchissement des index et caches pour tous les rapports enregistrés
+        with coalesce_player_writes():
+            for player in players:
+                if player.get('scouting_report'):
+                    continue
+                # Le rapport est généré à partir de la fiche complète, quelle que soit la projection
+                full = db_get_player_by_id(player['id'])
+                if not full:
+                    continue
+                report = full.get('scouting_report')
+                if not report:
+                    report = generate_scouting_report_with_openai(full)
+                    if report:
+                        update_player_field(full['name'], 'scouting_report', report)
+                if report and (batch.fields is None or 'scouting_report' in batch.fields):
+                    player['scouting_report'] = report
+
+    return json_response({
+        "results": results,
+        "missing": {
+            "ids": [r["id"] for r in results if "id" in r and not r["found"]],
+            "names": [r["name"] for r in results if "name" in r and not r["found"]],
+        },
+    })
 
 @app.get("/players/{player_id}")
 def get_player(player_id: int):
@@ -577,10 +828,47 @@ def get_player(player_id: int):
     """
     player = db_get_player_by_id(player_id)
     if player:
-        return {"player": player}
+        return {"player": public_player(player), "metrics": get_player_metrics(player_id)}
     else:
         raise HTTPException(status_code=404, detail="Player not found")
 
+@app.get("/players/{player_id}/similar")
+def get_similar_players(
+    player_id: int,
+    k: int = 10,
+    metric: str = "cosine",
+    min_age: int = None,
+    max_age: int = None,
+    max_value: int = None,
+    nationality: str = None,
+    position: str = None
+):
+    """
+    Joueurs les plus proches de `player_id` (buts/passes par 90 min, minutes, âge, taille,
+    valeur marchande, poste), filtrables par âge, valeur maximale (€), nationalité et poste.
+    `metric` : "cosine" (score = similarité) ou "euclidean" (score = distance).
+    """
+    if metric not in ("cosine", "euclidean"):
+        raise HTTPException(status_code=400, detail="metric must be 'cosine' or 'euclidean'")
+    # NumPy et l'index ne sont chargés qu'à la première recherche
+    from similarity import similar_players
+    players = similar_players(
+        player_id, max(1, min(k, 100)), metric,
+        min_age=min_age, max_age=max_age, max_value=max_value, nationality=nationality, position=position,
+    )
+    if players is None:
+        raise HTTPException(status_code=404, detail="Player not found")
+    return {"player_id": player_id, "metric": metric, "players": players}
+
+@app.get("/autocomplete")
+def autocomplete_players(q: str = "", limit: int = 8):
+    """
+    Suggestions de joueurs pour une saisie partielle : début de nom ou d'alias, fautes de frappe
+    et accents tolérés ("mbape" -> "Kylian Mbappé"). `matched_alias` indique l'alias reconnu.
+    """
+    from autocomplete import suggest
+    return {"query": q, "results": suggest(q, max(1, min(limit, 20)))}
+
 @app.get("/countries")
 def list_countries():
     """
@@ -616,31 +904,71 @@ def get_player_transfers(player_id: int):
     return {"transfers": transfers}
 
 @app.get("/player/{player_id}/market-value-history")
-def get_market_value_history(player_id: int):
+def get_market_value_history(player_id: int, start: date = None, end: date = None, resolution: int = None):
     """
-    Récupère l'historique des valeurs de marché d'un joueur.
+    Récupère l'historique des valeurs de marché d'un joueur (ordre chronologique).
+    `start`/`end` (AAAA-MM-JJ) limitent la période ; `resolution` réduit la série
+    à ce nombre maximal de points (LTTB) pour les graphiques.
     """
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT * FROM market_value_history 
-        WHERE player_id = ? 
-        ORDER BY date_recorded DESC, created_at DESC
-    """, (player_id,))
-    rows = cur.fetchall()
-    conn.close()
-    history = [dict(row) for row in rows]
+    series = get_market_value_series(player_id, start=start, end=end)
+    if resolution and resolution > 0 and len(series) > resolution:
+        points = lttb([(d.toordinal(), value_eur) for d, value_eur in series], resolution)
+        series = [(date.fromordinal(day), value_eur) for day, value_eur in points]
+
+    history = [
+        {
+            "date_recorded": d.isoformat(),
+            "market_value_eur": value_eur,
+            "market_value": format_market_value(value_eur),
+        }
+        for d, value_eur in series
+    ]
     return {"history": history}
 
+@app.get("/player/{player_id}/season-stats")
+def get_player_season_stats(player_id: int):
+    """
+    Récupère les statistiques FBref d'un joueur saison par saison et par compétition
+    (avec buts et passes décisives par 90 minutes), sans nouveau scraping.
+    """
+    return {"seasons": get_season_stats(player_id)}
+
+@app.get("/player/{player_id}/photo")
+def get_player_photo(player_id: int, request: Request, w: int = 400, format: str = None):
+    """
+    Photo du joueur servie depuis le cache disque (téléchargée une seule fois), redimensionnée
+    à la largeur `w` (arrondie à IMAGE_WIDTHS) en WebP ou JPEG (`format`, sinon selon Accept).
+    Un joueur sans photo, ou dont la photo est introuvable, reçoit un 404 lui aussi mis en cache.
+    """
+    import image_cache
+    player = db_get_player_by_id(player_id)
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+    original = image_cache.get_original(player["image_url"]) if player.get("image_url") else None
+    if original is None:
+        raise HTTPException(status_code=404, detail="Photo not found",
+                            headers={"Cache-Control": f"public, max-age={image_cache.IMAGE_MISSING_MAX_AGE}"})
+    width = image_cache.choose_width(w)
+    fmt = image_cache.choose_format(format, request.headers.get("accept"))
+    etag = image_cache.variant_etag(original, width, fmt)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={image_cache.IMAGE_MAX_AGE}", "Vary": "Accept"}
+    if response_cache.matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    body, media_type = image_cache.get_variant(original, width, fmt)
+    return Response(content=body, media_type=media_type, headers=headers)
+
 @app.get("/analytics/player-stats")
 def get_player_analytics(
     min_goals: int = None,
     min_assists: int = None,
     position: str = None,
-    country: str = None
+    country: str = None,
+    min_value: int = None,
+    max_value: int = None
 ):
     """
-    Endpoint d'analyse pour filtrer et analyser les joueurs selon différents critères.
+    Endpoint d'analyse pour filtrer et analyser les joueurs selon différents critères
+    (dont une fourchette de valeur marchande en euros).
     """
     conn = get_db_connection()
     cur = conn.cursor()
@@ -660,58 +988,166 @@ def get_player_analytics(
     if country:
         query += " AND nationality = ?"
         params.append(country)
+    if min_value is not None:
+        query += " AND market_value_eur >= ?"
+        params.append(min_value)
+    if max_value is not None:
+        query += " AND market_value_eur <= ?"
+        params.append(max_value)
     
     cur.execute(query, tuple(params))
     rows = cur.fetchall()
     conn.close()
     
-    players = [dict(row) for row in rows]
+    players = [public_player(dict(row)) for row in rows]
     
     # Calculs d'analytics
     total_players = len(players)
     avg_goals = sum(p.get('goals', 0) or 0 for p in players) / total_players if total_players > 0 else 0
     avg_assists = sum(p.get('assists', 0) or 0 for p in players) / total_players if total_players > 0 else 0
     
-    return {
+    return json_response({
         "total_players": total_players,
         "average_goals": round(avg_goals, 2),
         "average_assists": round(avg_assists, 2),
         "players": players
+    })
+
+def _encode_cursor(position: dict) -> str:
+    """Curseur de pagination opaque (JSON encodé en base64 URL)."""
+    return base64.urlsafe_b64encode(json.dumps(position, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> dict:
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@app.get("/leaderboards")
+def list_leaderboards():
+    """
+    Métriques et regroupements disponibles pour /leaderboards/{metric}, avec les groupes
+    présents en base (postes, nationalités, tranches d'âge).
+    """
+    return {
+        "metrics": list(LEADERBOARD_METRICS),
+        "dimensions": list(LEADERBOARD_DIMENSIONS),
+        "groups": list_leaderboard_groups(),
+        "size": LEADERBOARD_SIZE,
     }
 
+@app.get("/leaderboards/{metric}")
+def get_leaderboard_page(metric: str, dimension: str = "all", group: str = None, limit: int = 20, cursor: str = None):
+    """
+    Classement des meilleurs joueurs pour une métrique (buts, passes, minutes, valeur
+    marchande, ratios par 90 minutes), général ou par poste / nationalité / tranche d'âge.
+    Les classements sont précalculés (LEADERBOARD_SIZE joueurs par groupe) et tenus à jour à
+    chaque sauvegarde ; `next_cursor` donne la page suivante.
+    """
+    if metric not in LEADERBOARD_METRICS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of: {', '.join(LEADERBOARD_METRICS)}")
+    if dimension not in LEADERBOARD_DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"dimension must be one of: {', '.join(LEADERBOARD_DIMENSIONS)}")
+    if dimension == "all":
+        group = ""
+    elif not group:
+        raise HTTPException(status_code=400, detail="group is required for this dimension")
+    elif dimension == "position":
+        # Accepte aussi un libellé de poste libre ("Centre-Forward" -> forward)
+        group = position_group(group) or group
+    limit = max(1, min(limit, 100))
+
+    after, rank = None, 0
+    if cursor:
+        position = _decode_cursor(cursor)
+        try:
+            after, rank = (position["value"], int(position["player_id"])), int(position["rank"])
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    rows = get_leaderboard(metric, dimension, group, limit + 1, after)
+    players = []
+    for row in rows[:limit]:
+        rank += 1
+        players.append({"rank": rank, **row})
+    next_cursor = None
+    if len(rows) > limit:
+        last = players[-1]
+        next_cursor = _encode_cursor({"value": last["value"], "player_id": last["player_id"], "rank": rank})
+    return {"metric": metric, "dimension": dimension, "group": group or None, "players": players, "next_cursor": next_cursor}
+
+def _etag_response(request: Request, content: dict, cache_control: str = "no-cache") -> Response:
+    """Réponse JSON avec ETag (empreinte du corps) ; 304 sans corps si le client a déjà cette version."""
+    response = json_response(content)
+    etag = '"' + hashlib.sha1(response.body).hexdigest()[:20] + '"'
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if response_cache.matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return response
+
+def _complete_player_record(player_id: int):
+    """Tâche de fond (report_queue) : nationalité non normalisée et rapport de scouting manquant."""
+    player = db_get_player_by_id(player_id)
+    if not player:
+        return
+    with coalesce_player_writes():
+        _complete_player_fields(player)
+
+def _complete_player_fields(player: dict):
+    """Écritures de _complete_player_record, regroupées en une notification."""
+    nationality = player.get('nationality')
+    if (nationality and nationality.lower() != 'unknown' and not player.get('nationality_normalized')
+            and not normalize_country_name_locally(nationality)):
+        normalized = normalize_country_name_with_openai(nationality)
+        if normalized:
+            # Enregistrée même inchangée : les lectures suivantes ne redemandent plus OpenAI
+            if normalized != nationality:
+                update_player_field(player['name'], 'nationality', normalized)
+                player['nationality'] = normalized
+            update_player_field(player['name'], 'nationality_normalized', 1)
+    if not player.get('scouting_report'):
+        scouting_report = generate_scouting_report_with_openai(player)
+        if scouting_report:
+            update_player_field(player['name'], 'scouting_report', scouting_report)
+
 @app.get("/player-by-name/{player_name}")
-def get_player_by_name(player_name: str):
+def get_player_by_name(player_name: str, request: Request):
     """
-    Récupère un joueur par son nom (recherche exacte ou partielle).
-    Normalise les données et génère un rapport si nécessaire.
+    Récupère un joueur par son nom (recherche exacte ou partielle), à partir des seules données
+    enregistrées : ni appel OpenAI ni écriture. `report_status` vaut "ready", "pending" (rapport
+    en cours de génération en arrière-plan) ou "unavailable" (OPENAI_API_KEY non configurée).
+    Les réponses portent un ETag (If-None-Match -> 304).
     """
     player = db_get_player_by_name(player_name)
-    if player:
-        # Normalise le nom du pays pour le globe
-        if player.get('nationality'):
-            normalized_nationality = normalize_country_name_with_openai(player['nationality'])
-            player['nationality'] = normalized_nationality or player['nationality']
-        
-        # Génère un rapport de scouting si pas déjà présent
-        if 'scouting_report' not in player or not player.get('scouting_report'):
-            scouting_report = generate_scouting_report_with_openai(player)
-            if scouting_report:
-                player['scouting_report'] = scouting_report
-                # Sauvegarde le rapport dans la base de données
-                update_player_field(player.get('name'), 'scouting_report', scouting_report)
-        
-        # S'assure que toutes les valeurs numériques sont correctes
-        if 'goals' not in player or player['goals'] is None:
-            player['goals'] = 0
-        if 'assists' not in player or player['assists'] is None:
-            player['assists'] = 0
-        if 'appearances' not in player or player['appearances'] is None:
-            player['appearances'] = 0
-        
-        # S'assure que l'image_url est présent (même si vide)
-        if 'image_url' not in player:
-            player['image_url'] = None
-        
-        return {"player": player}
-    else:
+    if not player:
         raise HTTPException(status_code=404, detail=f"Player '{player_name}' not found")
+
+    # Nationalité pour le globe : table de correspondance seulement, OpenAI en arrière-plan
+    nationality = player.get('nationality')
+    local_nationality = normalize_country_name_locally(nationality)
+    if local_nationality:
+        player['nationality'] = local_nationality
+    needs_openai = not player.get('scouting_report') or bool(
+        nationality and nationality.lower() != 'unknown' and not local_nationality
+        and not player.get('nationality_normalized'))
+
+    if player.get('scouting_report'):
+        report_status = "ready"
+    elif not OPENAI_API_KEY:
+        report_status = "unavailable"
+    else:
+        report_status = "pending"
+    if needs_openai and OPENAI_API_KEY:
+        report_queue.enqueue(player['id'], _complete_player_record)
+
+    # S'assure que toutes les valeurs numériques sont correctes
+    for field in ('goals', 'assists', 'appearances'):
+        if player.get(field) is None:
+            player[field] = 0
+    # S'assure que l'image_url est présent (même si vide)
+    player.setdefault('image_url', None)
+
+    return _etag_response(request, {
+        "player": public_player(player), "metrics": get_player_metrics(player['id']), "report_status": report_status,
+    })
@@ -0,0 +1,231 @@
+# Filename: backend/metrics.py
+# Description: Métriques au format texte Prometheus (compteurs, jauges, histogrammes) pour l'endpoint /metrics.
+#
+# Les compteurs et histogrammes sont répartis par thread : chaque thread incrémente sa propre
+# copie sans verrou, et les copies ne sont additionnées qu'au moment de l'export. Le seul
+# verrou est pris à la première écriture d'un thread (enregistrement de sa copie).
+
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Bornes (secondes) adaptées aux requêtes API, SQLite et HTTP externes
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class _ThreadShards:
+    """Une copie des valeurs par thread ; lecture = agrégation de toutes les copies."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._lock = threading.Lock()
+
+    def mine(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            self._local.shard = shard
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def all(self) -> List[dict]:
+        with self._lock:
+            return list(self._shards)
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, object]) -> Tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._shards = _ThreadShards()
+
+    def inc(self, amount: float = 1, **labels):
+        shard = self._shards.mine()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def values(self) -> Dict[Tuple, float]:
+        totals: Dict[Tuple, float] = {}
+        for shard in self._shards.all():
+            for key, value in list(shard.items()):
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def collect(self) -> List[str]:
+        lines = self.header()
+        for key, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+class Gauge(_Metric):
+    """Jauge : valeur courante (inc/dec/set) ou calculée à l'export par une fonction."""
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 callback: Optional[Callable[[], Dict[Tuple, float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._callback = callback
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def collect(self) -> List[str]:
+        lines = self.header()
+        values = dict(self._values)
+        if self._callback is not None:
+            try:
+                values.update(self._callback())
+            except Exception:
+                pass
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._shards = _ThreadShards()
+
+    def observe(self, value: float, **labels):
+        shard = self._shards.mine()
+        key = self._key(labels)
+        state = shard.get(key)
+        if state is None:
+            # [compte par intervalle..., compte +Inf, somme]
+            state = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[i] += 1
+                break
+        else:
+            state[len(self.buckets)] += 1
+        state[-1] += value
+
+    def snapshot(self) -> Dict[Tuple, list]:
+        merged: Dict[Tuple, list] = {}
+        for shard in self._shards.all():
+            for key, state in list(shard.items()):
+                total = merged.setdefault(key, [0] * len(state))
+                for i, v in enumerate(list(state)):
+                    total[i] += v
+        return merged
+
+    def collect(self) -> List[str]:
+        lines = self.header()
+        for key, state in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def counter(name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+def gauge(name: str, documentation: str, labelnames: Iterable[str] = (), callback=None) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames, callback))
+
+def histogram(name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+# ========== MÉTRIQUES DU SERVICE ==========
+
+API_REQUEST_SECONDS = histogram(
+    "xscout_api_request_duration_seconds", "Durée des requêtes API par route", ("method", "route", "status"))
+API_REQUESTS_IN_PROGRESS = gauge(
+    "xscout_api_requests_in_progress", "Requêtes API en cours de traitement")
+
+DB_QUERY_SECONDS = histogram(
+    "xscout_sqlite_query_duration_seconds", "Durée des requêtes SQLite par opération", ("operation",))
+DB_QUERY_ERRORS = counter(
+    "xscout_sqlite_query_errors_total", "Requêtes SQLite en erreur par opération", ("operation",))
+DB_CONNECTIONS_OPENED = counter(
+    "xscout_sqlite_connections_opened_total", "Connexions SQLite ouvertes")
+DB_CONNECTIONS_OPEN = gauge(
+    "xscout_sqlite_connections_open", "Connexions SQLite actuellement ouvertes")
+
+SCRAPER_REQUEST_SECONDS = histogram(
+    "xscout_scraper_request_duration_seconds", "Durée des requêtes HTTP sortantes par source et hôte",
+    ("source", "host"))
+SCRAPER_REQUESTS = counter(
+    "xscout_scraper_requests_total", "Requêtes HTTP sortantes par source, hôte et résultat",
+    ("source", "host", "outcome"))
+SCRAPER_RESPONSE_BYTES = counter(
+    "xscout_scraper_response_bytes_total", "Octets reçus par source", ("source",))
+CIRCUIT_OPENS = counter(
+    "xscout_http_circuit_opens_total", "Ouvertures du disjoncteur par hôte (échecs consécutifs ou 429)", ("host",))
+RATE_LIMIT_WAIT_SECONDS = counter(
+    "xscout_rate_limit_wait_seconds_total", "Temps passé à attendre la limite de débit par hôte", ("host",))
+SCRAPE_STAGE_SECONDS = histogram(
+    "xscout_scrape_stage_duration_seconds", "Durée des étapes du pipeline de scraping", ("stage", "status"))
+
+CACHE_LOOKUPS = counter(
+    "xscout_cache_lookups_total", "Consultations des caches mémoire par résultat (hit/miss)", ("cache", "result"))
+
+LLM_REQUEST_SECONDS = histogram(
+    "xscout_llm_request_duration_seconds", "Durée des appels OpenAI par opération", ("operation", "model"))
+LLM_TOKENS = counter(
+    "xscout_llm_tokens_total", "Jetons OpenAI consommés par opération et type", ("operation", "model", "type"))
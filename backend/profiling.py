@@ -0,0 +1,224 @@
+# Filename: backend/profiling.py
+# Description: Profileur par échantillonnage (pile de tous les threads à intervalle fixe) activable par requête.
+#
+# Activation (désactivé par défaut) :
+#   PROFILING_ENABLED=1                 autorise le profilage
+#   PROFILING_TOKEN=...                 jeton admin à fournir via l'en-tête "X-Profile" ou "?profile=..."
+#   PROFILING_INTERVAL_MS=5             intervalle d'échantillonnage
+#   PROFILING_SAMPLE_RATE=0.0           fraction des requêtes de PROFILING_ROUTES profilées automatiquement
+#   PROFILING_ROUTES=/scrape-player,/analytics/player-stats
+#   PROFILING_KEEP=20                   nombre de profils conservés (les plus lents)
+#
+# Les profils sont enregistrés sous <data>/profiles au format speedscope (https://www.speedscope.app)
+# et exportables en piles repliées ("collapsed stacks", format flamegraph.pl / inferno).
+
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import shared_state
+from database import BASE_DIR
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0").lower() in ("1", "true", "yes")
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_ROUTES = tuple(r for r in os.getenv("PROFILING_ROUTES", "/scrape-player,/analytics/player-stats").split(",") if r)
+PROFILING_KEEP = int(os.getenv("PROFILING_KEEP", "20"))
+PROFILES_DIR = os.getenv("PROFILING_DIR", os.path.join(BASE_DIR, "profiles"))
+
+# Feuilles de pile correspondant à un thread inactif (attente d'une tâche ou d'un événement)
+_IDLE_LEAVES = {
+    ("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"), ("selectors.py", "select"), ("thread.py", "_worker"),
+}
+
+Frame = Tuple[str, str, int]  # (fonction, fichier, première ligne)
+
+def is_authorized(token: Optional[str]) -> bool:
+    """Le profilage doit être activé par la configuration ET le jeton admin fourni."""
+    return bool(PROFILING_ENABLED and PROFILING_TOKEN and token
+                and hmac.compare_digest(token.encode(), PROFILING_TOKEN.encode()))
+
+def should_sample(path: str) -> bool:
+    return bool(PROFILING_ENABLED and PROFILING_SAMPLE_RATE > 0
+                and path in PROFILING_ROUTES and random.random() < PROFILING_SAMPLE_RATE)
+
+class SamplingProfiler:
+    """
+    Relève toutes les PROFILING_INTERVAL_MS la pile de chaque thread (sys._current_frames)
+    depuis un thread dédié. Les threads inactifs sont ignorés ; chaque pile est préfixée
+    par le nom du thread (boucle asyncio, pool FastAPI, workers du moteur de scraping).
+    """
+
+    def __init__(self, interval_ms: float = PROFILING_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self.counts: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self.started_at = 0.0
+        self.duration = 0.0
+
+    def start(self) -> "SamplingProfiler":
+        self.started_at = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+        return self
+
+    def _run(self):
+        own = threading.get_ident()
+        code_cache: Dict[object, Frame] = {}
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    entry = code_cache.get(code)
+                    if entry is None:
+                        entry = code_cache[code] = (code.co_name, code.co_filename, code.co_firstlineno)
+                    stack.append(entry)
+                    frame = frame.f_back
+                if not stack or (os.path.basename(stack[0][1]), stack[0][0]) in _IDLE_LEAVES:
+                    continue
+                stack.reverse()
+                self.counts[(names.get(thread_id, str(thread_id)), tuple(stack))] += 1
+
+    @property
+    def samples(self) -> int:
+        return sum(self.counts.values())
+
+    def collapsed(self) -> str:
+        """Piles repliées : "thread;f1;f2;... nombre" (une ligne par pile distincte)."""
+        lines = []
+        for (thread_name, stack), count in self.counts.most_common():
+            frames = ";".join(f"{name} ({os.path.basename(path)}:{line})" for name, path, line in stack)
+            lines.append(f"{thread_name};{frames} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str) -> dict:
+        """Profil au format speedscope (un profil "sampled" par thread, poids en millisecondes)."""
+        frame_index: Dict[Frame, int] = {}
+        frames: List[dict] = []
+        by_thread: Dict[str, Tuple[list, list]] = {}
+        weight = self.interval * 1000
+        for (thread_name, stack), count in self.counts.items():
+            indexes = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                indexes.append(frame_index[frame])
+            samples, weights = by_thread.setdefault(thread_name, ([], []))
+            samples.append(indexes)
+            weights.append(count * weight)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "x-scout-profiler",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": thread_name,
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+                for thread_name, (samples, weights) in sorted(by_thread.items())
+            ],
+        }
+
+class ProfileStore:
+    """
+    Profils conservés sur disque (speedscope JSON + index). Lorsque la capacité est atteinte,
+    le profil le plus rapide est supprimé : on garde un échantillon glissant des requêtes les plus lentes.
+    """
+
+    def __init__(self, directory: str = PROFILES_DIR, keep: int = PROFILING_KEEP):
+        self.directory = directory
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def _index_path(self) -> str:
+        return os.path.join(self.directory, "index.json")
+
+    def list(self) -> List[dict]:
+        try:
+            with open(self._index_path(), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+
+    def _write_index(self, entries: List[dict]):
+        tmp_path = self._index_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self._index_path())
+
+    def save(self, profiler: SamplingProfiler, method: str, path: str, status: int, requested: bool) -> Optional[str]:
+        """Enregistre le profil s'il fait partie des plus lents ; retourne son id (ou None)."""
+        duration_ms = round(profiler.duration * 1000, 1)
+        # L'index est commun à tous les workers : verrou partagé en plus du verrou local
+        with self._lock, shared_state.lock("profiles_index", ttl=30, timeout=10):
+            entries = self.list()
+            if not requested and len(entries) >= self.keep and all(e["duration_ms"] >= duration_ms for e in entries):
+                return None
+
+            os.makedirs(self.directory, exist_ok=True)
+            profile_id = uuid.uuid4().hex[:12]
+            with open(os.path.join(self.directory, f"{profile_id}.speedscope.json"), "w", encoding="utf-8") as f:
+                json.dump(profiler.speedscope(f"{method} {path}"), f)
+            with open(os.path.join(self.directory, f"{profile_id}.folded"), "w", encoding="utf-8") as f:
+                f.write(profiler.collapsed())
+
+            entries.append({
+                "id": profile_id,
+                "method": method,
+                "path": path,
+                "status": status,
+                "duration_ms": duration_ms,
+                "samples": profiler.samples,
+                "requested": requested,
+                "recorded_at": datetime.now(timezone.utc).isoformat(),
+            })
+            entries.sort(key=lambda e: e["duration_ms"], reverse=True)
+            for evicted in entries[self.keep:]:
+                for suffix in (".speedscope.json", ".folded"):
+                    try:
+                        os.remove(os.path.join(self.directory, evicted["id"] + suffix))
+                    except FileNotFoundError:
+                        pass
+            entries = entries[:self.keep]
+            self._write_index(entries)
+            return profile_id if any(e["id"] == profile_id for e in entries) else None
+
+    def read(self, profile_id: str, fmt: str = "speedscope") -> Optional[str]:
+        if not profile_id.isalnum():
+            return None
+        suffix = ".folded" if fmt == "collapsed" else ".speedscope.json"
+        try:
+            with open(os.path.join(self.directory, profile_id + suffix), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+store = ProfileStore()
@@ -0,0 +1,57 @@
+# Filename: backend/report_queue.py
+# Description: File d'attente des compléments OpenAI (rapport de scouting, nationalité) exécutés en arrière-plan.
+#
+# Les lectures (GET /player-by-name) ne font ni appel OpenAI ni écriture : un joueur sans
+# rapport est signalé (report_status "pending") et placé dans cette file. Un thread unique la
+# traite dans l'ordre d'arrivée ; un joueur déjà en file n'y est pas ajouté deux fois et, en
+# multi-worker, un verrou partagé (shared_state) évite que deux workers le traitent ensemble.
+
+import logging
+import os
+import queue
+import threading
+from typing import Callable, Optional, Tuple
+
+import shared_state
+
+logger = logging.getLogger(__name__)
+
+# Nombre maximal de joueurs en attente (au-delà, les demandes sont ignorées jusqu'à la lecture suivante)
+REPORT_QUEUE_MAX = int(os.getenv("REPORT_QUEUE_MAX", "1000"))
+
+_queue: "queue.Queue[Tuple[int, Callable[[int], None]]]" = queue.Queue(maxsize=REPORT_QUEUE_MAX)
+_pending: set = set()
+_pending_lock = threading.Lock()
+_worker: Optional[threading.Thread] = None
+
+def enqueue(player_id: int, job: Callable[[int], None]) -> bool:
+    """Planifie `job(player_id)` en arrière-plan ; False si la file est pleine."""
+    global _worker
+    with _pending_lock:
+        if player_id in _pending:
+            return True
+        try:
+            _queue.put_nowait((player_id, job))
+        except queue.Full:
+            logger.warning("File des rapports pleine, joueur ignoré", extra={"player_id": player_id})
+            return False
+        _pending.add(player_id)
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run, name="report-queue", daemon=True)
+            _worker.start()
+    return True
+
+def _run():
+    while True:
+        player_id, job = _queue.get()
+        try:
+            # Verrou non bloquant : si un autre worker traite déjà ce joueur, il n'y a rien à faire
+            with shared_state.lock(f"report:{player_id}", ttl=120, timeout=0) as acquired:
+                if acquired:
+                    job(player_id)
+        except Exception as e:
+            logger.exception("Erreur lors du traitement en arrière-plan: %s", e, extra={"player_id": player_id})
+        finally:
+            with _pending_lock:
+                _pending.discard(player_id)
+            _queue.task_done()
@@ -0,0 +1,105 @@
+# Filename: backend/response_cache.py
+# Description: Cache HTTP des endpoints de lecture (ETag par version de table, 304, Cache-Control, LRU des corps).
+#
+# Chaque route mise en cache déclare les tables dont dépend sa réponse. L'ETag d'une réponse
+# est formé des versions courantes de ces tables (database.get_table_versions, incrémentées à
+# chaque écriture) et d'une empreinte de l'URL : il est connu avant d'exécuter l'endpoint.
+#   - If-None-Match égal à l'ETag courant -> 304 sans lire la base,
+#   - corps déjà sérialisé pour cet ETag dans le LRU du processus -> renvoyé tel quel,
+#   - sinon l'endpoint s'exécute et son corps est conservé (RESPONSE_CACHE_SIZE entrées,
+#     RESPONSE_CACHE_MAX_BYTES octets au plus ; RESPONSE_CACHE_SIZE=0 désactive le LRU).
+# Une écriture change la version des tables touchées : les ETag et les corps conservés qui en
+# dépendent ne correspondent plus, et les écritures sur players vident aussitôt leurs entrées.
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import database
+import metrics
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Gabarit de route -> (tables lues, Cache-Control). Le navigateur réutilise la réponse pendant
+# max-age puis la revalide (If-None-Match) ; les listes de joueurs changent à chaque scraping.
+CACHE_RULES: Dict[str, Tuple[Tuple[str, ...], str]] = {
+    "/players": (("players",), "public, max-age=10"),
+    "/players/{player_id}": (("players",), "public, max-age=10"),
+    "/countries": (("players",), "public, max-age=60"),
+    "/analytics/player-stats": (("players",), "public, max-age=10"),
+    "/leaderboards": (("players",), "public, max-age=60"),
+    "/leaderboards/{metric}": (("players",), "public, max-age=60"),
+    "/player/{player_id}/transfers": (("transfers",), "public, max-age=300"),
+    "/player/{player_id}/market-value-history": (("market_value_points",), "public, max-age=300"),
+    "/player/{player_id}/season-stats": (("player_season_stats",), "public, max-age=300"),
+}
+
+def compute_etag(tables: Tuple[str, ...], url: str) -> Optional[str]:
+    """ETag faible (le corps peut être compressé différemment) ; None si les versions sont illisibles."""
+    versions = database.get_table_versions()
+    if not versions:
+        return None
+    url_hash = hashlib.blake2b(url.encode(), digest_size=6).hexdigest()
+    return 'W/"' + "-".join(str(versions.get(table, 0)) for table in tables) + f"-{url_hash}" + '"'
+
+def matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparaison faible de If-None-Match (liste d'ETag ou "*")."""
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+class ResponseLRU:
+    """Corps sérialisés par URL, valides pour un seul ETag, évincés du moins récemment utilisé."""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_SIZE, max_bytes: int = RESPONSE_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[str, bytes, str, Tuple[str, ...]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, url: str, etag: str) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or entry[0] != etag:
+                return None
+            self._entries.move_to_end(url)
+            return entry[1], entry[2]
+
+    def put(self, url: str, etag: str, body: bytes, media_type: str, tables: Tuple[str, ...]):
+        if self.max_entries <= 0 or len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(url)
+            self._entries[url] = (etag, body, media_type, tables)
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, table: str):
+        with self._lock:
+            for url in [url for url, entry in self._entries.items() if table in entry[3]]:
+                self._remove(url)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, url: str):
+        entry = self._entries.pop(url, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+bodies = ResponseLRU()
+database.add_player_write_listener(lambda names: bodies.invalidate("players"))
+
+def record(result: str):
+    metrics.CACHE_LOOKUPS.inc(cache="http_response", result=result)
@@ -0,0 +1,87 @@
+# Filename: backend/response_encoding.py
+# Description: Sérialisation JSON rapide (orjson, sur option) et compression gzip/brotli des grosses réponses.
+#
+# JSON_SERIALIZER=orjson remplace json.dumps par orjson pour toutes les réponses (classe de
+# réponse par défaut de l'API). Les endpoints qui renvoient des listes de lignes complètes
+# (/players, /analytics/player-stats, /players/batch) construisent directement leur réponse avec
+# json_response() : leurs données sont déjà des types JSON (lignes SQLite), le parcours de
+# jsonable_encoder est donc évité quel que soit le sérialiseur.
+#
+# Les corps d'au moins COMPRESSION_MIN_SIZE octets sont compressés selon Accept-Encoding :
+# brotli si le module est installé et accepté, sinon gzip. Une réponse portant un ETag (cache
+# HTTP, /player-by-name) n'est compressée qu'une fois par encodage : le résultat est conservé.
+
+import gzip
+import logging
+import os
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+
+from response_cache import ResponseLRU
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON_SERIALIZER = os.getenv("JSON_SERIALIZER", "json").lower()
+# Taille minimale (octets) d'un corps compressé ; 0 désactive la compression
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+
+# Types de contenu compressés (les images sont déjà compressées)
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+class ORJSONResponse(JSONResponse):
+    """Réponse JSON sérialisée par orjson (UTF-8 compact, comme JSONResponse, en 5 à 10 fois moins de temps)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+if JSON_SERIALIZER == "orjson" and orjson is None:
+    logger.warning("JSON_SERIALIZER=orjson mais orjson n'est pas installé (pip install orjson) : json standard utilisé")
+ResponseClass = ORJSONResponse if JSON_SERIALIZER == "orjson" and orjson is not None else JSONResponse
+
+def json_response(content: Any, **kwargs) -> JSONResponse:
+    """Réponse JSON directe (sans jsonable_encoder) pour des données déjà composées de types JSON."""
+    return ResponseClass(content, **kwargs)
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Encodage retenu pour un en-tête Accept-Encoding : "br", "gzip" ou None."""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+    for encoding in (("br",) if brotli is not None else ()) + ("gzip",):
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+def is_compressible(content_type: Optional[str], size: int) -> bool:
+    return (COMPRESSION_MIN_SIZE > 0 and size >= COMPRESSION_MIN_SIZE
+            and bool(content_type) and content_type.startswith(COMPRESSIBLE_TYPES))
+
+# Corps compressés des réponses à ETag, par (encodage, ETag)
+compressed_bodies = ResponseLRU()
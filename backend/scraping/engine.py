@@ -0,0 +1,246 @@
+# Filename: scraping/engine.py
+# Description: Moteur de sources de scraping : chaque source déclare ses entrées, sorties, TTL et limite de débit.
+
+import contextvars
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+import metrics
+import shared_state
+import tracing
+
+try:
+    from . import http_client
+except ImportError:  # exécution directe du script
+    import http_client
+
+# Durée maximale de mémorisation d'une absence de résultat (voir SourceAdapter.negative_ttl)
+NEGATIVE_TTL_MAX = float(os.getenv("SCRAPE_NEGATIVE_TTL_MAX", str(7 * 24 * 3600)))
+
+class TTLCache:
+    """
+    Cache mémoire clé -> valeur avec expiration et éviction LRU, sûr entre threads.
+    En mode multi-worker (shared_state en sqlite), un défaut local est recherché dans
+    le stockage partagé, et chaque écriture y est recopiée (namespace = nom du cache).
+    """
+
+    def __init__(self, max_entries: int = 2048, name: str = "scrape"):
+        self.max_entries = max_entries
+        self.name = name
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] < time.monotonic():
+                del self._data[key]
+                item = None
+            if item is not None:
+                self._data.move_to_end(key)
+        if item is None:
+            store = shared_state.get_store()
+            found = store.get(self.name, key) if store is not None else None
+            if found is not None:
+                value, remaining = found
+                self._set_local(key, value, remaining)
+                item = (None, value)
+        metrics.CACHE_LOOKUPS.inc(cache=self.name, result="miss" if item is None else "hit")
+        return None if item is None else item[1]
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+        store = shared_state.get_store()
+        if store is not None:
+            store.delete(self.name, key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+        store = shared_state.get_store()
+        if store is not None:
+            store.clear(self.name)
+
+    def _set_local(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def set(self, key: str, value: Any, ttl: float):
+        self._set_local(key, value, ttl)
+        store = shared_state.get_store()
+        if store is not None:
+            store.set(self.name, key, value, ttl)
+
+@dataclass
+class SourceAdapter:
+    """
+    Déclaration d'une source de données du pipeline.
+    - fetch(context) -> dict | None : interroge la source à partir du contexte courant
+    - inputs : clés du contexte nécessaires (servent aussi de clé de cache)
+    - outputs : clés que la source a le droit d'écrire dans le contexte
+    - after : sources à exécuter avant celle-ci
+    - ttl : durée de cache des résultats en secondes (0 = pas de cache)
+    - negative_ttl : durée de mémorisation d'une absence de résultat, doublée à chaque nouvelle
+      absence consécutive pour la même requête (0 = pas de cache négatif)
+    - hosts / min_interval : délai minimal entre deux requêtes vers chacun de ces hôtes
+    - skip_if(context) : condition pour ne pas interroger la source
+    """
+    name: str
+    fetch: Callable[[dict], Optional[dict]]
+    inputs: tuple = ("name",)
+    outputs: tuple = ()
+    after: tuple = ()
+    ttl: float = 0
+    negative_ttl: float = 0
+    hosts: tuple = ()
+    min_interval: float = 0.0
+    skip_if: Optional[Callable[[dict], bool]] = None
+
+    def cache_key(self, context: dict) -> str:
+        return self.name + ":" + "|".join(" ".join(str(context.get(k) or "").lower().split()) for k in self.inputs)
+
+@dataclass
+class StageResult:
+    name: str
+    status: str  # ok | empty | cached | negative | degraded | skipped | error
+    seconds: float = 0.0
+    keys: list = field(default_factory=list)
+    error: Optional[str] = None
+
+class ScrapeEngine:
+    """
+    Exécute les sources par vagues : toutes les sources dont les dépendances (`after`)
+    sont terminées tournent en parallèle, puis leurs sorties sont fusionnées dans
+    l'ordre de déclaration (résultat déterministe).
+    """
+
+    def __init__(self, adapters: list, max_workers: int = 4, cache: Optional[TTLCache] = None,
+                 negative_cache: Optional[TTLCache] = None):
+        names = {a.name for a in adapters}
+        for a in adapters:
+            unknown = set(a.after) - names
+            if unknown:
+                raise ValueError(f"Source '{a.name}' dépend de sources inconnues: {sorted(unknown)}")
+            for host in a.hosts:
+                if a.min_interval:
+                    http_client.rate_limiter.configure(host, a.min_interval)
+        self.adapters = list(adapters)
+        self.cache = cache or TTLCache()
+        # Absences de résultat : {"misses": absences consécutives, "until": horodatage de fin}
+        self.negative_cache = negative_cache or TTLCache(name="scrape_negative")
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scrape")
+        self._stats = {a.name: {"runs": 0, "cache_hits": 0, "negative_hits": 0, "errors": 0, "seconds": 0.0} for a in adapters}
+        self._stats_lock = threading.Lock()
+
+    def _run_adapter(self, adapter: SourceAdapter, context: dict) -> tuple:
+        with tracing.span("scrape.stage", **{"stage.name": adapter.name}) as sp:
+            start = time.perf_counter()
+            result, data = self._execute(adapter, context)
+            metrics.SCRAPE_STAGE_SECONDS.observe(time.perf_counter() - start, stage=adapter.name, status=result.status)
+            sp.set_attributes({
+                "stage.status": result.status,
+                "stage.cache_hit": result.status == "cached",
+                "stage.output_keys": len(result.keys),
+                "stage.error": result.error,
+            })
+        return result, data
+
+    def _execute(self, adapter: SourceAdapter, context: dict) -> tuple:
+        if any(not context.get(k) for k in adapter.inputs):
+            return StageResult(adapter.name, "skipped"), None
+        if adapter.skip_if and adapter.skip_if(context):
+            return StageResult(adapter.name, "skipped"), None
+
+        key = adapter.cache_key(context)
+        if adapter.ttl:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._count(adapter.name, cache_hit=True)
+                return StageResult(adapter.name, "cached", keys=list(cached)), cached
+        miss = self.negative_cache.get(key) if adapter.negative_ttl else None
+        if miss is not None and miss["until"] > time.time():
+            self._count(adapter.name, negative_hit=True)
+            return StageResult(adapter.name, "negative"), None
+
+        start = time.perf_counter()
+        with http_client.track_failures() as failures:
+            try:
+                data = adapter.fetch(dict(context)) or {}
+            except Exception as e:
+                elapsed = time.perf_counter() - start
+                self._count(adapter.name, seconds=elapsed, error=True)
+                return StageResult(adapter.name, "error", elapsed, error=str(e)), None
+        elapsed = time.perf_counter() - start
+
+        data = {k: v for k, v in data.items() if k in adapter.outputs and v is not None and v != ""}
+        if failures:
+            # Hôte indisponible (réseau, 429, 5xx, disjoncteur ouvert) : le résultat, partiel ou vide,
+            # est utilisé mais n'est mis en cache ni comme résultat ni comme absence
+            self._count(adapter.name, seconds=elapsed, error=not data)
+            return StageResult(adapter.name, "degraded" if data else "error", elapsed, keys=list(data),
+                               error="; ".join(failures[:3])), data
+        self._count(adapter.name, seconds=elapsed)
+        if data:
+            if adapter.ttl:
+                self.cache.set(key, data, adapter.ttl)
+            if miss is not None:
+                self.negative_cache.delete(key)
+        elif adapter.negative_ttl:
+            self._remember_miss(adapter, key, miss)
+        return StageResult(adapter.name, "ok" if data else "empty", elapsed, keys=list(data)), data
+
+    def _remember_miss(self, adapter: SourceAdapter, key: str, previous: Optional[dict]):
+        """Mémorise une absence de résultat ; la durée double à chaque absence consécutive."""
+        misses = (previous or {}).get("misses", 0) + 1
+        ttl = min(adapter.negative_ttl * 2 ** (misses - 1), NEGATIVE_TTL_MAX)
+        # L'entrée survit à la fin de l'absence mémorisée pour conserver le compteur
+        self.negative_cache.set(key, {"misses": misses, "until": time.time() + ttl}, ttl + NEGATIVE_TTL_MAX)
+
+    def _count(self, name: str, seconds: float = 0.0, cache_hit: bool = False, negative_hit: bool = False,
+               error: bool = False):
+        with self._stats_lock:
+            s = self._stats[name]
+            s["runs"] += 1
+            s["cache_hits"] += int(cache_hit)
+            s["negative_hits"] += int(negative_hit)
+            s["errors"] += int(error)
+            s["seconds"] += seconds
+
+    def run(self, context: dict) -> tuple:
+        """Exécute toutes les sources ; retourne (contexte enrichi, liste de StageResult)."""
+        context = dict(context)
+        report = []
+        done = set()
+        pending = list(self.adapters)
+
+        while pending:
+            wave = [a for a in pending if all(dep in done for dep in a.after)]
+            if not wave:
+                raise ValueError(f"Dépendances circulaires entre sources: {[a.name for a in pending]}")
+            # copy_context : les spans des sources restent rattachés au span du pipeline
+            futures = [
+                (a, self._executor.submit(contextvars.copy_context().run, self._run_adapter, a, dict(context)))
+                for a in wave
+            ]
+            for adapter, future in futures:
+                result, data = future.result()
+                report.append(result)
+                if data:
+                    context.update(data)
+                done.add(adapter.name)
+            pending = [a for a in pending if a.name not in done]
+
+        return context, report
+
+    def get_stats(self) -> dict:
+        with self._stats_lock:
+            return {name: dict(values) for name, values in self._stats.items()}
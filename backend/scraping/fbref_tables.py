@@ -0,0 +1,130 @@
+# Filename: scraping/fbref_tables.py
+# Description: Extraction ciblée des tables FBref (stats_standard) sans parser la page complète.
+
+from bs4 import BeautifulSoup
+
+try:
+    # Parser C (libxml2) : beaucoup plus rapide que "html.parser" sur les fragments de table
+    from lxml import html as lxml_html
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+# Tables "Standard Stats" par ordre de préférence (championnat national puis toutes compétitions)
+STANDARD_TABLE_IDS = ("stats_standard_dom_lg", "stats_standard")
+
+def find_table_html(page_html: str, table_ids=STANDARD_TABLE_IDS) -> str | None:
+    """
+    Localise le HTML brut d'une table par son id, y compris lorsqu'elle est placée
+    dans un commentaire <!-- ... --> (cas fréquent sur FBref). Retourne le fragment
+    <table>...</table> ou None.
+    """
+    if not page_html:
+        return None
+    for table_id in table_ids:
+        # Recherche de sous-chaîne (bien plus rapide qu'une regex sur plusieurs Mo)
+        attr_pos = page_html.find(f'id="{table_id}"')
+        while attr_pos != -1:
+            start = page_html.rfind("<", 0, attr_pos)
+            if page_html.startswith("<table", start):
+                end = page_html.find("</table>", attr_pos)
+                if end != -1:
+                    return page_html[start:end + len("</table>")]
+            attr_pos = page_html.find(f'id="{table_id}"', attr_pos + 1)
+    return None
+
+def _is_separator(classes: str | None) -> bool:
+    # Lignes d'en-tête répétées au milieu du tbody
+    return "thead" in (classes or "").split()
+
+def parse_table_rows(table_html: str) -> list[dict]:
+    """
+    Lit toutes les lignes du tbody en un seul passage.
+    Chaque ligne devient un dictionnaire {data-stat: texte de la cellule}.
+    """
+    if not table_html:
+        return []
+
+    rows = []
+    if HAS_LXML:
+        table = lxml_html.fragment_fromstring(table_html)
+        for tr in table.iterfind(".//tbody/tr"):
+            if _is_separator(tr.get("class")):
+                continue
+            row = {}
+            for cell in tr:
+                stat = cell.get("data-stat")
+                if stat:
+                    row[stat] = cell.text_content().strip()
+            rows.append(row)
+        return rows
+
+    soup = BeautifulSoup(table_html, "html.parser")
+    tbody = soup.find("tbody")
+    for tr in (tbody.find_all("tr", recursive=False) if tbody else []):
+        if _is_separator(" ".join(tr.get("class", []))):
+            continue
+        row = {}
+        for cell in tr.find_all(["th", "td"], recursive=False):
+            stat = cell.get("data-stat")
+            if stat:
+                row[stat] = cell.get_text(strip=True)
+        rows.append(row)
+    return rows
+
+def extract_standard_rows(page_html: str) -> list[dict]:
+    """Lignes (saison/compétition) de la table stats_standard d'une page joueur FBref."""
+    return parse_table_rows(find_table_html(page_html))
+
+def stat_int(row: dict, *keys: str) -> int:
+    """Premier entier trouvé parmi les data-stat donnés (0 si vide ou absent)."""
+    for key in keys:
+        t = (row.get(key) or "").replace(",", "")
+        if t:
+            return int(t) if t.isdigit() else 0
+    return 0
+
+def _stat_float(row: dict, *keys: str) -> float | None:
+    for key in keys:
+        t = (row.get(key) or "").replace(",", "")
+        if t:
+            try:
+                return float(t)
+            except ValueError:
+                return None
+    return None
+
+def _stat_int_or_none(row: dict, *keys: str) -> int | None:
+    if not any(row.get(key) for key in keys):
+        return None
+    return stat_int(row, *keys)
+
+def season_stats_from_rows(rows: list[dict], source_url: str | None = None) -> list[dict]:
+    """
+    Normalise toutes les lignes saison/compétition de la table stats_standard
+    au format de la table player_season_stats.
+    """
+    out = []
+    for row in rows:
+        season = (row.get("season") or row.get("year_id") or "").strip()
+        if not season:
+            continue
+        out.append({
+            "season": season,
+            "comp": row.get("comp_level") or row.get("comp") or "",
+            "squad": row.get("squad") or row.get("team") or "",
+            "age": _stat_int_or_none(row, "age"),
+            "country": row.get("country") or None,
+            "matches_played": _stat_int_or_none(row, "games", "mp"),
+            "starts": _stat_int_or_none(row, "games_starts"),
+            "minutes": _stat_int_or_none(row, "minutes", "min"),
+            "goals": _stat_int_or_none(row, "goals", "gls"),
+            "assists": _stat_int_or_none(row, "assists", "ast"),
+            "penalties": _stat_int_or_none(row, "pens_made"),
+            "yellow_cards": _stat_int_or_none(row, "cards_yellow"),
+            "red_cards": _stat_int_or_none(row, "cards_red"),
+            "xg": _stat_float(row, "xg"),
+            "xg_assist": _stat_float(row, "xg_assist"),
+            "source_url": source_url,
+        })
+    return out
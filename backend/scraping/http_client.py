@@ -0,0 +1,472 @@
+# Filename: scraping/http_client.py
+# Description: Client HTTP partagé par toutes les sources de scraping (pool de connexions, limites de débit, statistiques).
+
+import base64
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+import shared_state
+import tracing
+
+# En-tête User-Agent pour imiter un navigateur
+HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"}
+
+# Connexions keep-alive conservées par hôte
+POOL_MAXSIZE = 16
+
+# Enregistrement / rejeu des échanges HTTP (benchmarks reproductibles, hors ligne)
+#   SCRAPER_HTTP_MODE=live|record|replay
+#   SCRAPER_FIXTURES=dossier de l'archive (une réponse JSON par requête, rangée par hôte)
+#   SCRAPER_REPLAY_LATENCY_MS=latence ajoutée à chaque réponse rejouée
+#   SCRAPER_HTTP_LIVE_HOSTS=hôtes toujours interrogés en direct (ex: stub OpenAI local)
+HTTP_MODE = os.getenv("SCRAPER_HTTP_MODE", "live").lower()
+FIXTURES_DIR = os.getenv("SCRAPER_FIXTURES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures"))
+REPLAY_LATENCY_MS = float(os.getenv("SCRAPER_REPLAY_LATENCY_MS", "0"))
+LIVE_HOSTS = {h.strip() for h in os.getenv("SCRAPER_HTTP_LIVE_HOSTS", "").split(",") if h.strip()}
+
+# Disjoncteur par hôte : après CIRCUIT_FAILURES échecs consécutifs (erreur réseau, 5xx) ou un 429,
+# l'hôte n'est plus interrogé pendant CIRCUIT_OPEN_SECONDS, durée doublée à chaque réouverture
+# (CIRCUIT_MAX_OPEN_SECONDS au plus, Retry-After respecté). Ensuite une seule requête passe, à titre
+# d'essai (les autres reçoivent CircuitOpen) : un succès referme le disjoncteur, un échec le rouvre
+# aussitôt. CIRCUIT_FAILURES=0 le désactive.
+CIRCUIT_FAILURES = int(os.getenv("CIRCUIT_FAILURES", "5"))
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+CIRCUIT_MAX_OPEN_SECONDS = float(os.getenv("CIRCUIT_MAX_OPEN_SECONDS", "900"))
+# Durée maximale de la requête d'essai : au-delà, un autre appelant peut tenter la sienne
+CIRCUIT_TRIAL_SECONDS = float(os.getenv("CIRCUIT_TRIAL_SECONDS", "60"))
+
+class FixtureMissing(requests.ConnectionError):
+    """Aucune réponse enregistrée pour cette requête en mode replay."""
+
+class CircuitOpen(requests.ConnectionError):
+    """Hôte temporairement ignoré (disjoncteur ouvert après des échecs consécutifs ou un 429)."""
+
+class RateLimiter:
+    """
+    Espacement minimal entre deux requêtes vers un même hôte, partagé entre threads
+    (et entre workers lorsque shared_state est en mode sqlite).
+    Chaque appel réserve le prochain créneau sous verrou puis attend hors verrou.
+    """
+
+    def __init__(self):
+        self._intervals: dict[str, float] = {}
+        self._next_slot: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, host: str, min_interval: float):
+        self._intervals[host] = min_interval
+
+    def wait(self, host: str) -> float:
+        """Attend le créneau de l'hôte et retourne le temps d'attente (s)."""
+        interval = self._intervals.get(host)
+        if not interval:
+            return 0.0
+        store = shared_state.get_store()
+        if store is not None:
+            delay = store.reserve(host, interval)
+        else:
+            with self._lock:
+                now = time.monotonic()
+                slot = max(now, self._next_slot.get(host, 0.0))
+                self._next_slot[host] = slot + interval
+            delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return max(delay, 0.0)
+
+rate_limiter = RateLimiter()
+
+class CircuitBreaker:
+    """
+    État des disjoncteurs par hôte, partagé entre threads. En mode multi-worker (shared_state
+    en sqlite), l'ouverture est publiée dans le stockage partagé pour que les autres workers
+    cessent eux aussi d'interroger l'hôte, et la requête d'essai est réservée par un verrou
+    partagé. Horloge murale, comparable entre processus.
+    """
+
+    def __init__(self):
+        self._hosts: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _new_state() -> dict:
+        return {"failures": 0, "opens": 0, "open_until": 0.0, "trial_until": 0.0}
+
+    @staticmethod
+    def _trial_owner() -> str:
+        return f"{os.getpid()}:circuit"
+
+    def check(self, host: str):
+        """
+        Lève CircuitOpen si l'hôte est ignoré en ce moment. Une fois la durée d'ouverture écoulée
+        (demi-ouverture), un seul appelant passe, tous workers confondus : sa requête sert d'essai
+        et les autres reçoivent CircuitOpen jusqu'à ce que record() en enregistre le résultat.
+        """
+        if CIRCUIT_FAILURES <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            state = self._hosts.get(host)
+            opens = state["opens"] if state else 0
+            open_until = state["open_until"] if state else 0.0
+        store = shared_state.get_store()
+        if store is not None and open_until <= now:
+            found = store.get("circuit", host)
+            if found:
+                opens = max(opens, found[0].get("opens", 1))
+                open_until = max(open_until, found[0]["open_until"])
+            elif opens:
+                # Entrée supprimée par l'essai réussi d'un autre worker : le disjoncteur est refermé
+                with self._lock:
+                    state.update(failures=0, opens=0, open_until=0.0, trial_until=0.0)
+                return
+        if not opens:
+            return
+        if open_until > now:
+            raise CircuitOpen(f"{host} ignoré encore {open_until - now:.0f} s (disjoncteur ouvert)")
+
+        # Demi-ouvert : réservation de la requête d'essai
+        with self._lock:
+            state = self._hosts.setdefault(host, self._new_state())
+            if state["trial_until"] > now:
+                raise CircuitOpen(f"{host} : requête d'essai en cours (disjoncteur demi-ouvert)")
+            state["opens"] = max(state["opens"], opens)
+            state["trial_until"] = now + CIRCUIT_TRIAL_SECONDS
+        if store is not None and not store.try_acquire("circuit_trial:" + host, self._trial_owner(),
+                                                        CIRCUIT_TRIAL_SECONDS):
+            with self._lock:
+                state["trial_until"] = 0.0
+            raise CircuitOpen(f"{host} : requête d'essai en cours dans un autre worker (disjoncteur demi-ouvert)")
+
+    def record(self, host: str, ok: bool, retry_after: float | None = None, throttled: bool = False):
+        """Résultat d'une requête : un succès referme le disjoncteur, un échec peut l'ouvrir."""
+        if CIRCUIT_FAILURES <= 0:
+            return
+        opened = False
+        with self._lock:
+            state = self._hosts.get(host)
+            if ok:
+                if state is None or not (state["failures"] or state["opens"] or state["trial_until"]):
+                    return
+                tripped, trial = bool(state["opens"]), bool(state["trial_until"])
+                state.update(failures=0, opens=0, open_until=0.0, trial_until=0.0)
+            else:
+                if state is None:
+                    state = self._hosts[host] = self._new_state()
+                trial = bool(state["trial_until"])
+                state["trial_until"] = 0.0
+                state["failures"] += 1
+                # Un 429, le seuil d'échecs atteint ou l'échec de la requête d'essai ouvrent le disjoncteur
+                opened = bool(throttled or state["failures"] >= CIRCUIT_FAILURES or state["opens"])
+                if opened:
+                    state["opens"] += 1
+                    duration = min(CIRCUIT_OPEN_SECONDS * 2 ** (state["opens"] - 1), CIRCUIT_MAX_OPEN_SECONDS)
+                    if retry_after:
+                        duration = min(max(duration, retry_after), CIRCUIT_MAX_OPEN_SECONDS)
+                    state["open_until"] = time.time() + duration
+                    published = {"open_until": state["open_until"], "opens": state["opens"]}
+        if opened:
+            metrics.CIRCUIT_OPENS.inc(host=host)
+        store = shared_state.get_store()
+        if store is None:
+            return
+        if opened:
+            # Conservé au-delà de la réouverture : les autres workers savent que l'hôte est demi-ouvert
+            store.set("circuit", host, published, duration + CIRCUIT_MAX_OPEN_SECONDS)
+        elif ok and tripped:
+            store.delete("circuit", host)
+        if trial:
+            store.release("circuit_trial:" + host, self._trial_owner())
+
+    def open_hosts(self) -> dict:
+        """Hôtes ignorés par ce processus et secondes restantes."""
+        now = time.time()
+        with self._lock:
+            return {host: round(s["open_until"] - now, 1) for host, s in self._hosts.items() if s["open_until"] > now}
+
+    def reset(self):
+        with self._lock:
+            trials = [host for host, s in self._hosts.items() if s["trial_until"]]
+            self._hosts.clear()
+        store = shared_state.get_store()
+        if store is not None:
+            store.clear("circuit")
+            for host in trials:
+                store.release("circuit_trial:" + host, self._trial_owner())
+
+circuit_breaker = CircuitBreaker()
+
+metrics.gauge("xscout_http_circuit_open", "Hôtes dont le disjoncteur est ouvert (1 = ignoré)",
+              ("host",), callback=lambda: {(host,): 1 for host in circuit_breaker.open_hosts()})
+
+def _retry_after(resp: requests.Response) -> float | None:
+    """Délai Retry-After en secondes (forme numérique uniquement)."""
+    try:
+        return float(resp.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+# Échecs d'hôte observés par le bloc track_failures() en cours (contexte du thread appelant)
+_failures: contextvars.ContextVar = contextvars.ContextVar("http_failures", default=None)
+
+@contextmanager
+def track_failures():
+    """
+    Collecte les échecs d'hôte (erreur réseau, 429, 5xx, disjoncteur ouvert) des requêtes du bloc :
+    le moteur de sources distingue ainsi une source indisponible d'une source sans résultat.
+    """
+    failures: list = []
+    token = _failures.set(failures)
+    try:
+        yield failures
+    finally:
+        _failures.reset(token)
+
+def _note_failure(host: str, reason: str):
+    failures = _failures.get()
+    if failures is not None:
+        failures.append(f"{host}: {reason}")
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    """Session unique (pool de connexions keep-alive) partagée par toutes les sources."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_MAXSIZE, pool_maxsize=POOL_MAXSIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(HEADERS)
+                _session = session
+    return _session
+
+# Statistiques par source : requêtes, erreurs, octets, durée cumulée, attente due aux limites de débit
+_stats = defaultdict(lambda: {"requests": 0, "errors": 0, "bytes": 0, "seconds": 0.0, "rate_limit_wait": 0.0})
+_stats_lock = threading.Lock()
+
+def _record(source: str, seconds: float, waited: float, size: int = 0, error: bool = False):
+    with _stats_lock:
+        s = _stats[source]
+        s["requests"] += 1
+        s["errors"] += int(error)
+        s["bytes"] += size
+        s["seconds"] += seconds
+        s["rate_limit_wait"] += waited
+
+def _observe(source: str, host: str, seconds: float, waited: float, outcome: str, size: int = 0):
+    metrics.SCRAPER_REQUEST_SECONDS.observe(seconds, source=source, host=host)
+    metrics.SCRAPER_REQUESTS.inc(source=source, host=host, outcome=outcome)
+    if size:
+        metrics.SCRAPER_RESPONSE_BYTES.inc(size, source=source)
+    if waited:
+        metrics.RATE_LIMIT_WAIT_SECONDS.inc(waited, host=host)
+
+def _pool_usage() -> dict:
+    """Connexions keep-alive par hôte : en cours d'utilisation et inactives."""
+    usage = {}
+    if _session is None:
+        return usage
+    for adapter in set(_session.adapters.values()):
+        pools = getattr(getattr(adapter, "poolmanager", None), "pools", None)
+        if pools is None:
+            continue
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            queue = getattr(pool, "pool", None)
+            if queue is None:
+                continue
+            idle = sum(1 for conn in list(queue.queue) if conn is not None)
+            usage[(pool.host, "in_use")] = queue.maxsize - queue.qsize()
+            usage[(pool.host, "idle")] = idle
+    return usage
+
+metrics.gauge("xscout_http_pool_connections", "Connexions du pool HTTP partagé par hôte et état",
+              ("host", "state"), callback=_pool_usage)
+
+def configure_mode(mode: str, fixtures_dir: str | None = None, latency_ms: float | None = None):
+    """Change le mode (live, record, replay) à l'exécution, ex: depuis un benchmark."""
+    global HTTP_MODE, FIXTURES_DIR, REPLAY_LATENCY_MS
+    if mode not in ("live", "record", "replay"):
+        raise ValueError(f"Mode HTTP inconnu: {mode}")
+    HTTP_MODE = mode
+    if fixtures_dir is not None:
+        FIXTURES_DIR = fixtures_dir
+    if latency_ms is not None:
+        REPLAY_LATENCY_MS = latency_ms
+
+def fixture_key(method: str, url: str, params=None, json_body=None, data=None) -> str:
+    """
+    Empreinte stable d'une requête : méthode, URL, paramètres triés et corps.
+    Les en-têtes (dont Authorization) sont volontairement exclus.
+    """
+    parts = [method.upper(), url]
+    if params:
+        items = params.items() if isinstance(params, dict) else params
+        parts.append(urlencode(sorted((str(k), str(v)) for k, v in items)))
+    if json_body is not None:
+        parts.append(json.dumps(json_body, sort_keys=True, ensure_ascii=False))
+    if data is not None:
+        parts.append(data.decode("utf-8", "replace") if isinstance(data, bytes) else str(data))
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+def _fixture_path(host: str, key: str) -> str:
+    return os.path.join(FIXTURES_DIR, host or "_", f"{key}.json")
+
+def _save_fixture(path: str, method: str, url: str, kwargs: dict, resp: requests.Response):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    record = {
+        "method": method.upper(),
+        "url": url,
+        "params": kwargs.get("params"),
+        "json": kwargs.get("json"),
+        "status": resp.status_code,
+        "headers": {k: v for k, v in resp.headers.items() if k.lower() in ("content-type", "etag", "last-modified")},
+        "encoding": resp.encoding,
+        "body_b64": base64.b64encode(resp.content).decode("ascii"),
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def _replay_fixture(path: str, method: str, url: str) -> requests.Response:
+    """Réponse rejouée depuis l'archive, servie sans réseau (avec latence simulée)."""
+    if REPLAY_LATENCY_MS:
+        time.sleep(REPLAY_LATENCY_MS / 1000)
+    try:
+        with open(path, encoding="utf-8") as f:
+            record = json.load(f)
+    except FileNotFoundError:
+        raise FixtureMissing(f"Aucune fixture pour {method.upper()} {url}")
+    resp = requests.Response()
+    resp.status_code = record["status"]
+    resp.headers.update(record.get("headers") or {})
+    resp.encoding = record.get("encoding")
+    resp._content = base64.b64decode(record["body_b64"])
+    resp.url = url
+    resp.reason = "Replayed"
+    return resp
+
+def request(method: str, url: str, source: str | None = None, **kwargs) -> requests.Response:
+    """
+    Effectue une requête via la session partagée en respectant la limite de débit de l'hôte.
+    `source` (ex: "fbref") sert à regrouper les statistiques ; par défaut l'hôte.
+    En mode record, chaque réponse est archivée ; en mode replay, elle est relue depuis l'archive.
+    Lève CircuitOpen, sans requête, tant que le disjoncteur de l'hôte est ouvert (hors replay).
+    """
+    host = urlsplit(url).hostname or ""
+    source = source or host
+    mode = "live" if host in LIVE_HOSTS else HTTP_MODE
+    fixture = None
+    if mode != "live":
+        key = fixture_key(method, url, kwargs.get("params"), kwargs.get("json"), kwargs.get("data"))
+        fixture = _fixture_path(host, key)
+
+    with tracing.span(f"HTTP {method.upper()}", **{
+        "http.request.method": method.upper(),
+        "url.full": url,
+        "server.address": host,
+        "scraper.source": source,
+        "http.mode": mode,
+    }) as sp:
+        if mode != "replay":
+            try:
+                circuit_breaker.check(host)
+            except CircuitOpen:
+                sp.set_attribute("http.circuit_open", True)
+                _observe(source, host, 0.0, 0.0, "circuit_open")
+                _note_failure(host, "circuit_open")
+                raise
+        waited = rate_limiter.wait(host)
+        start = time.perf_counter()
+        try:
+            if mode == "replay":
+                resp = _replay_fixture(fixture, method, url)
+            else:
+                resp = get_session().request(method, url, **kwargs)
+                if mode == "record":
+                    _save_fixture(fixture, method, url, kwargs, resp)
+        except requests.RequestException as e:
+            elapsed = time.perf_counter() - start
+            _record(source, elapsed, waited, error=True)
+            _observe(source, host, elapsed, waited, "exception")
+            if mode != "replay":
+                circuit_breaker.record(host, ok=False)
+            _note_failure(host, type(e).__name__)
+            raise
+        size = len(resp.content)
+        retries = getattr(getattr(resp.raw, "retries", None), "history", None) or ()
+        sp.set_attributes({
+            "http.response.status_code": resp.status_code,
+            "http.response.body.size": size,
+            "http.request.resend_count": len(retries),
+            "ratelimit.wait_ms": round(waited * 1000, 1),
+        })
+        elapsed = time.perf_counter() - start
+        _record(source, elapsed, waited, size, error=resp.status_code >= 400)
+        _observe(source, host, elapsed, waited, "http_error" if resp.status_code >= 400 else "ok", size)
+        # 429 et 5xx : l'hôte est en difficulté ; les autres 4xx sont des réponses normales (page absente...)
+        host_failed = resp.status_code == 429 or resp.status_code >= 500
+        if mode != "replay":
+            circuit_breaker.record(host, ok=not host_failed, retry_after=_retry_after(resp) if host_failed else None,
+                                   throttled=resp.status_code == 429)
+        if host_failed:
+            _note_failure(host, f"http_{resp.status_code}")
+    return resp
+
+def get(url: str, source: str | None = None, **kwargs) -> requests.Response:
+    return request("GET", url, source=source, **kwargs)
+
+def post(url: str, source: str | None = None, **kwargs) -> requests.Response:
+    return request("POST", url, source=source, **kwargs)
+
+def chat_completion(url: str, body: dict, operation: str, **kwargs) -> requests.Response:
+    """
+    Appel OpenAI Chat Completions dans un span "llm.chat" (modèle, opération, jetons consommés).
+    `operation` décrit l'usage (ex: "scouting_report", "normalize_player_name").
+    """
+    with tracing.span("llm.chat", **{
+        "gen_ai.system": "openai",
+        "gen_ai.operation.name": operation,
+        "gen_ai.request.model": body.get("model"),
+        "gen_ai.request.max_tokens": body.get("max_tokens"),
+    }) as sp:
+        model = body.get("model") or ""
+        start = time.perf_counter()
+        try:
+            resp = post(url, source="openai", json=body, **kwargs)
+        finally:
+            metrics.LLM_REQUEST_SECONDS.observe(time.perf_counter() - start, operation=operation, model=model)
+        if resp.ok and "json" in resp.headers.get("Content-Type", ""):
+            usage = resp.json().get("usage") or {}
+            sp.set_attributes({
+                "gen_ai.usage.input_tokens": usage.get("prompt_tokens"),
+                "gen_ai.usage.output_tokens": usage.get("completion_tokens"),
+            })
+            metrics.LLM_TOKENS.inc(usage.get("prompt_tokens") or 0, operation=operation, model=model, type="input")
+            metrics.LLM_TOKENS.inc(usage.get("completion_tokens") or 0, operation=operation, model=model, type="output")
+    return resp
+
+def get_stats() -> dict:
+    """Copie des statistiques HTTP par source."""
+    with _stats_lock:
+        return {source: dict(values) for source, values in _stats.items()}
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
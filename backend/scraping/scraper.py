@@ -1,143 +1,45 @@
 # Filename: scraping/scraper.py
-# Description: Script de scraping amélioré pour collecter les données des joueurs à la demande avec enrichissement OpenAI.
+# Description: Pipeline unique de scraping des joueurs (Wikidata, FBref, Transfermarkt, Wikipedia) avec enrichissement OpenAI.
 
 import requests
 from bs4 import BeautifulSoup
-import sqlite3
 import re
 import time
 import os
 import sys
 import json
+import logging
 from datetime import date, datetime
 from urllib.parse import quote
 
-# Configuration de la base de données SQLite
-# Utilise maintenant le module centralisé depuis backend
-# Le DB_PATH local n'est utilisé que si le module centralisé n'est pas disponible
-# En production, le module centralisé gère le chemin correct (/app/data)
-DB_PATH = os.path.join(os.path.dirname(__file__), "players.db")
+# Modules partagés du backend (database.py, tracing.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import shared_state
+import tracing
+from countries import normalize_nationality_fields
+from database import (save_player_to_db, record_market_value, save_transfers, save_season_stats, save_player_alias,
+                      coalesce_player_writes)
 
-# Import du module de base de données centralisé
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
 try:
-    from database import init_db, save_player_to_db as db_save_player_to_db, get_db_connection
-    USE_CENTRALIZED_DB = True
-except ImportError:
-    USE_CENTRALIZED_DB = False
-    print("-> Attention: Module database.py non trouvé, utilisation de la DB locale")
-
-def init_db_local():
-    """Fonction locale de fallback si le module centralisé n'est pas disponible."""
-    # S'assure que le répertoire existe
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    cur = conn.cursor()
-    
-    # Table principale des joueurs avec colonnes étendues
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS players (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT UNIQUE,
-        age INTEGER,
-        nationality TEXT,
-        current_club TEXT,
-        position TEXT,
-        market_value TEXT,
-        height TEXT,
-        weight TEXT,
-        goals INTEGER,
-        assists INTEGER,
-        appearances INTEGER,
-        yellow_cards INTEGER,
-        red_cards INTEGER,
-        minutes_played INTEGER,
-        goals_per_match REAL,
-        assists_per_match REAL,
-        contract_expires TEXT,
-        source_wikipedia TEXT,
-        source_transfermarkt TEXT,
-        scouting_report TEXT,
-        image_url TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
-    
-    # Table pour l'historique des transferts
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS transfers (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        player_id INTEGER,
-        player_name TEXT,
-        from_club TEXT,
-        to_club TEXT,
-        transfer_date TEXT,
-        transfer_fee TEXT,
-        transfer_type TEXT,
-        season TEXT,
-        FOREIGN KEY (player_id) REFERENCES players(id),
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
-    
-    # Table pour l'historique des valeurs de marché
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS market_value_history (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        player_id INTEGER,
-        player_name TEXT,
-        market_value TEXT,
-        date_recorded TEXT,
-        FOREIGN KEY (player_id) REFERENCES players(id),
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
-    
-    # Ajoute les colonnes si elles n'existent pas (migration)
-    columns_to_add = [
-        'scouting_report', 'image_url', 'weight', 'yellow_cards', 
-        'red_cards', 'minutes_played', 'goals_per_match', 'assists_per_match',
-        'contract_expires', 'created_at', 'updated_at'
-    ]
-    for col in columns_to_add:
-        try:
-            if col in ['goals_per_match', 'assists_per_match']:
-                cur.execute(f"ALTER TABLE players ADD COLUMN {col} REAL")
-            elif col in ['yellow_cards', 'red_cards', 'minutes_played']:
-                cur.execute(f"ALTER TABLE players ADD COLUMN {col} INTEGER")
-            elif col in ['created_at', 'updated_at']:
-                cur.execute(f"ALTER TABLE players ADD COLUMN {col} TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
-            else:
-                cur.execute(f"ALTER TABLE players ADD COLUMN {col} TEXT")
-        except sqlite3.OperationalError:
-            pass  # La colonne existe déjà
-    
-    conn.commit()
-    conn.close()
-
-# En-tête User-Agent pour imiter un navigateur
-HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"}
+    from .fbref_tables import extract_standard_rows, season_stats_from_rows, stat_int
+    from . import http_client
+    from .http_client import HEADERS
+    from .engine import ScrapeEngine, SourceAdapter, TTLCache
+except ImportError:  # exécution directe du script
+    from fbref_tables import extract_standard_rows, season_stats_from_rows, stat_int
+    import http_client
+    from http_client import HEADERS
+    from engine import ScrapeEngine, SourceAdapter, TTLCache
+
+logger = logging.getLogger(__name__)
 
 # Configuration OpenAI pour la normalisation des noms
 # ⚠️ SÉCURITÉ : Ne pas commiter la clé API dans le code !
 # Configurez votre clé API OpenAI via une variable d'environnement ou un fichier .env
 # Pour obtenir une clé : https://platform.openai.com/api-keys
-import os
-from dotenv import load_dotenv
-
-# Charge les variables d'environnement depuis un fichier .env (si présent)
-load_dotenv()
-
-# Récupère la clé API depuis la variable d'environnement
-# Si la variable n'existe pas, utilise une valeur par défaut vide (à configurer)
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-OPENAI_API_URL = "https://api.openai.com/v1/chat/completions"
-
-# Vérification que la clé API est configurée
-if not OPENAI_API_KEY:
-    print("⚠️  ATTENTION: OPENAI_API_KEY n'est pas configurée dans scraper.py!")
-    print("   Configurez-la via une variable d'environnement ou un fichier .env")
+# Le .env est chargé une seule fois par main.py (ou par le bloc __main__ ci-dessous) :
+# la clé et l'URL sont donc lues à chaque appel et non à l'import du module.
+DEFAULT_OPENAI_API_URL = "https://api.openai.com/v1/chat/completions"
 
 def normalize_player_name_with_openai(player_name):
     """
@@ -152,7 +54,7 @@ def normalize_player_name_with_openai(player_name):
     
     try:
         headers = {
-            "Authorization": f"Bearer {OPENAI_API_KEY}",
+            "Authorization": f"Bearer {os.getenv('OPENAI_API_KEY', '')}",
             "Content-Type": "application/json"
         }
         
@@ -188,7 +90,7 @@ Nom normalisé:"""
             "max_tokens": 50
         }
         
-        resp = requests.post(OPENAI_API_URL, json=openai_body, headers=headers, timeout=8)
+        resp = http_client.chat_completion(os.getenv("OPENAI_API_URL", DEFAULT_OPENAI_API_URL), openai_body, "normalize_player_name", headers=headers, timeout=8)
         resp.raise_for_status()
         response_data = resp.json()
         normalized_name = response_data.get('choices', [{}])[0].get('message', {}).get('content', '').strip()
@@ -199,7 +101,7 @@ Nom normalisé:"""
         
         # Si OpenAI a retourné quelque chose de valide et différent, on l'utilise
         if normalized_name and len(normalized_name) > 1 and normalized_name.lower() != player_name.lower():
-            print(f"-> Nom normalisé par OpenAI: '{player_name}' -> '{normalized_name}'")
+            logger.info("Nom normalisé par OpenAI", extra={"query": player_name, "normalized": normalized_name})
             return normalized_name
         elif normalized_name and len(normalized_name) > 1:
             # Même si similaire, on garde la version normalisée d'OpenAI
@@ -209,22 +111,25 @@ Nom normalisé:"""
             return player_name
             
     except requests.exceptions.Timeout:
-        print(f"-> Timeout OpenAI pour la normalisation de '{player_name}', utilisation du nom original")
+        logger.warning("Timeout OpenAI pour la normalisation, utilisation du nom original", extra={"query": player_name})
         return player_name
     except Exception as e:
-        print(f"-> Erreur lors de la normalisation OpenAI de '{player_name}': {e}")
+        logger.warning("Erreur lors de la normalisation OpenAI: %s", e, extra={"query": player_name})
         return player_name
 
-def get_player_page_url(player_name, site):
-    """Trouve l'URL de la page du joueur sur Transfermarkt avec recherche améliorée."""
+def get_player_page_url(player_name, site, normalize=True):
+    """
+    Trouve l'URL de la page du joueur sur Transfermarkt avec recherche améliorée.
+    normalize=False lorsque le nom a déjà été normalisé (pipeline : évite un second appel OpenAI).
+    """
     if site == "transfermarkt":
         try:
             # Normalise le nom avec OpenAI pour corriger les erreurs d'orthographe et accents
-            normalized_name = normalize_player_name_with_openai(player_name)
+            normalized_name = normalize_player_name_with_openai(player_name) if normalize else player_name
             # Nettoie le nom pour la recherche
             clean_name = normalized_name.strip()
             search_url = f"https://www.transfermarkt.com/schnellsuche/ergebnis/schnellsuche?query={clean_name.replace(' ', '+')}"
-            resp = requests.get(search_url, headers=HEADERS, timeout=10)
+            resp = http_client.get(search_url, source="transfermarkt", headers=HEADERS, timeout=10)
             resp.raise_for_status()
             soup = BeautifulSoup(resp.text, 'html.parser')
 
@@ -266,9 +171,9 @@ def get_player_page_url(player_name, site):
                 return href
 
         except requests.exceptions.Timeout:
-            print(f"Timeout lors de la recherche pour {player_name}")
+            logger.warning("Timeout lors de la recherche Transfermarkt", extra={"player": player_name})
         except requests.exceptions.RequestException as e:
-            print(f"Erreur de recherche URL pour {player_name} sur {site}: {e}")
+            logger.warning("Erreur de recherche URL: %s", e, extra={"player": player_name, "site": site})
     return None
 
 def _age_from_birthdate_str(birthdate_str: str):
@@ -311,24 +216,72 @@ def _extract_jsonld_player(soup):
                 return it
     return None
 
-def _clean_text(s: str) -> str:
-    if not s:
-        return s
-    s = re.sub(r"[\u200b\u200e\u200f]", "", s)  # zero-width
-    s = " ".join(s.split())
-    return s.strip()
-
 def _parse_number(s: str):
     if not s:
         return None
     m = re.search(r"\b(\d+)\b", s.replace(".", "").replace(",", ""))
     return int(m.group(1)) if m else None
 
+_TM_DATE_FORMATS = ("%b %d, %Y", "%d.%m.%Y", "%d/%m/%Y", "%Y-%m-%d", "%d %b %Y")
+
+def _tm_date_iso(text: str):
+    """Convertit une date Transfermarkt ("Jul 1, 2023", "01.07.2023"...) en ISO."""
+    text = _clean_text(text)
+    if not text:
+        return None
+    for fmt in _TM_DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+def _transfer_type_from_fee(fee: str):
+    f = (fee or "").lower()
+    if "end of loan" in f or "fin de prêt" in f or "leih-ende" in f:
+        return "end of loan"
+    if "loan" in f or "leihe" in f or "prêt" in f:
+        return "loan"
+    if "free" in f or "ablösefrei" in f or "libre" in f:
+        return "free"
+    return "transfer" if f and f != "-" else None
+
+def extract_transfermarkt_transfers(soup) -> list:
+    """
+    Extrait l'historique des transferts depuis la grille Transfermarkt
+    (div.tm-player-transfer-history-grid) déjà présente dans la page profil.
+    """
+    transfers = []
+    for row in soup.select("div.tm-player-transfer-history-grid"):
+        if "tm-player-transfer-history-grid--heading" in row.get("class", []):
+            continue
+
+        def cell(name):
+            el = row.select_one(f".tm-player-transfer-history-grid__{name}")
+            if not el:
+                return None
+            link = el.select_one("a.tm-player-transfer-history-grid__club-link")
+            return _clean_text((link or el).get_text(" ", strip=True))
+
+        from_club, to_club = cell("old-club"), cell("new-club")
+        if not from_club and not to_club:
+            continue
+        fee = cell("fee")
+        transfers.append({
+            "from_club": from_club,
+            "to_club": to_club,
+            "transfer_date": _tm_date_iso(cell("date")),
+            "transfer_fee": fee if fee and fee != "-" else None,
+            "transfer_type": _transfer_type_from_fee(fee),
+            "season": cell("season"),
+        })
+    return transfers
+
 def scrape_transfermarkt(url: str):
     """Scrape les données depuis une page de profil Transfermarkt - Version robuste avec JSON-LD et fallbacks."""
     data = {}
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        resp = http_client.get(url, source="transfermarkt", headers=HEADERS, timeout=15)
         resp.raise_for_status()
         soup = BeautifulSoup(resp.text, "html.parser")
 
@@ -427,23 +380,22 @@ def scrape_transfermarkt(url: str):
             if m_as and not data.get("assists"):
                 data["assists"] = int(m_as.group(2))
 
+        # --- 5) Historique des transferts (même page, pas de requête supplémentaire) ---
+        data["transfers"] = extract_transfermarkt_transfers(soup)
+
         # Defaults
         data.setdefault("appearances", 0)
         data.setdefault("goals", 0)
         data.setdefault("assists", 0)
         data.setdefault("minutes_played", 0)
 
-        print(f"-> Profil TM: {data.get('name')} | age={data.get('age')} | pos={data.get('position')} | apps={data.get('appearances')} g={data.get('goals')} a={data.get('assists')}")
+        logger.debug("Profil Transfermarkt", extra={"player": data.get('name'), "age": data.get('age'), "position": data.get('position')})
 
     except Exception as e:
-        print(f"Erreur scraping Transfermarkt ({url}): {e}")
+        logger.warning("Erreur scraping Transfermarkt: %s", e, extra={"url": url})
 
     return data
 
-def _fbref_uncomment_tables(html: str) -> str:
-    """FBref met parfois des tables dans des commentaires HTML <!-- ... -->"""
-    return re.sub(r"<!--|-->", "", html)
-
 def _normalize_name_basic(s: str) -> str:
     """Normalise un nom pour la comparaison (enlève accents, caractères spéciaux)"""
     import unicodedata
@@ -453,178 +405,6 @@ def _normalize_name_basic(s: str) -> str:
     s = re.sub(r"\s+", " ", s).strip()
     return s
 
-def fbref_search_player_urls(player_name: str, limit: int = 8) -> list:
-    """
-    Retourne une liste de candidats FBref (nom + url) via la recherche globale FBref.
-    """
-    try:
-        q = requests.utils.quote(player_name)
-        url = f"https://fbref.com/en/search/search.fcgi?search={q}"
-        resp = requests.get(url, headers=HEADERS, timeout=12)
-        if resp.status_code != 200:
-            return []
-
-        html = _fbref_uncomment_tables(resp.text)
-        soup = BeautifulSoup(html, "html.parser")
-
-        results = []
-        # Sur FBref, les résultats pertinents sont souvent dans item "Players"
-        for a in soup.select('div.search-item-name a[href^="/en/players/"]'):
-            name = a.get_text(strip=True)
-            href = a.get("href")
-            if not href:
-                continue
-            results.append({
-                "name": name,
-                "url": "https://fbref.com" + href
-            })
-            if len(results) >= limit:
-                break
-
-        # fallback si structure HTML différente
-        if not results:
-            for a in soup.select('a[href^="/en/players/"]'):
-                name = a.get_text(strip=True)
-                href = a.get("href")
-                if name and href:
-                    results.append({"name": name, "url": "https://fbref.com" + href})
-                if len(results) >= limit:
-                    break
-
-        return results
-    except Exception as e:
-        print(f"-> Erreur recherche FBref pour {player_name}: {e}")
-        return []
-
-def scrape_fbref_stats(player_name: str, season: str = "2024-2025", tm_club: str = None) -> dict:
-    """
-    Version robuste qui recherche le joueur via la recherche globale FBref.
-    1) Recherche le joueur sur FBref
-    2) Ouvre la page joueur
-    3) Prend les stats "Standard" de la saison demandée, sinon la ligne la plus récente (max minutes)
-    
-    Args:
-        player_name: Nom du joueur à rechercher
-        season: Saison à rechercher (format "2024-2025")
-        tm_club: Club du joueur depuis Transfermarkt (pour mieux matcher en cas d'ambiguïté)
-    
-    Returns:
-        dict: Dictionnaire avec les stats (goals, assists, appearances, minutes_played, position_fbref)
-    """
-    target = _normalize_name_basic(player_name)
-    candidates = fbref_search_player_urls(player_name)
-
-    if not candidates:
-        print(f"-> FBref: aucun résultat de recherche pour {player_name}")
-        return {}
-
-    # Scoring simple (nom proche + bonus si club TM trouvé dans la page)
-    def score_candidate(c):
-        cand_norm = _normalize_name_basic(c["name"])
-        base = 1.0 if cand_norm == target else 0.0
-        # similarité grossière
-        import difflib
-        base = max(base, difflib.SequenceMatcher(None, target, cand_norm).ratio())
-        return base
-
-    candidates = sorted(candidates, key=score_candidate, reverse=True)[:5]
-
-    best = {}
-    best_minutes = -1
-
-    for c in candidates:
-        try:
-            r = requests.get(c["url"], headers=HEADERS, timeout=12)
-            if r.status_code != 200:
-                continue
-            html = _fbref_uncomment_tables(r.text)
-            soup = BeautifulSoup(html, "html.parser")
-
-            # Bonus: si tm_club fourni, on essaie de vérifier que le club apparaît quelque part
-            club_bonus = 0.0
-            if tm_club:
-                page_text = soup.get_text(" ", strip=True).lower()
-                if tm_club.lower() in page_text:
-                    club_bonus = 0.15
-
-            # Table standard par saison/compétition (id fréquent sur pages joueurs)
-            table = soup.select_one("table#stats_standard_dom_lg") or soup.select_one("table#stats_standard")
-            if not table:
-                continue
-
-            rows = table.select("tbody tr")
-            # On cherche la meilleure ligne:
-            # - si saison == season, on la privilégie
-            # - sinon on prend max minutes
-            for row in rows:
-                # ignore separators
-                if "class" in row.attrs and "thead" in str(row.get("class", [])):
-                    continue
-
-                season_cell = row.select_one('th[data-stat="season"]')
-                season_txt = season_cell.get_text(strip=True) if season_cell else ""
-
-                mins_cell = row.select_one('td[data-stat="minutes"]')
-                goals_cell = row.select_one('td[data-stat="goals"]')
-                ast_cell = row.select_one('td[data-stat="assists"]')
-                games_cell = row.select_one('td[data-stat="games"]')
-
-                # position (souvent "position" ou "pos")
-                pos_cell = row.select_one('td[data-stat="position"], td[data-stat="pos"]')
-
-                def to_int(x):
-                    if not x:
-                        return 0
-                    t = x.get_text(strip=True).replace(",", "")
-                    return int(t) if t.isdigit() else 0
-
-                minutes = to_int(mins_cell)
-                goals = to_int(goals_cell)
-                assists = to_int(ast_cell)
-                games = to_int(games_cell)
-
-                # Sélection
-                is_target_season = (season_txt == season)
-                candidate_minutes_key = minutes + int(1000 * club_bonus)  # bonus si club match
-
-                if is_target_season and candidate_minutes_key > best_minutes:
-                    best_minutes = candidate_minutes_key
-                    best = {
-                        "goals": goals,
-                        "assists": assists,
-                        "appearances": games,
-                        "minutes_played": minutes,
-                    }
-                    if pos_cell:
-                        pos = pos_cell.get_text(strip=True)
-                        if pos and pos.lower() != 'nan':
-                            best["position_fbref"] = pos.strip()
-
-                # fallback: si on ne trouve pas la saison, max minutes
-                if not is_target_season and candidate_minutes_key > best_minutes and not best:
-                    best_minutes = candidate_minutes_key
-                    best = {
-                        "goals": goals,
-                        "assists": assists,
-                        "appearances": games,
-                        "minutes_played": minutes,
-                    }
-                    if pos_cell:
-                        pos = pos_cell.get_text(strip=True)
-                        if pos and pos.lower() != 'nan':
-                            best["position_fbref"] = pos.strip()
-
-            if best:
-                print(f"-> FBref OK ({c['name']}): {best.get('goals',0)}G {best.get('assists',0)}A {best.get('appearances',0)}MJ")
-                return best
-
-        except Exception as e:
-            print(f"-> Erreur lors du scraping FBref pour {c.get('name', 'unknown')}: {e}")
-            continue
-
-    print(f"-> Aucune stat FBref trouvée pour {player_name}")
-    return {}
-
 # ========== FBREF SCRAPING (Stats saison courante) ==========
 FBREF_BASE = "https://fbref.com"
 FBREF_SEARCH = "https://fbref.com/en/search/search.fcgi?search={q}"
@@ -636,7 +416,7 @@ def _fbref_uncomment(html: str) -> str:
 def fbref_search_candidates(player_name: str, limit: int = 8) -> list[dict]:
     q = quote(player_name.strip())
     url = FBREF_SEARCH.format(q=q)
-    r = requests.get(url, headers=HEADERS, timeout=12)
+    r = http_client.get(url, source="fbref", headers=HEADERS, timeout=12)
     if r.status_code != 200:
         return []
     soup = BeautifulSoup(_fbref_uncomment(r.text), "html.parser")
@@ -663,44 +443,25 @@ def fbref_search_candidates(player_name: str, limit: int = 8) -> list[dict]:
     return out
 
 def fbref_scrape_standard(player_url: str, season: str | None = None, club_hint: str | None = None) -> dict | None:
-    r = requests.get(player_url, headers=HEADERS, timeout=12)
+    r = http_client.get(player_url, source="fbref", headers=HEADERS, timeout=12)
     if r.status_code != 200:
         return None
-    soup = BeautifulSoup(_fbref_uncomment(r.text), "html.parser")
 
-    table = soup.select_one("table#stats_standard_dom_lg") or soup.select_one("table#stats_standard")
-    if not table:
+    # Seule la table stats_standard est parsée (même si elle est dans un commentaire)
+    rows = extract_standard_rows(r.text)
+    if not rows:
         return None
 
-    rows = table.select("tbody tr")
     best = None
     best_score = -1
 
     for row in rows:
-        # skip separators
-        if "class" in row.attrs and "thead" in row.get("class", []):
-            continue
-
-        season_txt = row.select_one('th[data-stat="season"]')
-        season_txt = season_txt.get_text(strip=True) if season_txt else ""
-
-        mp = row.select_one('td[data-stat="games"]') or row.select_one('td[data-stat="mp"]')
-        gls = row.select_one('td[data-stat="goals"]') or row.select_one('td[data-stat="gls"]')
-        ast = row.select_one('td[data-stat="assists"]') or row.select_one('td[data-stat="ast"]')
-        mins = row.select_one('td[data-stat="minutes"]') or row.select_one('td[data-stat="min"]')
-        squad = row.select_one('td[data-stat="squad"]')
-
-        def to_int(cell):
-            if not cell:
-                return 0
-            t = cell.get_text(strip=True).replace(",", "")
-            return int(t) if t.isdigit() else 0
-
-        mp_i = to_int(mp)
-        gls_i = to_int(gls)
-        ast_i = to_int(ast)
-        mins_i = to_int(mins)
-        squad_txt = squad.get_text(" ", strip=True) if squad else ""
+        season_txt = row.get("season", "")
+        mp_i = stat_int(row, "games", "mp")
+        gls_i = stat_int(row, "goals", "gls")
+        ast_i = stat_int(row, "assists", "ast")
+        mins_i = stat_int(row, "minutes", "min")
+        squad_txt = row.get("squad", "")
 
         # score: priorité saison demandée, sinon minutes
         score = mins_i
@@ -720,6 +481,9 @@ def fbref_scrape_standard(player_url: str, season: str | None = None, club_hint:
                 "minutes_played": mins_i,
             }
 
+    if best:
+        # Toutes les saisons/compétitions déjà téléchargées, pour la table player_season_stats
+        best["season_rows"] = season_stats_from_rows(rows, source_url=player_url)
     return best
 
 def fbref_stats_for_player(player_name: str, season: str | None = None, club_hint: str | None = None) -> dict | None:
@@ -727,15 +491,13 @@ def fbref_stats_for_player(player_name: str, season: str | None = None, club_hin
     if not cands:
         return None
 
-    # on teste les 3 meilleurs candidats
+    # on teste les 3 meilleurs candidats (espacement géré par la limite de débit de fbref.com)
     for c in cands[:3]:
-        time.sleep(0.6)
         stats = fbref_scrape_standard(c["url"], season=season, club_hint=club_hint)
         if stats and (stats.get("appearances", 0) > 0 or stats.get("minutes_played", 0) > 0):
             return stats
 
     # fallback: retourne le meilleur même si MP=0
-    time.sleep(0.6)
     return fbref_scrape_standard(cands[0]["url"], season=season, club_hint=club_hint)
 
 # ========== WIKIDATA SCRAPING (Source stable pour données de base) ==========
@@ -787,7 +549,7 @@ def wikidata_search_qid(player_name: str, lang: str = "en") -> str | None:
         "limit": 5,
         "type": "item"
     }
-    r = requests.get(WIKIDATA_API, params=params, headers=HEADERS, timeout=10)
+    r = http_client.get(WIKIDATA_API, source="wikidata", params=params, headers=HEADERS, timeout=10)
     if r.status_code != 200:
         return None
     data = r.json()
@@ -798,7 +560,7 @@ def wikidata_search_qid(player_name: str, lang: str = "en") -> str | None:
 
 def wikidata_get_entity(qid: str) -> dict | None:
     url = WIKIDATA_ENTITY.format(qid=qid)
-    r = requests.get(url, headers=HEADERS, timeout=12)
+    r = http_client.get(url, source="wikidata", headers=HEADERS, timeout=12)
     if r.status_code != 200:
         return None
     return r.json()
@@ -811,10 +573,7 @@ def _wd_get_label(entity: dict, qid: str, lang="en") -> str | None:
         return None
 
 def _wd_resolve_label(qid: str, lang="en") -> str | None:
-    ent = wikidata_get_entity(qid)
-    if not ent:
-        return None
-    return _wd_get_label(ent, qid, lang=lang)
+    return wikidata_get_labels([qid], lang).get(qid)
 
 def _wd_claims(entity: dict, qid: str, pid: str) -> list:
     try:
@@ -899,6 +658,122 @@ def _wd_best_current_club_qid(entity: dict, qid: str) -> str | None:
     # fallback
     return best or get_qid(claims[0])
 
+def _wd_qualifier_date_iso(claim: dict, pid: str) -> str | None:
+    """Date d'un qualificatif (P580/P582) en ISO partiel selon la précision : AAAA-MM-JJ, AAAA-MM ou AAAA."""
+    q = claim.get("qualifiers", {}).get(pid, [])
+    if not q:
+        return None
+    t = q[0].get("datavalue", {}).get("value", {}).get("time")
+    if not t or t.startswith("-"):
+        return None
+    parts = t.lstrip("+").split("T")[0].split("-")
+    while parts and parts[-1] == "00":
+        parts.pop()
+    return "-".join(parts) or None
+
+def _season_from_iso(iso_date: str | None) -> str | None:
+    """Saison au format Transfermarkt ("23/24") pour une date de transfert."""
+    if not iso_date or len(iso_date) < 7:
+        return None
+    year, month = int(iso_date[:4]), int(iso_date[5:7])
+    start = year if month >= 7 else year - 1
+    return f"{start % 100:02d}/{(start + 1) % 100:02d}"
+
+# Libellés Wikidata (pays, postes, clubs) : très partagés entre joueurs et quasi immuables
+WIKIDATA_LABEL_TTL = 7 * 24 * 3600
+_wd_label_cache = TTLCache(max_entries=8192, name="wikidata_labels")
+
+def wikidata_get_labels(qids: list, lang: str = "en") -> dict:
+    """Résout les libellés de plusieurs entités en un seul appel wbgetentities (50 ids par appel)."""
+    labels = {}
+    missing = []
+    for q in dict.fromkeys(q for q in qids if q):
+        cached = _wd_label_cache.get(f"{lang}:{q}")
+        if cached:
+            labels[q] = cached
+        else:
+            missing.append(q)
+    qids = missing
+    for i in range(0, len(qids), 50):
+        params = {
+            "action": "wbgetentities",
+            "format": "json",
+            "ids": "|".join(qids[i:i + 50]),
+            "props": "labels",
+            "languages": f"{lang}|fr",
+        }
+        r = http_client.get(WIKIDATA_API, source="wikidata", params=params, headers=HEADERS, timeout=12)
+        if r.status_code != 200:
+            continue
+        for ent_qid, ent in r.json().get("entities", {}).items():
+            ent_labels = ent.get("labels", {})
+            label = ent_labels.get(lang, {}).get("value") or ent_labels.get("fr", {}).get("value")
+            if label:
+                labels[ent_qid] = label
+                _wd_label_cache.set(f"{lang}:{ent_qid}", label, WIKIDATA_LABEL_TTL)
+    return labels
+
+def wikidata_transfers(entity: dict, qid: str) -> list:
+    """
+    Reconstitue les transferts depuis les affiliations P54 (member of sports team)
+    ordonnées par date de début (P580) : chaque changement de club devient un transfert.
+    Les sélections nationales sont ignorées.
+    """
+    spells = []
+    for c in _wd_claims(entity, qid, "P54"):
+        dv = c.get("mainsnak", {}).get("datavalue", {}).get("value")
+        start = _wd_qualifier_date_iso(c, "P580")
+        if isinstance(dv, dict) and dv.get("id") and start:
+            spells.append((start, dv["id"]))
+    if not spells:
+        return []
+
+    labels = wikidata_get_labels([club_qid for _, club_qid in spells])
+    spells = sorted(
+        (start, labels[club_qid]) for start, club_qid in spells
+        if labels.get(club_qid) and "national" not in labels[club_qid].lower()
+    )
+
+    transfers = []
+    previous_club = None
+    for start, club in spells:
+        if previous_club and previous_club != club:
+            transfers.append({
+                "from_club": previous_club,
+                "to_club": club,
+                "transfer_date": start,
+                "season": _season_from_iso(start),
+            })
+        previous_club = club
+    return transfers
+
+def _same_club(a: str | None, b: str | None) -> bool:
+    """Compare deux noms de club issus de sources différentes ("Bor. Dortmund" / "Borussia Dortmund")."""
+    import difflib
+    na, nb = _normalize_name_basic(a or ""), _normalize_name_basic(b or "")
+    if not na or not nb:
+        return not na and not nb
+    return na == nb or na in nb or nb in na or difflib.SequenceMatcher(None, na, nb).ratio() >= 0.75
+
+def merge_transfers(*sources: list) -> list:
+    """
+    Fusionne les transferts de plusieurs sources (la première est prioritaire)
+    en supprimant les doublons : même année et clubs équivalents.
+    """
+    merged = []
+    for transfers in sources:
+        for t in transfers or []:
+            year = (t.get("transfer_date") or "")[:4]
+            duplicate = any(
+                (m.get("transfer_date") or "")[:4] == year
+                and _same_club(m.get("to_club"), t.get("to_club"))
+                and _same_club(m.get("from_club"), t.get("from_club"))
+                for m in merged
+            )
+            if not duplicate:
+                merged.append(t)
+    return merged
+
 def wikidata_profile(player_name: str) -> dict | None:
     qid = wikidata_search_qid(player_name, lang="en")
     if not qid:
@@ -915,17 +790,17 @@ def wikidata_profile(player_name: str) -> dict | None:
     if dob:
         out["age"] = _age_from_dob(dob)
 
-    # nationality (P27)
+    # nationalité (P27), poste (P413), club actuel (P54) : libellés résolus en un seul appel
     nat_qid = _wd_first_qid(entity, qid, "P27")
+    pos_qid = _wd_first_qid(entity, qid, "P413")
+    club_qid = _wd_best_current_club_qid(entity, qid)
+    labels = wikidata_get_labels([nat_qid, pos_qid, club_qid], "en")
+
     if nat_qid:
-        out["nationality"] = _wd_resolve_label(nat_qid, "en")
+        out["nationality"] = labels.get(nat_qid)
 
-    # position (P413)
-    pos_qid = _wd_first_qid(entity, qid, "P413")
-    if pos_qid:
-        pos_label = _wd_resolve_label(pos_qid, "en")
-        if pos_label:
-            out["position"] = _pos_normalize(pos_label)
+    if labels.get(pos_qid):
+        out["position"] = _pos_normalize(labels[pos_qid])
 
     # height (P2048) - ✅ Fix: gestion cm -> m
     amount, unit = _wd_quantity(entity, qid, "P2048")
@@ -938,9 +813,8 @@ def wikidata_profile(player_name: str) -> dict | None:
             out["height"] = f"{amount:.2f} m"
 
     # current club (P54) - ✅ Fix: prend le bon club (sans date de fin ou le plus récent)
-    club_qid = _wd_best_current_club_qid(entity, qid)
     if club_qid:
-        out["current_club"] = _wd_resolve_label(club_qid, "en")
+        out["current_club"] = labels.get(club_qid)
 
     # image (P18)
     p18 = _wd_claims(entity, qid, "P18")
@@ -949,6 +823,9 @@ def wikidata_profile(player_name: str) -> dict | None:
         if isinstance(dv, str) and dv.strip():
             out["image_url"] = f"https://commons.wikimedia.org/wiki/Special:FilePath/{quote(dv)}"
 
+    # transferts (P54 + qualificatifs début/fin)
+    out["wikidata_transfers"] = wikidata_transfers(entity, qid)
+
     # nettoyage
     out = {k: _clean_text(v) if isinstance(v, str) else v for k, v in out.items()}
     return out
@@ -992,7 +869,7 @@ def scrape_wikipedia_image(player_name):
     for variant in name_variants:
         try:
             api_url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{variant.replace(' ', '_')}"
-            resp = requests.get(api_url, headers=HEADERS, timeout=5)
+            resp = http_client.get(api_url, source="wikipedia", headers=HEADERS, timeout=5)
             if resp.status_code == 200:
                 json_data = resp.json()
                 if json_data.get('thumbnail'):
@@ -1000,176 +877,169 @@ def scrape_wikipedia_image(player_name):
                     # Agrandit l'image si possible (change 200px en 400px ou plus)
                     if '200px' in image_url:
                         image_url = image_url.replace('200px', '400px')
-                    print(f"-> Image trouvée pour {player_name}: {image_url}")
+                    logger.debug("Image Wikipedia trouvée", extra={"player": player_name, "image_url": image_url})
                     return image_url
         except requests.exceptions.RequestException:
             continue
         except Exception as e:
-            print(f"-> Erreur lors de la recherche d'image pour {variant}: {e}")
+            logger.warning("Erreur lors de la recherche d'image: %s", e, extra={"variant": variant})
             continue
     
-    # Si Wikipedia échoue, essaie avec l'image de Transfermarkt
-    try:
-        # Note: Transfermarkt protège ses images, mais on peut essayer
-        print(f"-> Aucune image trouvée sur Wikipedia pour {player_name}")
-    except:
-        pass
+    # Note: Transfermarkt protège ses images, pas de repli de ce côté
+    logger.info("Aucune image trouvée sur Wikipedia", extra={"player": player_name})
     
     return None
 
-def save_player_to_db(player_data):
-    """Insère ou met à jour les données d'un joueur avec gestion d'erreurs améliorée."""
-    
-    # Utilise le module centralisé si disponible
-    if USE_CENTRALIZED_DB:
-        return db_save_player_to_db(player_data)
+# ========== SOURCES DU PIPELINE ==========
+# Chaque source déclare ce qu'elle lit et écrit dans le contexte, sa durée de cache
+# et l'espacement minimal entre deux requêtes vers ses hôtes. Le moteur exécute en
+# parallèle les sources indépendantes (FBref, Transfermarkt, Wikipedia après Wikidata).
+# Une source sans résultat pour un nom n'est plus interrogée pour ce nom pendant
+# negative_ttl secondes, durée doublée à chaque nouvelle absence (7 jours au plus).
 
-    # Fallback local
-    if not player_data or not player_data.get('name'):
-        print("-> Données invalides pour la sauvegarde")
-        return None
-    
-    try:
-        # Initialise la DB locale
-        init_db_local()
-
-        # S'assure que le répertoire existe
-        os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-        cur = conn.cursor()
-
-        # Vérifie les colonnes existantes
-        cur.execute("PRAGMA table_info(players)")
-        table_columns = {row[1] for row in cur.fetchall()}
-    
-        # Filtrage des données valides
-        valid_data = {k: v for k, v in player_data.items() if k in table_columns and v is not None}
+WIKIDATA_OUTPUTS = ("name", "wikidata_qid", "age", "nationality", "position", "height",
+                    "current_club", "image_url", "wikidata_transfers")
+FBREF_OUTPUTS = ("appearances", "goals", "assists", "minutes_played", "fbref_url",
+                 "fbref_season", "season_rows")
 
-        if not valid_data:
-            print("-> Aucune donnée valide à sauvegarder")
-            conn.close()
-            return None
-
-        columns = list(valid_data.keys())
-        placeholders = ', '.join('?' * len(columns))
-        columns_str = ', '.join(columns)
-
-        sql = f"INSERT OR REPLACE INTO players ({columns_str}) VALUES ({placeholders})"
-    
-        values = [valid_data[col] if valid_data[col] is not None else '' for col in columns]
+def _fetch_llm_name(ctx: dict) -> dict:
+    return {"name": normalize_player_name_with_openai(ctx["query"])}
 
-        cur.execute(sql, values)
-        conn.commit()
+def _fetch_wikidata(ctx: dict) -> dict | None:
+    return wikidata_profile(ctx["name"])
 
-        # Récupération
-        player_name = valid_data.get('name')
-        cur.execute("SELECT * FROM players WHERE name = ?", (player_name,))
-        row = cur.fetchone()
+def _fetch_fbref(ctx: dict) -> dict | None:
+    return fbref_stats_for_player(ctx["name"], season=current_fb_season(), club_hint=ctx.get("current_club"))
 
-        # ✅ Fix: calculer les colonnes AVANT de fermer la connexion
-        columns = [d[0] for d in cur.description] if cur.description else []
-        conn.close()
-
-        if row:
-            return dict(zip(columns, row))
-
-        return None
-
-    except Exception as e:
-        print(f"Erreur DB lors de la sauvegarde: {e}")
-        import traceback
-        print(traceback.format_exc())
-        if 'conn' in locals():
-            conn.close()
+def _fetch_transfermarkt(ctx: dict) -> dict | None:
+    tm_url = get_player_page_url(ctx["name"], "transfermarkt", normalize=False)
+    if not tm_url:
         return None
+    tm_data = scrape_transfermarkt(tm_url) or {}
+    # ne prend QUE market_value (ne peut jamais écraser age/position de Wikidata)
+    return {
+        "market_value": tm_data.get("market_value"),
+        "source_transfermarkt": tm_url,
+        "tm_transfers": tm_data.get("transfers") or None,
+    }
 
+def _fetch_wikipedia_image(ctx: dict) -> dict:
+    return {"image_url": scrape_wikipedia_image(ctx["name"])}
+
+SOURCES = [
+    SourceAdapter("llm_name", _fetch_llm_name, inputs=("query",), outputs=("name",),
+                  ttl=30 * 24 * 3600, hosts=("api.openai.com",)),
+    SourceAdapter("wikidata", _fetch_wikidata, outputs=WIKIDATA_OUTPUTS, after=("llm_name",),
+                  ttl=24 * 3600, negative_ttl=3600, hosts=("www.wikidata.org",), min_interval=0.1),
+    SourceAdapter("fbref", _fetch_fbref, outputs=FBREF_OUTPUTS,
+                  after=("wikidata",), ttl=6 * 3600, negative_ttl=3600, hosts=("fbref.com",), min_interval=0.6),
+    SourceAdapter("transfermarkt", _fetch_transfermarkt,
+                  outputs=("market_value", "source_transfermarkt", "tm_transfers"), after=("wikidata",),
+                  ttl=12 * 3600, negative_ttl=3600, hosts=("www.transfermarkt.com",), min_interval=1.0),
+    SourceAdapter("wikipedia", _fetch_wikipedia_image, outputs=("image_url",), after=("wikidata",),
+                  ttl=7 * 24 * 3600, negative_ttl=6 * 3600, hosts=("en.wikipedia.org",),
+                  skip_if=lambda ctx: bool(ctx.get("image_url"))),
+]
+
+ENGINE = ScrapeEngine(SOURCES)
+
+# Durée maximale de détention du verrou de scraping d'un joueur (s)
+SCRAPE_LOCK_TTL = 120
 
 def scrape_and_save_player_data(player_name: str):
     """
-    Pipeline robuste: Wikidata -> FBref -> Transfermarkt (optionnel)
+    Pipeline robuste: nom (OpenAI) -> Wikidata -> FBref / Transfermarkt / Wikipedia en parallèle.
+    Un seul scraping à la fois par joueur, tous workers confondus : les requêtes simultanées
+    attendent, puis repartent des caches de sources que le premier scraping vient de remplir.
     """
-    print(f"--- Lancement du scraping pour : {player_name} ---")
-
-    try:
-        # 1) Normalisation nom (OpenAI)
-        normalized_name = normalize_player_name_with_openai(player_name)
-        print(f"-> Nom normalisé: '{player_name}' -> '{normalized_name}'")
+    lock_name = "scrape:" + " ".join(player_name.lower().split())
+    with shared_state.lock(lock_name, ttl=SCRAPE_LOCK_TTL, timeout=SCRAPE_LOCK_TTL):
+        # Joueur, historique, alias : une seule notification d'écriture à la fin du pipeline
+        with coalesce_player_writes():
+            return _run_pipeline(player_name)
 
-        all_data = {"name": normalized_name}
+def _run_pipeline(player_name: str):
+    with tracing.span("scrape.pipeline", **{"player.query": player_name}) as pipeline_span:
+        logger.info("Lancement du scraping", extra={"query": player_name})
 
-        # 2) WIKIDATA d'abord (âge / poste / taille / club / image / nationalité)
         try:
-            wd = wikidata_profile(normalized_name)
-            if wd:
-                all_data = merge_keep_existing(all_data, wd)
-                print(f"-> Wikidata OK: age={all_data.get('age')} pos={all_data.get('position')} height={all_data.get('height')}")
-            else:
-                print("-> Wikidata: aucun résultat")
-        except Exception as e:
-            print(f"-> Erreur scraping Wikidata: {e}")
-
-        # 3) FBREF ensuite (stats saison courante + hint club)
-        try:
-            season = current_fb_season()
-            club_hint = all_data.get("current_club")
-            fb = fbref_stats_for_player(all_data.get("name", normalized_name), season=season, club_hint=club_hint)
-            if fb:
-                all_data = merge_keep_existing(all_data, fb)
-                print(f"-> FBref OK: {all_data.get('appearances')} MP, {all_data.get('goals')} G, {all_data.get('assists')} A")
-            else:
-                print("-> FBref: aucun résultat")
-        except Exception as e:
-            print(f"-> Erreur scraping FBref: {e}")
-
-        # 4) Transfermarkt OPTIONNEL : uniquement market_value (et jamais age/position)
-        try:
-            tm_url = get_player_page_url(all_data.get("name", normalized_name), "transfermarkt")
-            if tm_url:
-                tm_data = scrape_transfermarkt(tm_url) or {}
-                # ne prends QUE market_value (ne peut jamais écraser age/position de Wikidata)
-                all_data = merge_keep_existing(all_data, {
-                    "market_value": tm_data.get("market_value"),
-                    "source_transfermarkt": tm_url
-                })
-        except Exception as e:
-            print(f"-> TM market_value fail: {e}")
-
-        # 5) Valeurs par défaut propres (évite null/None en front)
-        for k in ("goals", "assists", "appearances", "minutes_played"):
-            if all_data.get(k) is None:
-                all_data[k] = 0
-
-        # 6) Image fallback Wikipedia si Wikidata n'a pas fourni
-        if not all_data.get("image_url"):
+            all_data, report = ENGINE.run({"query": player_name})
+            for stage in report:
+                logger.info(
+                    "Étape %s: %s", stage.name, stage.status,
+                    extra={"stage": stage.name, "status": stage.status,
+                           "duration_ms": round(stage.seconds * 1000, 1), "error": stage.error},
+                )
+
+            # Aucune source n'a trouvé le joueur (absences éventuellement déjà mémorisées) : rien
+            # à enregistrer. Une source en erreur laisse le doute, le joueur est alors enregistré.
+            if all(stage.status in ("empty", "negative", "skipped") for stage in report if stage.name != "llm_name"):
+                pipeline_span.set_attribute("player.resolved", False)
+                logger.info("Joueur introuvable", extra={"query": player_name, "name": all_data.get("name")})
+                return None
+
+            all_data.setdefault("name", player_name)
+            all_data.pop("query", None)
+            wd_transfers = all_data.pop("wikidata_transfers", None) or []
+            tm_transfers = all_data.pop("tm_transfers", None) or []
+            season_rows = all_data.pop("season_rows", None) or []
+            tm_market_value = all_data.get("market_value") if all_data.get("source_transfermarkt") else None
+            pipeline_span.set_attribute("player.name", all_data.get("name"))
+
+            # Nationalité au format du globe, normalisée une fois à l'écriture : table locale,
+            # sinon OpenAI. Le drapeau évite toute normalisation ultérieure à la lecture.
+            all_data.update(normalize_nationality_fields(all_data.get("nationality")))
+
+            # Valeurs par défaut propres (évite null/None en front)
+            for k in ("goals", "assists", "appearances", "minutes_played"):
+                if all_data.get(k) is None:
+                    all_data[k] = 0
+
+            # Sauvegarde DB
             try:
-                img = scrape_wikipedia_image(all_data.get("name", normalized_name))
-                if img:
-                    all_data["image_url"] = img
+                with tracing.span("scrape.save", **{"player.name": all_data.get("name")}) as save_span:
+                    saved = save_player_to_db(all_data)
+                    if saved:
+                        # Historique : un point seulement si la valeur Transfermarkt a changé
+                        if tm_market_value:
+                            record_market_value(saved.get('id'), tm_market_value)
+                        # Transferts : insertion incrémentale (Transfermarkt prioritaire sur Wikidata)
+                        transfers = merge_transfers(tm_transfers, wd_transfers)
+                        added = save_transfers(saved.get('id'), saved.get('name'), transfers) if transfers else 0
+                        # Stats FBref saison par saison : une seule insertion groupée par page
+                        if season_rows:
+                            save_season_stats(saved.get('id'), season_rows)
+                        # La saisie d'origine devient un alias (autocomplétion des recherches suivantes)
+                        save_player_alias(saved.get('id'), player_name)
+                        save_span.set_attributes({
+                            "player.id": saved.get('id'),
+                            "transfers.found": len(transfers),
+                            "transfers.written": added,
+                            "season_rows": len(season_rows),
+                        })
+                if saved:
+                    logger.info("Données sauvegardées", extra={
+                        "player": saved.get('name'), "player_id": saved.get('id'),
+                        "transfers_found": len(transfers), "transfers_written": added,
+                    })
+                    return saved
             except Exception as e:
-                print(f"-> Erreur image: {e}")
-
-        # 7) Sauvegarde DB
-        try:
-            saved = save_player_to_db(all_data)
-            if saved:
-                print(f"-> Données sauvegardées pour {saved.get('name')}")
-                return saved
-        except Exception as e:
-            print(f"-> Erreur sauvegarde DB: {e}")
+                logger.error("Erreur sauvegarde DB: %s", e, extra={"player": all_data.get("name")})
 
-        return all_data
+            return all_data
 
-    except Exception as e:
-        import traceback
-        print("-> ERREUR CRITIQUE:", e)
-        print(traceback.format_exc())
-        return None
+        except Exception as e:
+            logger.exception("Erreur critique du pipeline: %s", e, extra={"query": player_name})
+            return None
 
 
 if __name__ == "__main__":
     # Test du script
+    from dotenv import load_dotenv
+    load_dotenv()
+    tracing.configure()
     players_to_scrape = ["Jude Bellingham", "Lamine Yamal", "Fredy Guarín"]
     for name in players_to_scrape:
         scrape_and_save_player_data(name)
         time.sleep(2)
-    print("\n--- Scraping de test terminé. ---")
+    logger.info("Scraping de test terminé")
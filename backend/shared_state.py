@@ -0,0 +1,227 @@
+# Filename: backend/shared_state.py
+# Description: État partagé entre workers uvicorn/gunicorn : cache clé/valeur avec TTL, verrous nommés et créneaux de limite de débit.
+#
+# Variables d'environnement :
+#   SHARED_STATE=memory|sqlite   (défaut : sqlite si WEB_CONCURRENCY > 1, sinon memory)
+#   SHARED_STATE_PATH=chemin du fichier SQLite partagé (défaut : <data>/shared_state.db)
+#
+# En mode memory, caches, verrous et limites de débit restent propres au processus (aucun coût
+# supplémentaire). En mode sqlite, un fichier SQLite en WAL, distinct de players.db pour ne pas
+# concurrencer les écritures métier et pouvoir être supprimé sans perte, est partagé par tous les
+# workers de la machine : le cache mémoire de chaque worker reste le premier niveau, le fichier
+# sert de second niveau commun. Les horloges utilisées sont murales (time.time) car partagées
+# entre processus.
+
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Optional, Tuple
+
+import metrics
+from database import BASE_DIR
+
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1") or 1)
+SHARED_STATE = os.getenv("SHARED_STATE", "sqlite" if WEB_CONCURRENCY > 1 else "memory").lower()
+SHARED_STATE_PATH = os.getenv("SHARED_STATE_PATH", os.path.join(BASE_DIR, "shared_state.db"))
+
+# Une purge des entrées expirées toutes les ~PURGE_EVERY écritures
+PURGE_EVERY = 256
+
+SHARED_STATE_SECONDS = metrics.histogram(
+    "xscout_shared_state_duration_seconds", "Durée des opérations sur l'état partagé entre workers", ("operation",))
+
+class SQLiteState:
+    """
+    Stockage partagé entre processus. Une connexion par thread (et par processus : les
+    connexions héritées d'un fork sont ignorées), en autocommit ; les opérations qui
+    lisent puis écrivent prennent un verrou d'écriture (BEGIN IMMEDIATE).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+            if not self._schema_ready:
+                with self._schema_lock:
+                    self._create_schema(conn)
+                    self._schema_ready = True
+        return conn
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection):
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS kv (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS locks (
+                name TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS rate_slots (
+                host TEXT PRIMARY KEY,
+                next_at REAL NOT NULL
+            ) WITHOUT ROWID;
+        """)
+
+    @contextmanager
+    def _timed(self, operation: str):
+        start = time.perf_counter()
+        try:
+            yield self._conn()
+        finally:
+            SHARED_STATE_SECONDS.observe(time.perf_counter() - start, operation=operation)
+
+    # --- Cache clé/valeur (valeurs sérialisées en JSON) ---
+
+    def get(self, namespace: str, key: str) -> Optional[Tuple[Any, float]]:
+        """Retourne (valeur, TTL restant en secondes) ou None si absente ou expirée."""
+        now = time.time()
+        with self._timed("get") as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM kv WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (namespace, key, now),
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1] - now
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float):
+        now = time.time()
+        with self._timed("set") as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value, ensure_ascii=False), now + ttl),
+            )
+            if random.randrange(PURGE_EVERY) == 0:
+                conn.execute("DELETE FROM kv WHERE expires_at <= ?", (now,))
+
+    def delete(self, namespace: str, key: str):
+        with self._timed("delete") as conn:
+            conn.execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def clear(self, namespace: str):
+        with self._timed("clear") as conn:
+            conn.execute("DELETE FROM kv WHERE namespace = ?", (namespace,))
+
+    # --- Verrous nommés avec expiration (un worker arrêté ne bloque pas les autres) ---
+
+    def try_acquire(self, name: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        with self._timed("lock") as conn:
+            cur = conn.execute(
+                """
+                INSERT INTO locks (name, owner, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE locks.expires_at <= ?
+                """,
+                (name, owner, now + ttl, now),
+            )
+            return cur.rowcount == 1
+
+    def release(self, name: str, owner: str):
+        with self._timed("unlock") as conn:
+            conn.execute("DELETE FROM locks WHERE name = ? AND owner = ?", (name, owner))
+
+    # --- Limite de débit : réservation atomique du prochain créneau d'un hôte ---
+
+    def reserve(self, host: str, interval: float) -> float:
+        """Réserve le prochain créneau de l'hôte et retourne le délai d'attente (s)."""
+        now = time.time()
+        with self._timed("reserve") as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT next_at FROM rate_slots WHERE host = ?", (host,)).fetchone()
+                slot = max(now, row[0]) if row else now
+                conn.execute("INSERT OR REPLACE INTO rate_slots (host, next_at) VALUES (?, ?)", (host, slot + interval))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return slot - now
+
+_store: Optional[SQLiteState] = None
+_store_lock = threading.Lock()
+
+def configure(mode: Optional[str] = None, path: Optional[str] = None):
+    """Change le mode ou le fichier partagé (benchmarks, tests de charge)."""
+    global SHARED_STATE, SHARED_STATE_PATH, _store
+    with _store_lock:
+        if mode is not None:
+            SHARED_STATE = mode.lower()
+        if path is not None:
+            SHARED_STATE_PATH = path
+        _store = None
+
+def get_store() -> Optional[SQLiteState]:
+    """Stockage partagé entre workers, ou None en mode memory."""
+    global _store
+    if SHARED_STATE != "sqlite":
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SQLiteState(SHARED_STATE_PATH)
+    return _store
+
+# Verrous locaux du mode memory : {nom: [verrou, nombre d'utilisateurs]}
+_local_locks: dict = {}
+_local_locks_guard = threading.Lock()
+
+@contextmanager
+def lock(name: str, ttl: float = 120.0, timeout: float = 60.0):
+    """
+    Verrou nommé, partagé entre workers en mode sqlite (sinon entre threads du processus).
+    Rend True si le verrou a été obtenu, False après `timeout` secondes : l'appelant
+    continue alors sans exclusivité plutôt que d'échouer. `ttl` borne la durée de
+    détention en cas d'arrêt brutal du détenteur.
+    """
+    store = get_store()
+    if store is None:
+        with _local_locks_guard:
+            entry = _local_locks.setdefault(name, [threading.Lock(), 0])
+            entry[1] += 1
+        acquired = entry[0].acquire(timeout=timeout)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                entry[0].release()
+            with _local_locks_guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    _local_locks.pop(name, None)
+        return
+
+    owner = f"{os.getpid()}:{threading.get_ident()}:{uuid.uuid4().hex[:8]}"
+    deadline = time.monotonic() + timeout
+    delay = 0.02
+    acquired = store.try_acquire(name, owner, ttl)
+    while not acquired and time.monotonic() < deadline:
+        time.sleep(delay)
+        delay = min(delay * 2, 0.25)
+        acquired = store.try_acquire(name, owner, ttl)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            store.release(name, owner)
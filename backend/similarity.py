@@ -0,0 +1,349 @@
+# Filename: backend/similarity.py
+# Description: Recherche vectorisée de joueurs similaires (matrice NumPy des statistiques stockées).
+#
+# Chaque joueur est un vecteur : buts et passes décisives par 90 minutes, minutes jouées, âge,
+# taille (cm), valeur marchande (log10 €) et poste encodé en one-hot (gardien, défenseur,
+# milieu, attaquant). Les colonnes numériques sont standardisées (moyenne 0, écart-type 1),
+# les valeurs manquantes valent la moyenne. Une requête = un produit matrice-vecteur sur les
+# lignes filtrées puis une sélection partielle (argpartition) des k meilleurs.
+#
+# L'index est construit au premier appel puis mis à jour ligne par ligne à chaque écriture
+# sur la table players (écouteur de database.py). En multi-worker, les écritures d'un autre
+# worker sont prises en compte au plus tard après SIMILARITY_MAX_AGE secondes (reconstruction,
+# 600 s par défaut lorsque WEB_CONCURRENCY > 1).
+
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+import database
+
+logger = logging.getLogger(__name__)
+
+# Âge maximal de l'index (s) avant reconstruction ; 0 = jamais (un seul worker, mises à jour par écouteur)
+SIMILARITY_MAX_AGE = float(os.getenv("SIMILARITY_MAX_AGE", "600" if int(os.getenv("WEB_CONCURRENCY", "1") or 1) > 1 else "0"))
+
+NUMERIC_FEATURES = ("goals_per90", "assists_per90", "minutes_played", "age", "height_cm", "log_market_value")
+POSITION_GROUPS = database.POSITION_GROUPS
+FEATURES = NUMERIC_FEATURES + tuple(f"position_{g}" for g in POSITION_GROUPS)
+
+_HEIGHT_RE = re.compile(r"(\d+(?:[.,]\d+)?)\s*(cm|m)?", re.IGNORECASE)
+
+# Poids du poste face aux colonnes standardisées : deux postes différents sont distants
+# d'environ 2,8 écarts-types, ce qui garde les voisins majoritairement au même poste
+POSITION_WEIGHT = 2.0
+
+# Minutes minimales pour que les ratios par 90 minutes soient significatifs
+MIN_MINUTES_PER90 = database.PER90_MIN_MINUTES
+
+_SELECT_COLUMNS = "id, name, age, position, market_value_eur, height, goals, assists, minutes_played, nationality"
+
+position_group = database.position_group
+
+def parse_height_cm(height: Any) -> Optional[float]:
+    """'1.78 m', '1,78', '178 cm', 178 -> 178.0"""
+    if height is None:
+        return None
+    if isinstance(height, (int, float)):
+        value = float(height)
+    else:
+        m = _HEIGHT_RE.search(str(height))
+        if not m:
+            return None
+        value = float(m.group(1).replace(",", "."))
+    if value < 3:  # mètres
+        value *= 100
+    return value if 140 <= value <= 220 else None
+
+def _column(values) -> np.ndarray:
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+def features_matrix(rows: List[tuple]) -> np.ndarray:
+    """
+    Matrice brute (non standardisée) d'une liste de lignes `_SELECT_COLUMNS` ; NaN pour les
+    valeurs inconnues. Les libellés de poste et de taille, très répétés, sont analysés une
+    seule fois par valeur distincte.
+    """
+    if not rows:
+        return np.empty((0, len(FEATURES)))
+    _, _, age, position, value, height, goals, assists, minutes, _ = zip(*rows)
+    goals, assists, minutes = _column(goals), _column(assists), _column(minutes)
+    value = _column(value)
+    groups, heights = {}, {}
+    group_of = [groups.setdefault(p, position_group(p)) if p not in groups else groups[p] for p in position]
+    height_cm = [heights.setdefault(h, parse_height_cm(h)) if h not in heights else heights[h] for h in height]
+
+    raw = np.empty((len(rows), len(FEATURES)))
+    played = np.nan_to_num(minutes) >= MIN_MINUTES_PER90
+    with np.errstate(divide="ignore", invalid="ignore"):
+        raw[:, 0] = np.where(played, np.nan_to_num(goals) * 90 / minutes, np.nan)
+        raw[:, 1] = np.where(played, np.nan_to_num(assists) * 90 / minutes, np.nan)
+        raw[:, 5] = np.where(value > 0, np.log10(value), np.nan)
+    raw[:, 2] = minutes
+    raw[:, 3] = np.where(_column(age) > 0, _column(age), np.nan)
+    raw[:, 4] = _column(height_cm)
+    for j, group in enumerate(POSITION_GROUPS):
+        raw[:, len(NUMERIC_FEATURES) + j] = [g == group for g in group_of]
+    return raw
+
+class SimilarityIndex:
+    """
+    Matrice des joueurs (une ligne par joueur) avec capacité doublée à la demande.
+    La standardisation (moyenne / écart-type par colonne) est figée à la construction et
+    réajustée lorsque plus de 5 % des lignes ont changé : une mise à jour ne coûte donc
+    que la normalisation des lignes écrites.
+
+    Les vecteurs interrogés sont stockés transposés (une ligne par caractéristique) en float32,
+    et les colonnes filtrées (âge, valeur, nationalité, poste) dans des tableaux contigus :
+    chaque requête ne parcourt la mémoire que de façon séquentielle.
+    """
+
+    REFIT_RATIO = 0.05
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset(0)
+        self.built_at = 0.0
+
+    def _reset(self, capacity: int):
+        d = len(FEATURES)
+        self.size = 0
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.raw = np.full((capacity, d), np.nan)                  # caractéristiques brutes
+        self.z_t = np.zeros((d, capacity), dtype=np.float32)       # standardisées, transposées
+        self.unit_t = np.zeros((d, capacity), dtype=np.float32)    # idem, de norme 1 (cosinus)
+        self.sq_norms = np.zeros(capacity, dtype=np.float32)       # normes au carré (euclidienne)
+        self.ages = np.full(capacity, np.nan, dtype=np.float32)
+        self.values = np.full(capacity, np.nan)
+        self.groups = np.full(capacity, -1, dtype=np.int8)         # indice dans POSITION_GROUPS
+        self.nationalities = np.zeros(capacity, dtype=np.int32)
+        self.row_of: Dict[int, int] = {}
+        self.nationality_codes: Dict[str, int] = {}
+        self.mean = np.zeros(len(NUMERIC_FEATURES))
+        self.std = np.ones(len(NUMERIC_FEATURES))
+        self.weight = np.zeros(len(NUMERIC_FEATURES))                # 0 : colonne sans aucune valeur
+        self.changed_since_fit = 0
+
+    # --- Construction et mises à jour ---
+
+    def build(self):
+        """Charge tous les joueurs de la base et standardise la matrice."""
+        start = time.perf_counter()
+        # Lecture sous le verrou : une écriture notifiée pendant la construction attend la fin
+        # de celle-ci puis est appliquée par update_players, jamais écrasée par des lignes plus anciennes
+        with self._lock:
+            conn = database.get_db_connection()
+            try:
+                rows = conn.execute(f"SELECT {_SELECT_COLUMNS} FROM players").fetchall()
+            finally:
+                conn.close()
+            self._reset(max(1024, len(rows)))
+            self._write_rows(rows)
+            self._fit()
+            self.built_at = time.monotonic()
+        logger.info("Index de similarité construit", extra={
+            "players": len(rows), "duration_ms": round((time.perf_counter() - start) * 1000, 1)})
+
+    def _grow(self, needed: int):
+        capacity = max(1024, len(self.ids))
+        while capacity < needed:
+            capacity *= 2
+        for attr in ("ids", "raw", "sq_norms", "ages", "values", "groups", "nationalities"):
+            old = getattr(self, attr)
+            fill = np.nan if attr in ("raw", "ages", "values") else (-1 if attr == "groups" else 0)
+            new = np.full((capacity,) + old.shape[1:], fill, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, attr, new)
+        for attr in ("z_t", "unit_t"):
+            old = getattr(self, attr)
+            new = np.zeros((old.shape[0], capacity), dtype=old.dtype)
+            new[:, :old.shape[1]] = old
+            setattr(self, attr, new)
+
+    def _write_rows(self, rows: List[tuple]) -> np.ndarray:
+        """Écrit (ou remplace) les lignes des joueurs ; retourne leurs positions dans la matrice."""
+        positions = np.empty(len(rows), dtype=np.int64)
+        for j, row in enumerate(rows):
+            i = self.row_of.get(row[0])
+            if i is None:
+                i = self.row_of[row[0]] = self.size
+                self.size += 1
+            positions[j] = i
+        if self.size > len(self.ids):
+            self._grow(self.size)
+        codes = self.nationality_codes
+        raw = features_matrix(rows)
+        self.ids[positions] = [row[0] for row in rows]
+        self.raw[positions] = raw
+        self.ages[positions] = raw[:, 3]
+        self.values[positions] = _column(row[4] or None for row in rows)
+        one_hot = raw[:, len(NUMERIC_FEATURES):]
+        self.groups[positions] = np.where(one_hot.any(axis=1), one_hot.argmax(axis=1), -1)
+        self.nationalities[positions] = [
+            codes.setdefault(key, len(codes)) for key in ((row[9] or "").strip().lower() for row in rows)]
+        return positions
+
+    def _fit(self):
+        n = len(NUMERIC_FEATURES)
+        numeric = self.raw[:self.size, :n]
+        # Colonnes sans aucune valeur (ex: taille sur une base clairsemée) : écartées du calcul
+        # (nanmean avertirait "Mean of empty slice") et de poids nul jusqu'au prochain ajustement
+        observed = ~np.isnan(numeric).all(axis=0)
+        mean, std = np.zeros(n), np.ones(n)
+        if observed.any():
+            mean[observed] = np.nanmean(numeric[:, observed], axis=0)
+            std[observed] = np.nanstd(numeric[:, observed], axis=0)
+        self.mean = mean
+        self.std = np.where(std > 0, std, 1.0)
+        self.weight = observed.astype(np.float64)
+        self._standardize(slice(0, self.size))
+        self.changed_since_fit = 0
+
+    def _standardize(self, rows):
+        n = len(NUMERIC_FEATURES)
+        z = self.raw[rows].copy()
+        z[:, :n] = (z[:, :n] - self.mean) / self.std * self.weight
+        z[:, n:] *= POSITION_WEIGHT
+        np.nan_to_num(z, copy=False)  # valeur manquante = moyenne de la colonne
+        sq_norms = np.einsum("ij,ij->i", z, z)
+        norms = np.sqrt(sq_norms)
+        self.z_t[:, rows] = z.T
+        self.sq_norms[rows] = sq_norms
+        self.unit_t[:, rows] = (z / np.where(norms > 0, norms, 1.0)[:, None]).T
+
+    def update_players(self, names: List[str]):
+        """
+        Écouteur d'écriture : relit les joueurs modifiés et met à jour leurs lignes. Lecture et
+        écriture se font sous le verrou, dans l'ordre des notifications. Avant la construction,
+        rien à faire : le SELECT de build() verra l'écriture, déjà validée.
+        """
+        if not names:
+            return
+        with self._lock:
+            if not self.built_at:
+                return
+            conn = database.get_db_connection()
+            try:
+                rows = []
+                for i in range(0, len(names), 500):
+                    chunk = names[i:i + 500]
+                    rows.extend(conn.execute(
+                        f"SELECT {_SELECT_COLUMNS} FROM players WHERE name IN ({','.join('?' * len(chunk))})", chunk))
+            finally:
+                conn.close()
+            positions = self._write_rows(rows)
+            self.changed_since_fit += len(positions)
+            if self.changed_since_fit > self.REFIT_RATIO * max(self.size, 1):
+                self._fit()
+            else:
+                self._standardize(positions)
+
+    def is_stale(self) -> bool:
+        return SIMILARITY_MAX_AGE > 0 and time.monotonic() - self.built_at > SIMILARITY_MAX_AGE
+
+    # --- Requêtes ---
+
+    def neighbours(self, player_id: int, k: int = 10, metric: str = "cosine",
+                   min_age: Optional[int] = None, max_age: Optional[int] = None,
+                   max_value: Optional[int] = None, nationality: Optional[str] = None,
+                   position: Optional[str] = None) -> Optional[List[tuple]]:
+        """
+        Les k joueurs les plus proches de `player_id` parmi ceux qui passent les filtres :
+        liste de (id, score). Score = similarité cosinus (plus grand = plus proche) ou
+        distance euclidienne dans l'espace standardisé (plus petit = plus proche).
+        Retourne None si le joueur n'est pas dans l'index.
+        """
+        with self._lock:
+            i = self.row_of.get(player_id)
+            if i is None:
+                return None
+            n = self.size
+            # Score de toutes les lignes (produit matrice-vecteur contigu), filtres appliqués ensuite
+            if metric == "euclidean":
+                scores = self.z_t[:, i] @ self.z_t[:, :n]
+                scores *= -2
+                scores += self.sq_norms[:n]
+                scores += self.sq_norms[i]
+                np.sqrt(np.maximum(scores, 0.0, out=scores), out=scores)
+                order_key = scores.copy()
+            else:
+                scores = self.unit_t[:, i] @ self.unit_t[:, :n]
+                order_key = -scores
+
+            excluded = np.zeros(n, dtype=bool)
+            excluded[i] = True
+            with np.errstate(invalid="ignore"):
+                ages = self.ages[:n]
+                if min_age is not None:
+                    excluded |= ~(ages >= min_age)
+                if max_age is not None:
+                    excluded |= ~(ages <= max_age)
+                if max_value is not None:
+                    excluded |= ~(self.values[:n] <= max_value)
+            if nationality:
+                code = self.nationality_codes.get(nationality.strip().lower())
+                if code is None:
+                    return []
+                excluded |= self.nationalities[:n] != code
+            if position:
+                group = position_group(position)
+                if group in POSITION_GROUPS:
+                    excluded |= self.groups[:n] != POSITION_GROUPS.index(group)
+            order_key[excluded] = np.inf
+
+            k = min(k, n - int(excluded.sum()))
+            if k <= 0:
+                return []
+            top = np.argpartition(order_key, k - 1)[:k]
+            top = top[np.argsort(order_key[top], kind="stable")]
+            return [(int(self.ids[j]), float(scores[j])) for j in top]
+
+_index: Optional[SimilarityIndex] = None
+_index_lock = threading.Lock()
+
+def get_index() -> SimilarityIndex:
+    """
+    Index partagé du processus, construit au premier appel et tenu à jour par les écritures.
+    Une reconstruction (SIMILARITY_MAX_AGE) se fait dans un nouvel index : pendant ce temps,
+    les autres requêtes continuent d'interroger l'ancien.
+    """
+    global _index
+    index = _index
+    if index is None or index.is_stale():
+        if _index_lock.acquire(blocking=index is None):
+            try:
+                if _index is None or _index.is_stale():
+                    fresh = SimilarityIndex()
+                    database.add_player_write_listener(fresh.update_players)
+                    fresh.build()
+                    if _index is not None:
+                        database.remove_player_write_listener(_index.update_players)
+                    _index = fresh
+            finally:
+                _index_lock.release()
+        index = _index
+    return index
+
+def similar_players(player_id: int, k: int = 10, metric: str = "cosine", **filters) -> Optional[List[Dict[str, Any]]]:
+    """Voisins de `player_id` avec leurs fiches (id, nom, club, poste, valeur...) et leur score."""
+    neighbours = get_index().neighbours(player_id, k, metric, **filters)
+    if neighbours is None:
+        return None
+    if not neighbours:
+        return []
+    ids = [player_id for player_id, _ in neighbours]
+    conn = database.get_db_connection()
+    try:
+        rows = conn.execute(
+            "SELECT id, name, age, nationality, current_club, position, market_value, market_value_eur, "
+            "goals, assists, minutes_played, image_url "
+            f"FROM players WHERE id IN ({','.join('?' * len(ids))})", ids).fetchall()
+    finally:
+        conn.close()
+    by_id = {row["id"]: dict(row) for row in rows}
+    return [{**by_id[pid], "score": round(score, 4)} for pid, score in neighbours if pid in by_id]
@@ -0,0 +1,49 @@
+# Filename: backend/timeseries.py
+# Description: Outils de réduction des séries temporelles servies aux graphiques (LTTB).
+
+from typing import List, Sequence, Tuple
+
+Point = Tuple[float, float]
+
+def lttb(points: Sequence[Point], threshold: int) -> List[Point]:
+    """
+    Largest-Triangle-Three-Buckets : réduit une série à `threshold` points
+    en conservant sa forme visuelle (pics, creux, premier et dernier point).
+    Les points doivent être triés par abscisse croissante.
+    """
+    n = len(points)
+    if threshold >= n or n <= 2:
+        return list(points)
+    if threshold < 3:
+        return [points[0], points[-1]]
+
+    sampled = [points[0]]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0  # index du dernier point retenu
+
+    for i in range(threshold - 2):
+        # Moyenne du bucket suivant (troisième sommet du triangle)
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        next_bucket = points[next_start:next_end] or [points[-1]]
+        avg_x = sum(p[0] for p in next_bucket) / len(next_bucket)
+        avg_y = sum(p[1] for p in next_bucket) / len(next_bucket)
+
+        # Point du bucket courant qui forme le plus grand triangle
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        ax, ay = points[a][0], points[a][1]
+        best_area = -1.0
+        best_index = start
+        for j in range(start, end):
+            x, y = points[j][0], points[j][1]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best_index = j
+
+        sampled.append(points[best_index])
+        a = best_index
+
+    sampled.append(points[-1])
+    return sampled
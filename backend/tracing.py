@@ -0,0 +1,249 @@
+# Filename: backend/tracing.py
+# Description: Spans compatibles OpenTelemetry et logs structurés pour le backend et le pipeline de scraping.
+#
+# Variables d'environnement :
+#   TRACING_EXPORTER=none|console|file|otel  (none par défaut : spans créés mais non exportés)
+#   TRACING_FILE=chemin du fichier JSONL pour l'exporteur "file"
+#   LOG_LEVEL=DEBUG|INFO|WARNING|ERROR       (INFO par défaut)
+#   LOG_FORMAT=text|json                     (text par défaut)
+#
+# Avec TRACING_EXPORTER=otel, les spans sont délégués au SDK OpenTelemetry s'il est installé
+# (exporteurs configurés par les variables OTEL_* standard) ; sinon un exporteur interne écrit
+# les spans au format JSON d'OpenTelemetry (trace_id / span_id hexadécimaux, attributs, statut).
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none").lower()
+TRACING_FILE = os.getenv("TRACING_FILE", "traces.jsonl")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+
+otel_trace = None
+
+def _load_otel_tracer():
+    """Importe le SDK OpenTelemetry uniquement pour l'exporteur "otel" (import coûteux au démarrage)."""
+    global otel_trace
+    if TRACING_EXPORTER != "otel":
+        return None
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        return None
+    otel_trace = trace
+    return trace.get_tracer("x-scout")
+
+_otel_tracer = _load_otel_tracer()
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+_export_lock = threading.Lock()
+
+def _iso(ns: int) -> str:
+    return datetime.fromtimestamp(ns / 1e9, tz=timezone.utc).isoformat()
+
+def _clean_attributes(attributes: dict) -> dict:
+    # OpenTelemetry n'accepte que des types primitifs (ou séquences de primitifs)
+    return {
+        k: (v if isinstance(v, (str, bool, int, float)) else str(v))
+        for k, v in attributes.items() if v is not None
+    }
+
+class Span:
+    """Span minimal au format OpenTelemetry (utilisé lorsque le SDK n'est pas actif)."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "status", "events")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: dict):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = _clean_attributes(attributes)
+        self.status = "UNSET"
+        self.events = []
+
+    def set_attribute(self, key: str, value: Any):
+        if value is not None:
+            self.attributes.update(_clean_attributes({key: value}))
+
+    def set_attributes(self, attributes: dict):
+        self.attributes.update(_clean_attributes(attributes))
+
+    def update_name(self, name: str):
+        self.name = name
+
+    def add_event(self, name: str, attributes: Optional[dict] = None):
+        self.events.append({"name": name, "timestamp": _iso(time.time_ns()), "attributes": _clean_attributes(attributes or {})})
+
+    def record_exception(self, exc: BaseException):
+        self.status = "ERROR"
+        self.add_event("exception", {"exception.type": type(exc).__name__, "exception.message": str(exc)})
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "context": {"trace_id": self.trace_id, "span_id": self.span_id},
+            "parent_id": self.parent_id,
+            "start_time": _iso(self.start_ns),
+            "end_time": _iso(self.end_ns or time.time_ns()),
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "status": {"status_code": self.status},
+            "events": self.events,
+        }
+
+class _OtelSpan:
+    """Adapte un span du SDK OpenTelemetry à l'interface de Span (filtre les valeurs None)."""
+
+    __slots__ = ("_span",)
+
+    def __init__(self, otel_span):
+        self._span = otel_span
+
+    def set_attribute(self, key: str, value: Any):
+        if value is not None:
+            self._span.set_attributes(_clean_attributes({key: value}))
+
+    def set_attributes(self, attributes: dict):
+        self._span.set_attributes(_clean_attributes(attributes))
+
+    def update_name(self, name: str):
+        self._span.update_name(name)
+
+    def add_event(self, name: str, attributes: Optional[dict] = None):
+        self._span.add_event(name, _clean_attributes(attributes or {}))
+
+    def record_exception(self, exc: BaseException):
+        self._span.record_exception(exc)
+
+def _export(s: Span):
+    if TRACING_EXPORTER == "console":
+        with _export_lock:
+            sys.stderr.write(json.dumps(s.to_dict(), ensure_ascii=False) + "\n")
+    elif TRACING_EXPORTER in ("file", "otel"):
+        line = json.dumps(s.to_dict(), ensure_ascii=False) + "\n"
+        with _export_lock:
+            with open(TRACING_FILE, "a", encoding="utf-8") as f:
+                f.write(line)
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Ouvre un span enfant du span courant (propagé par contextvars).
+    Les exceptions sont enregistrées sur le span puis relancées.
+    """
+    if _otel_tracer is not None:
+        with _otel_tracer.start_as_current_span(name, attributes=_clean_attributes(attributes)) as s:
+            yield _OtelSpan(s)
+        return
+
+    s = Span(name, _current_span.get(), attributes)
+    token = _current_span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.record_exception(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        s.end_ns = time.time_ns()
+        if s.status == "UNSET":
+            s.status = "OK"
+        _export(s)
+
+def traced(name: Optional[str] = None, **attributes):
+    """Décorateur : exécute la fonction dans un span (nom par défaut : module.fonction)."""
+    def decorator(func):
+        span_name = name or f"{func.__module__}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def current_ids() -> tuple:
+    """(trace_id, span_id) du span courant, pour corréler logs et traces."""
+    if _otel_tracer is not None:
+        ctx = otel_trace.get_current_span().get_span_context()
+        if ctx.is_valid:
+            return format(ctx.trace_id, "032x"), format(ctx.span_id, "016x")
+        return None, None
+    s = _current_span.get()
+    return (s.trace_id, s.span_id) if s else (None, None)
+
+# ========== LOGS STRUCTURÉS ==========
+
+_RESERVED_RECORD_KEYS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par log : horodatage, niveau, logger, message, ids de trace et champs `extra`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        trace_id, span_id = current_ids()
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if trace_id:
+            payload["trace_id"] = trace_id
+            payload["span_id"] = span_id
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_RECORD_KEYS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+class TextFormatter(logging.Formatter):
+    """Format lisible en console, suivi des champs `extra` en clé=valeur."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extras = " ".join(
+            f"{key}={value}" for key, value in record.__dict__.items()
+            if key not in _RESERVED_RECORD_KEYS and not key.startswith("_")
+        )
+        return f"{line} {extras}" if extras else line
+
+_logging_handler = None
+
+def configure():
+    """
+    Relit la configuration (après chargement du .env), choisit l'exporteur de spans
+    et installe une seule fois le handler de logs racine.
+    """
+    global TRACING_EXPORTER, TRACING_FILE, LOG_LEVEL, LOG_FORMAT, _otel_tracer, _logging_handler
+    TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none").lower()
+    TRACING_FILE = os.getenv("TRACING_FILE", "traces.jsonl")
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+    _otel_tracer = _load_otel_tracer()
+
+    root = logging.getLogger()
+    if _logging_handler is None:
+        _logging_handler = logging.StreamHandler()
+        root.addHandler(_logging_handler)
+    _logging_handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else TextFormatter())
+    root.setLevel(LOG_LEVEL)
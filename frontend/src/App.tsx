@@ -94,7 +94,7 @@ function App() {
       </header>
       <div className="app-layout">
         <div className="left-panel">
-          <PlayerDossier player={player} loading={loading} error={error} />
+          <PlayerDossier apiUrl={API_URL} player={player} loading={loading} error={error} />
         </div>
         <div className="center-panel">
           <Globe player={player} />
@@ -104,6 +104,7 @@ function App() {
             player={player} 
             onPlayerRequest={fetchPlayer}
             loading={loading}
+            apiUrl={API_URL}
           />
         </div>
       </div>
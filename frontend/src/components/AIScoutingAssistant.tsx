@@ -6,11 +6,49 @@ interface AIScoutingAssistantProps {
   player: Player | null
   onPlayerRequest: (playerName: string) => void
   loading: boolean
+  apiUrl: string
 }
 
-export default function AIScoutingAssistant({ player, onPlayerRequest, loading }: AIScoutingAssistantProps) {
+interface Suggestion {
+  player_id: number
+  name: string
+  current_club: string | null
+  position: string | null
+  matched_alias: string | null
+}
+
+// Délai après la dernière frappe avant d'interroger /autocomplete
+const AUTOCOMPLETE_DELAY_MS = 150
+
+export default function AIScoutingAssistant({ player, onPlayerRequest, loading, apiUrl }: AIScoutingAssistantProps) {
   const [inputValue, setInputValue] = useState('')
   const [messages, setMessages] = useState<Array<{ role: 'user' | 'ai', content: string }>>([])
+  const [suggestions, setSuggestions] = useState<Suggestion[]>([])
+
+  useEffect(() => {
+    const query = inputValue.trim()
+    if (!query) {
+      setSuggestions([])
+      return
+    }
+    // Seule la réponse à la dernière saisie est affichée (les requêtes précédentes sont annulées)
+    const controller = new AbortController()
+    const timer = setTimeout(async () => {
+      try {
+        const response = await fetch(`${apiUrl}/autocomplete?q=${encodeURIComponent(query)}`, { signal: controller.signal })
+        if (response.ok) {
+          const data = await response.json()
+          setSuggestions(data.results || [])
+        }
+      } catch {
+        // Requête annulée ou API indisponible : pas de suggestions
+      }
+    }, AUTOCOMPLETE_DELAY_MS)
+    return () => {
+      clearTimeout(timer)
+      controller.abort()
+    }
+  }, [inputValue, apiUrl])
 
   useEffect(() => {
     if (player) {
@@ -56,17 +94,20 @@ export default function AIScoutingAssistant({ player, onPlayerRequest, loading }
     }
   }, [player])
 
-  const handleSend = async () => {
-    if (!inputValue.trim()) return
-
-    const playerName = inputValue.trim()
+  const requestPlayer = (playerName: string) => {
     setInputValue('')
+    setSuggestions([])
     setMessages(prev => [...prev, { role: 'user', content: playerName }])
     
     // Appelle la fonction de recherche de joueur
     onPlayerRequest(playerName)
   }
 
+  const handleSend = async () => {
+    if (!inputValue.trim()) return
+    requestPlayer(inputValue.trim())
+  }
+
   const handleKeyPress = (e: React.KeyboardEvent) => {
     if (e.key === 'Enter' && !e.shiftKey) {
       e.preventDefault()
@@ -108,6 +149,22 @@ export default function AIScoutingAssistant({ player, onPlayerRequest, loading }
         )}
       </div>
 
+      {suggestions.length > 0 && !loading && (
+        <ul className="autocomplete-list">
+          {suggestions.map((suggestion) => (
+            <li key={suggestion.player_id}>
+              <button className="autocomplete-item" onClick={() => requestPlayer(suggestion.name)}>
+                <span className="autocomplete-name">{suggestion.name}</span>
+                <span className="autocomplete-details">
+                  {suggestion.matched_alias ? `« ${suggestion.matched_alias} » · ` : ''}
+                  {[suggestion.position, suggestion.current_club].filter(Boolean).join(' · ')}
+                </span>
+              </button>
+            </li>
+          ))}
+        </ul>
+      )}
+
       <div className="chat-input-container">
         <input
           type="text"
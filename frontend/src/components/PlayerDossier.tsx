@@ -2,12 +2,13 @@ import type { Player } from '../App'
 import './PlayerDossier.css'
 
 interface PlayerDossierProps {
+  apiUrl: string
   player: Player | null
   loading: boolean
   error: string | null
 }
 
-export default function PlayerDossier({ player, loading, error }: PlayerDossierProps) {
+export default function PlayerDossier({ apiUrl, player, loading, error }: PlayerDossierProps) {
   if (loading) {
     return (
       <div className="player-dossier">
@@ -44,7 +45,7 @@ export default function PlayerDossier({ player, loading, error }: PlayerDossierP
       <div className="player-header">
         {player.image_url && (
           <img 
-            src={player.image_url} 
+            src={player.id ? `${apiUrl}/player/${player.id}/photo?w=400` : player.image_url}
             alt={player.name}
             className="player-image"
             onError={(e) => {
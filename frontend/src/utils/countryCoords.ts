@@ -92,5 +92,34 @@ export const countryCoords: { [key: string]: { lat: number; lng: number } } = {
   "New Zealand": { lat: -40.9006, lng: 174.8860 },
   "Afrique du Sud": { lat: -30.5595, lng: 22.9375 },
   "South Africa": { lat: -30.5595, lng: 22.9375 },
+  "Scotland": { lat: 56.4907, lng: -4.2026 },
+  "Wales": { lat: 52.1307, lng: -3.7837 },
+  "Northern Ireland": { lat: 54.7877, lng: -6.4923 },
+  "Ireland": { lat: 53.4129, lng: -8.2439 },
+  "Serbia": { lat: 44.0165, lng: 21.0059 },
+  "Slovenia": { lat: 46.1512, lng: 14.9955 },
+  "Slovakia": { lat: 48.6690, lng: 19.6990 },
+  "Hungary": { lat: 47.1625, lng: 19.5033 },
+  "Romania": { lat: 45.9432, lng: 24.9668 },
+  "Bulgaria": { lat: 42.7339, lng: 25.4858 },
+  "Bosnia and Herzegovina": { lat: 43.9159, lng: 17.6791 },
+  "Montenegro": { lat: 42.7087, lng: 19.3744 },
+  "North Macedonia": { lat: 41.6086, lng: 21.7453 },
+  "Albania": { lat: 41.1533, lng: 20.1683 },
+  "Kosovo": { lat: 42.6026, lng: 20.9030 },
+  "Georgia": { lat: 42.3154, lng: 43.3569 },
+  "Ukraine": { lat: 48.3794, lng: 31.1656 },
+  "Finland": { lat: 61.9241, lng: 25.7482 },
+  "Iceland": { lat: 64.9631, lng: -19.0208 },
+  "Bolivia": { lat: -16.2902, lng: -63.5887 },
+  "Jamaica": { lat: 18.1096, lng: -77.2975 },
+  "Costa Rica": { lat: 9.7489, lng: -83.7534 },
+  "Mali": { lat: 17.5707, lng: -3.9962 },
+  "Guinea": { lat: 9.9456, lng: -9.6966 },
+  "Gabon": { lat: -0.8037, lng: 11.6094 },
+  "DR Congo": { lat: -4.0383, lng: 21.7587 },
+  "Burkina Faso": { lat: 12.2383, lng: -1.5616 },
+  "Cape Verde": { lat: 16.5388, lng: -23.0418 },
+  "Gambia": { lat: 13.4432, lng: -15.3101 },
+  "Iran": { lat: 32.4279, lng: 53.6880 },
 }
-